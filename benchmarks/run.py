@@ -0,0 +1,227 @@
+"""
+Benchmarks of the build pipeline on a synthetic monorepo. Dependencies are served
+from a generated local wheelhouse, so no network access is needed.
+
+Usage, from the repository root:
+
+    PYTHONPATH=src python benchmarks/run.py --output results.json
+
+Results are written as JSON, so that they can be compared between releases.
+"""
+
+from __future__ import annotations
+
+import importlib.metadata
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Callable
+
+import click
+
+from lambda_lift.config.registry import ConfigsRegistry
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.packer.cache.state import (
+    check_dependencies_up_to_date,
+    get_dependencies_zip_path,
+)
+from lambda_lift.packer.packaging import run_packaging_stages
+from lambda_lift.packer.zip import add_folders_to_zip, zip_folder
+from lambda_lift.utils.cli_tools import get_console
+
+from synthetic import RepoParams, make_repo, make_wheelhouse
+
+_RESULTS_VERSION = 1
+
+
+def _measure(
+    run: Callable[[], Any],
+    *,
+    repeat: int,
+    setup: Callable[[], Any] = lambda: None,
+) -> dict[str, Any]:
+    """
+    Times run `repeat` times, calling setup before every run outside of the timing.
+    """
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+    }
+
+
+def _get_version() -> str:
+    try:
+        return importlib.metadata.version("lambda-lift")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _get_commit() -> str | None:
+    result = subprocess.run(
+        ["git", "rev-parse", "HEAD"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout.strip() or None
+
+
+def _clean_build(config: SingleLambdaConfig) -> None:
+    shutil.rmtree(config.build.cache_path, ignore_errors=True)
+    config.build.destination_path.unlink(missing_ok=True)
+
+
+def _run_benchmarks(
+    temp_path: Path, params: RepoParams, repeat: int
+) -> dict[str, dict[str, Any]]:
+    repo_path = temp_path / "repo"
+    make_wheelhouse(temp_path / "wheelhouse", params)
+    make_repo(repo_path, temp_path / "wheelhouse", params)
+    results: dict[str, dict[str, Any]] = {}
+
+    def bench(name: str, run: Callable[[], Any], **kwargs: Any) -> None:
+        click.echo(f"Running {name}...", err=True)
+        results[name] = _measure(run, repeat=repeat, **kwargs)
+
+    bench("registry_discovery", lambda: len(ConfigsRegistry(repo_path)))
+    index_path = temp_path / "registry.pickle"
+    len(ConfigsRegistry(repo_path, index_path=index_path))
+    bench(
+        "registry_discovery_indexed",
+        lambda: len(ConfigsRegistry(repo_path, index_path=index_path)),
+    )
+    config = ConfigsRegistry(repo_path).get("bench-000")
+    bench(
+        "package_lambda_cold",
+        lambda: run_packaging_stages(config),
+        setup=lambda: _clean_build(config),
+    )
+    source_file = config.build.source_paths[0] / "module_0.py"
+    original_source = source_file.read_text()
+    edits = iter(range(repeat))
+    bench(
+        "package_lambda_warm",
+        lambda: run_packaging_stages(config),
+        setup=lambda: source_file.write_text(
+            f"{original_source}\n# Edit {next(edits)}\n"
+        ),
+    )
+    bench("package_lambda_no_change", lambda: run_packaging_stages(config))
+    bench(
+        "check_dependencies_up_to_date",
+        lambda: check_dependencies_up_to_date(config),
+    )
+    # Hashes the zip instead of trusting its recorded stats
+    bench(
+        "check_dependencies_up_to_date_paranoid",
+        lambda: check_dependencies_up_to_date(config, paranoid=True),
+    )
+    dependencies_zip_path = get_dependencies_zip_path(config)
+    dependencies_path = temp_path / "dependencies"
+    with zipfile.ZipFile(dependencies_zip_path) as zip_file:
+        zip_file.extractall(dependencies_path)
+    bench(
+        "zip_folder",
+        lambda: zip_folder(dependencies_path, temp_path / "folder.zip"),
+    )
+    merged_zip_path = temp_path / "merged.zip"
+    bench(
+        "add_folders_to_zip",
+        lambda: add_folders_to_zip(merged_zip_path, config.build.source_paths),
+        setup=lambda: shutil.copyfile(dependencies_zip_path, merged_zip_path),
+    )
+    return results
+
+
+@click.command()
+@click.option("--lambdas", type=click.IntRange(min=1), default=RepoParams.lambdas)
+@click.option(
+    "--source-depth", type=click.IntRange(min=0), default=RepoParams.source_depth
+)
+@click.option(
+    "--source-fanout", type=click.IntRange(min=1), default=RepoParams.source_fanout
+)
+@click.option(
+    "--files-per-dir", type=click.IntRange(min=1), default=RepoParams.files_per_dir
+)
+@click.option("--packages", type=click.IntRange(min=3), default=RepoParams.packages)
+@click.option(
+    "--files-per-package",
+    type=click.IntRange(min=1),
+    default=RepoParams.files_per_package,
+)
+@click.option(
+    "--noise-files", type=click.IntRange(min=0), default=RepoParams.noise_files
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Number of timed runs of every benchmark.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Where to write the JSON results. Printed to stdout if not given.",
+)
+def main(
+    lambdas: int,
+    source_depth: int,
+    source_fanout: int,
+    files_per_dir: int,
+    packages: int,
+    files_per_package: int,
+    noise_files: int,
+    repeat: int,
+    output: Path | None,
+) -> None:
+    params = RepoParams(
+        lambdas=lambdas,
+        source_depth=source_depth,
+        source_fanout=source_fanout,
+        files_per_dir=files_per_dir,
+        packages=packages,
+        files_per_package=files_per_package,
+        noise_files=noise_files,
+    )
+    # Keep the progress messages of the packaging stages out of the output
+    get_console().quiet = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = _run_benchmarks(Path(temp_dir), params, repeat)
+    report = {
+        "version": _RESULTS_VERSION,
+        "lambda_lift_version": _get_version(),
+        "commit": _get_commit(),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params.jsonable,
+        "repeat": repeat,
+        "results": results,
+    }
+    for name, result in results.items():
+        click.echo(f"{name}: median {result['median']:.3f}s", err=True)
+    if output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Generators of synthetic monorepos for the benchmarks. All content is derived from
+the parameters and a fixed seed, so the same parameters produce the same files.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import random
+import subprocess
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+_SEED = 1234
+
+# Directories that a real monorepo has but that never contain lambda configs
+_NOISE_DIRS = ("node_modules", ".venv", "build")
+
+
+@dataclass(frozen=True)
+class RepoParams:
+    lambdas: int = 20
+    # Each lambda has a source tree source_depth levels deep, with source_fanout
+    # subpackages and files_per_dir modules in every package
+    source_depth: int = 3
+    source_fanout: int = 3
+    files_per_dir: int = 5
+    # Fake distributions form a binary tree of dependencies, see _get_dependencies
+    packages: int = 30
+    files_per_package: int = 40
+    # Size of the incompressible data file in every package, like a shared object
+    binary_size: int = 64 * 1024
+    noise_files: int = 2000
+
+    @property
+    def jsonable(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _get_package_name(idx: int) -> str:
+    return f"benchpkg{idx:03d}"
+
+
+def _get_dependencies(idx: int, count: int) -> list[int]:
+    return [child for child in (2 * idx + 1, 2 * idx + 2) if child < count]
+
+
+def _make_module(idx: int, functions: int = 20) -> str:
+    return "".join(
+        f"def function_{idx}_{n}(value):\n"
+        f"    result = value * {n} + {idx}\n"
+        f"    return str(result).rjust({n + 8})\n\n\n"
+        for n in range(functions)
+    )
+
+
+def _get_record_line(arcname: str, content: bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(content).digest())
+    return f"{arcname},sha256={digest.rstrip(b'=').decode()},{len(content)}\n"
+
+
+def _make_wheel(
+    wheelhouse_path: Path, idx: int, params: RepoParams, rng: random.Random
+) -> None:
+    name = _get_package_name(idx)
+    dist_info = f"{name}-1.0.dist-info"
+    requires = "".join(
+        f"Requires-Dist: {_get_package_name(child)}\n"
+        for child in _get_dependencies(idx, params.packages)
+    )
+    files: dict[str, bytes] = {
+        f"{name}/__init__.py": b"",
+        f"{name}/_native.bin": rng.randbytes(params.binary_size),
+    }
+    for file_idx in range(params.files_per_package):
+        files[f"{name}/module_{file_idx}.py"] = _make_module(file_idx).encode()
+    files[f"{dist_info}/METADATA"] = (
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n{requires}"
+    ).encode()
+    files[f"{dist_info}/WHEEL"] = (
+        b"Wheel-Version: 1.0\nGenerator: lambda-lift-benchmarks\n"
+        b"Root-Is-Purelib: true\nTag: py3-none-any\n"
+    )
+    record = "".join(_get_record_line(arcname, data) for arcname, data in files.items())
+    files[f"{dist_info}/RECORD"] = (record + f"{dist_info}/RECORD,,\n").encode()
+    with zipfile.ZipFile(
+        wheelhouse_path / f"{name}-1.0-py3-none-any.whl", "w", zipfile.ZIP_DEFLATED
+    ) as wheel:
+        for arcname, data in files.items():
+            wheel.writestr(arcname, data)
+
+
+def make_wheelhouse(wheelhouse_path: Path, params: RepoParams) -> None:
+    rng = random.Random(_SEED)
+    wheelhouse_path.mkdir(parents=True, exist_ok=True)
+    for idx in range(params.packages):
+        _make_wheel(wheelhouse_path, idx, params, rng)
+
+
+def _make_source_tree(path: Path, depth: int, params: RepoParams) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    for file_idx in range(params.files_per_dir):
+        (path / f"module_{file_idx}.py").write_text(_make_module(file_idx, 10))
+    (path / "__init__.py").write_text("")
+    if depth < params.source_depth:
+        for child_idx in range(params.source_fanout):
+            _make_source_tree(path / f"pkg_{child_idx}", depth + 1, params)
+
+
+def _make_noise(root_path: Path, params: RepoParams) -> None:
+    per_dir = max(params.noise_files // len(_NOISE_DIRS), 1)
+    for noise_dir in _NOISE_DIRS:
+        for file_idx in range(per_dir):
+            path = root_path / noise_dir / f"dir_{file_idx % 50}" / f"{file_idx}.js"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"module.exports = {file_idx};\n")
+
+
+def _make_config(lambda_path: Path, idx: int, wheelhouse_path: Path) -> None:
+    (lambda_path / "requirements.txt").write_text(f"{_get_package_name(idx % 3)}\n")
+    (lambda_path / "src" / "handler.py").write_text(
+        f"import {_get_package_name(idx % 3)}\n"
+        "from pkg_0 import module_0\n\n\n"
+        "def handler(event, context):\n"
+        "    return module_0.function_0_0(1)\n"
+    )
+    (lambda_path / f"lambda-lift-bench-{idx:03d}.toml").write_text(
+        f"[general]\n"
+        f'name = "bench-{idx:03d}"\n\n'
+        f"[build]\n"
+        f'source_paths = ["src"]\n'
+        f'requirements_path = "requirements.txt"\n'
+        f'destination_path = "dist/lambda.zip"\n'
+        f'cache_path = ".lambda-lift"\n'
+        f'platform = "x86"\n'
+        f'wheelhouse_path = "{wheelhouse_path.as_posix()}"\n'
+        f"offline = true\n"
+    )
+
+
+def make_repo(root_path: Path, wheelhouse_path: Path, params: RepoParams) -> None:
+    """
+    Creates a git repository with params.lambdas lambdas, each with its own
+    source tree and requirements served from the wheelhouse, and directories
+    of unrelated files.
+    """
+    root_path.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "init", "-q", str(root_path)], check=True)
+    for idx in range(params.lambdas):
+        lambda_path = root_path / "lambdas" / f"lambda_{idx:03d}"
+        _make_source_tree(lambda_path / "src", 0, params)
+        _make_config(lambda_path, idx, wheelhouse_path)
+    _make_noise(root_path, params)
@@ -1,19 +1,138 @@
 from __future__ import annotations
 
+import functools
 import sys
 import time
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
+from typing import Any, Callable, Generator, Sequence
 
 import click
 
+from lambda_lift.config.discovery import DiscoveryConfig
+from lambda_lift.config.index import get_index_path
 from lambda_lift.config.registry import ConfigsRegistry
-from lambda_lift.deployment.aws import deploy_lambda
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.deployment.aws import deploy_lambdas, print_deploy_summary
 from lambda_lift.exceptions import UserError
-from lambda_lift.packer.packaging import package_lambda
+from lambda_lift.packer.cache.archive import (
+    collect_cache_entries,
+    export_cache_archive,
+    import_cache_archive,
+)
+from lambda_lift.packer.cache.backends import get_cache_backend
+from lambda_lift.packer.coldstart import (
+    bench_coldstart,
+    check_host_platform,
+    print_coldstart_results,
+)
+from lambda_lift.packer.packaging import DEFAULT_LOCK_TIMEOUT_SECONDS, package_lambda
+from lambda_lift.packer.parallel import package_lambdas_in_parallel
+from lambda_lift.packer.size_report import (
+    get_previous_size_report,
+    get_size_report,
+    print_size_report,
+)
 from lambda_lift.utils.cli_tools import get_console, rich_print
 
 
-@click.command()
+class _DefaultCommandGroup(click.Group):
+    """
+    A group that runs its default command unless the first argument names
+    another command, so that `lambda-lift my-lambda --deploy prod` keeps working.
+    Lambdas can't be named after commands, see _load_configs.
+    """
+
+    def __init__(self, *args: Any, default_command: str, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or (args[0] not in self.commands and args[0] != "--help"):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultCommandGroup, default_command="build")
+def cli_main() -> None:
+    """
+    Packages lambdas and deploys them to AWS. Runs the build command unless
+    another command is given.
+    """
+
+
+@contextmanager
+def _handle_errors() -> Generator[None, None, None]:
+    try:
+        yield
+    except UserError as ex:
+        rich_print(f"[red]{str(ex)}")
+        sys.exit(2)
+    except click.ClickException:
+        raise
+    except Exception:
+        get_console().print_exception(show_locals=False)
+        sys.exit(1)
+
+
+def _discovery_options(command: Callable[..., None]) -> Callable[..., None]:
+    """
+    Adds the options controlling config discovery, passed to the command as
+    a single DiscoveryConfig.
+    """
+
+    @functools.wraps(command)
+    def wrapper(*args: Any, exclude: list[str], git_index: bool, **kwargs: Any) -> None:
+        discovery = DiscoveryConfig(excludes=tuple(exclude), use_git_index=git_index)
+        command(*args, discovery=discovery, **kwargs)
+
+    wrapper = click.option(
+        "--exclude",
+        multiple=True,
+        type=str,
+        envvar="LAMBDA_LIFT_EXCLUDE",
+        help="Glob pattern of directories to skip when looking for configs.",
+    )(wrapper)
+    wrapper = click.option(
+        "--git-index",
+        is_flag=True,
+        envvar="LAMBDA_LIFT_GIT_INDEX",
+        help="Look for configs among files listed by git instead of walking the tree.",
+    )(wrapper)
+    return wrapper
+
+
+def _load_configs(
+    lambdas: Sequence[str], discovery: DiscoveryConfig
+) -> list[SingleLambdaConfig]:
+    """
+    Returns the configs of the given lambdas, or of all lambdas if none are given.
+    """
+    with get_console().status("[blue]Reading configs..."):
+        root_path = Path.cwd()
+        registry = ConfigsRegistry(
+            root_path,
+            discovery,
+            index_path=get_index_path(root_path),
+            # Such lambdas couldn't be selected on the command line
+            reserved_names=cli_main.commands.keys(),
+        )
+        rich_print(
+            f"[yellow]Found {len(registry)} config{'s' if len(registry) != 1 else ''}"
+        )
+        for lambda_name in lambdas:
+            if lambda_name not in registry.names:
+                raise click.NoSuchOption(
+                    "lambdas",
+                    f"No such lambda: {lambda_name}",
+                    possibilities=list(registry.names),
+                )
+        all_lambdas = lambdas or list(registry.names)
+        return [registry.get(lambda_name) for lambda_name in all_lambdas]
+
+
+@cli_main.command()
 @click.argument("lambdas", nargs=-1, type=str)
 @click.option(
     "--deploy",
@@ -27,9 +146,77 @@ from lambda_lift.utils.cli_tools import get_console, rich_print
     type=str,
     help="Deploy all lambdas to AWS. This flag accepts a list of profiles to deploy to.",
 )
-def cli_main(lambdas: list[str], deploy: list[str], deploy_all: list[str]) -> None:
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of lambdas to package in parallel.",
+)
+@click.option(
+    "--deploy-jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of functions to deploy concurrently.",
+)
+@click.option(
+    "--async-deploy",
+    is_flag=True,
+    help="Deploy on an asyncio pipeline and wait until all updated functions are "
+    "live. Versions are published as soon as each function's update completes.",
+)
+@click.option(
+    "--refresh-resolution",
+    is_flag=True,
+    help="Resolve dependencies again instead of reusing previously resolved versions.",
+)
+@click.option(
+    "--paranoid",
+    is_flag=True,
+    help="Hash all cached files instead of trusting their size and modification time.",
+)
+@click.option(
+    "--lock-timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_LOCK_TIMEOUT_SECONDS,
+    show_default=True,
+    envvar="LAMBDA_LIFT_LOCK_TIMEOUT",
+    help="Seconds to wait for other processes building the same lambdas.",
+)
+@click.option(
+    "--shared-cache",
+    type=str,
+    envvar="LAMBDA_LIFT_SHARED_CACHE",
+    help="Local directory or s3:// URL of the shared dependency cache, "
+    "overriding shared_cache of the configs.",
+)
+@click.option(
+    "--fast",
+    is_flag=True,
+    help="Use the fastest compression level. Intended for local development builds.",
+)
+@_discovery_options
+def build(
+    lambdas: list[str],
+    deploy: list[str],
+    deploy_all: list[str],
+    jobs: int,
+    deploy_jobs: int,
+    async_deploy: bool,
+    refresh_resolution: bool,
+    paranoid: bool,
+    lock_timeout: float,
+    shared_cache: str | None,
+    fast: bool,
+    discovery: DiscoveryConfig,
+) -> None:
+    """
+    Packages the given lambdas, or all lambdas, and optionally deploys them.
+    """
     start_time = time.monotonic()
-    try:
+    with _handle_errors():
         # Validate arguments
         if not lambdas and deploy:
             raise click.BadOptionUsage("--deploy", "You must specify lambdas to deploy")
@@ -39,34 +226,160 @@ def cli_main(lambdas: list[str], deploy: list[str], deploy_all: list[str]) -> No
             )
         deploy_profiles = deploy or deploy_all
         # Load configs
-        with get_console().status("[blue]Reading configs..."):
-            registry = ConfigsRegistry(Path.cwd())
-            rich_print(
-                f"[yellow]Found {len(registry)} config{'s' if len(registry) != 1 else ''}"
-            )
-            for lambda_name in lambdas:
-                if lambda_name not in registry.names:
-                    raise click.NoSuchOption(
-                        "lambdas",
-                        f"No such lambda: {lambda_name}",
-                        possibilities=list(registry.names),
-                    )
-            all_lambdas = lambdas or list(registry.names)
+        configs = _load_configs(lambdas, discovery)
+        if fast:
+            configs = [
+                replace(
+                    config,
+                    build=replace(config.build, fast_compression=True),
+                )
+                for config in configs
+            ]
+        if shared_cache is not None:
+            configs = [
+                replace(config, build=replace(config.build, shared_cache=shared_cache))
+                for config in configs
+            ]
         # Build all lambdas
-        for lambda_name in all_lambdas:
-            package_lambda(registry.get(lambda_name))
+        if jobs > 1 and len(configs) > 1:
+            package_lambdas_in_parallel(
+                configs,
+                jobs,
+                refresh_resolution=refresh_resolution,
+                paranoid=paranoid,
+                lock_timeout=lock_timeout,
+            )
+        else:
+            for config in configs:
+                package_lambda(
+                    config,
+                    refresh_resolution=refresh_resolution,
+                    paranoid=paranoid,
+                    lock_timeout=lock_timeout,
+                )
         # Deploy as needed
-        for profile in deploy_profiles:
-            for lambda_name in all_lambdas:
-                deploy_lambda(registry.get(lambda_name), profile)
+        if deploy_profiles:
+            outcomes = deploy_lambdas(
+                configs,
+                deploy_profiles,
+                jobs=deploy_jobs,
+                asynchronous=async_deploy,
+            )
+            print_deploy_summary(outcomes)
         # Print stats
         elapsed_time = time.monotonic() - start_time
         rich_print(f"[green]Completed in {elapsed_time:.2f} seconds")
-    except UserError as ex:
-        rich_print(f"[red]{str(ex)}")
-        sys.exit(2)
-    except click.ClickException:
-        raise
-    except Exception:
-        get_console().print_exception(show_locals=False)
-        sys.exit(1)
+
+
+@cli_main.command()
+@click.argument("lambdas", nargs=-1, type=str)
+@_discovery_options
+def size(lambdas: list[str], discovery: DiscoveryConfig) -> None:
+    """
+    Reports the size of built artifacts by package, their largest files and the
+    changes since the previous build. Artifacts are not rebuilt.
+    """
+    with _handle_errors():
+        for config in _load_configs(lambdas, discovery):
+            if not config.build.destination_path.exists():
+                raise UserError(
+                    f"{config.name} has not been built yet, run lambda-lift "
+                    f"{config.name} first"
+                )
+            report = get_size_report(config.build.destination_path)
+            print_size_report(config, report, get_previous_size_report(config, report))
+
+
+@cli_main.group("cache")
+def cache_group() -> None:
+    """
+    Moves entries of the shared dependency cache between machines.
+    """
+
+
+@cache_group.command("export")
+@click.argument("archive", type=click.Path(dir_okay=False, path_type=Path))
+@click.argument("lambdas", nargs=-1, type=str)
+@_discovery_options
+def cache_export(archive: Path, lambdas: list[str], discovery: DiscoveryConfig) -> None:
+    """
+    Bundles the built dependencies of the given lambdas, or of all lambdas, into
+    ARCHIVE, e.g. to bake them into CI images. Dependencies are not rebuilt.
+    """
+    with _handle_errors():
+        entries = collect_cache_entries(_load_configs(lambdas, discovery))
+        export_cache_archive(archive, entries)
+        rich_print(
+            f"[green]Exported {len(entries)} entr{'ies' if len(entries) != 1 else 'y'} "
+            f"to {archive}"
+        )
+
+
+@cache_group.command("import")
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--shared-cache",
+    required=True,
+    type=str,
+    envvar="LAMBDA_LIFT_SHARED_CACHE",
+    help="Local directory or s3:// URL of the shared dependency cache to fill.",
+)
+def cache_import(archive: Path, shared_cache: str) -> None:
+    """
+    Adds the entries of ARCHIVE, created by cache export, to a shared cache.
+    """
+    with _handle_errors():
+        keys = import_cache_archive(archive, get_cache_backend(shared_cache))
+        rich_print(
+            f"[green]Imported {len(keys)} entr{'ies' if len(keys) != 1 else 'y'} "
+            f"into {shared_cache}"
+        )
+
+
+@cli_main.command("bench-coldstart")
+@click.argument("lambda_name", type=str)
+@click.option(
+    "--handler",
+    required=True,
+    type=str,
+    help="The handler of the function, e.g. main.lambda_handler.",
+)
+@click.option(
+    "--runs",
+    "-n",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of cold starts to measure.",
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="A zip file to compare against, e.g. an earlier build of the lambda.",
+)
+@_discovery_options
+def bench_coldstart_command(
+    lambda_name: str,
+    handler: str,
+    runs: int,
+    compare: Path | None,
+    discovery: DiscoveryConfig,
+) -> None:
+    """
+    Builds the lambda and measures how long importing its handler takes in fresh
+    interpreter processes. Only works on hosts with the lambda's architecture.
+    """
+    with _handle_errors():
+        (config,) = _load_configs([lambda_name], discovery)
+        check_host_platform(config)
+        package_lambda(config)
+        artifact_paths = [config.build.destination_path]
+        if compare is not None:
+            artifact_paths.insert(0, compare)  # The baseline comes first
+        results = []
+        for artifact_path in artifact_paths:
+            with get_console().status(f"[blue]Benchmarking {artifact_path}..."):
+                results.append(
+                    bench_coldstart(config, artifact_path, handler=handler, runs=runs)
+                )
+        print_coldstart_results(config, results)
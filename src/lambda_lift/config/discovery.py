@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Sequence
+
+from lambda_lift.config.exceptions import DiscoveryException
+from lambda_lift.config.file_matching import TOML_FILE_NAME_RE
+from lambda_lift.utils.git import find_git_root
+
+# Directories that never contain configs but may contain lots of files.
+# Hidden directories (.git, .venv, ...) are skipped as well.
+DEFAULT_EXCLUDES = ("node_modules", "__pycache__", "site-packages", "cdk.out")
+
+
+@dataclass(frozen=True)
+class DiscoveryConfig:
+    """
+    Controls where configs are searched for. excludes are glob patterns matched
+    against directory names and paths relative to the root. If use_git_index is
+    set, candidates are listed by git (tracked files and untracked files that
+    aren't ignored) instead of walking the directory tree.
+    """
+
+    excludes: Sequence[str] = ()
+    use_git_index: bool = False
+
+
+@dataclass(frozen=True)
+class _IgnoreRule:
+    base_path: Path
+    regex: re.Pattern[str]
+    negated: bool
+    dir_only: bool
+
+    def match(self, path: Path, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        rel_path = path.relative_to(self.base_path).as_posix()
+        return self.regex.fullmatch(rel_path) is not None
+
+
+def _translate_glob(pattern: str) -> str:
+    result = []
+    idx = 0
+    while idx < len(pattern):
+        if pattern.startswith("**/", idx):
+            result.append("(?:.*/)?")
+            idx += 3
+        elif pattern.startswith("**", idx):
+            result.append(".*")
+            idx += 2
+        elif pattern[idx] == "*":
+            result.append("[^/]*")
+            idx += 1
+        elif pattern[idx] == "?":
+            result.append("[^/]")
+            idx += 1
+        elif pattern[idx] == "[" and "]" in pattern[idx + 2 :]:
+            end = pattern.index("]", idx + 2)
+            result.append("[" + pattern[idx + 1 : end].replace("!", "^", 1) + "]")
+            idx = end + 1
+        else:
+            if pattern[idx] == "\\" and idx + 1 < len(pattern):
+                idx += 1
+            result.append(re.escape(pattern[idx]))
+            idx += 1
+    return "".join(result)
+
+
+def _parse_gitignore_line(base_path: Path, line: str) -> _IgnoreRule | None:
+    line = line.rstrip("\n")
+    # Trailing spaces are ignored unless escaped
+    if not line.endswith("\\ "):
+        line = line.rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    line = line.removeprefix("!")
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # Patterns with a slash other than a trailing one are relative to base_path
+    anchored = "/" in line
+    regex = _translate_glob(line.removeprefix("/"))
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return _IgnoreRule(base_path, re.compile(regex), negated, dir_only)
+
+
+def _read_gitignore(dir_path: Path) -> tuple[_IgnoreRule, ...]:
+    try:
+        lines = (dir_path / ".gitignore").read_text().splitlines()
+    except (FileNotFoundError, NotADirectoryError, UnicodeDecodeError):
+        return ()
+    rules = (_parse_gitignore_line(dir_path, line) for line in lines)
+    return tuple(rule for rule in rules if rule is not None)
+
+
+def _is_ignored(rules: Sequence[_IgnoreRule], path: Path, is_dir: bool) -> bool:
+    # The last matching rule wins; deeper .gitignore files come later
+    for rule in reversed(rules):
+        if rule.match(path, is_dir):
+            return not rule.negated
+    return False
+
+
+def _is_excluded(rel_path: PurePosixPath, excludes: Sequence[str]) -> bool:
+    """
+    Returns True if the directory at rel_path (relative to the root) is hidden
+    or matches an exclude pattern. Its parents aren't checked.
+    """
+    if rel_path.name.startswith("."):
+        return True
+    return any(
+        fnmatchcase(rel_path.name, pattern) or fnmatchcase(rel_path.as_posix(), pattern)
+        for pattern in excludes
+    )
+
+
+class _Walker:
+    def __init__(self, root_path: Path, excludes: Sequence[str]) -> None:
+        self.root_path = root_path.absolute()
+        self.excludes = excludes
+        self.result: list[Path] = []
+
+    def _get_parent_rules(self) -> tuple[_IgnoreRule, ...]:
+        # .gitignore files above the root apply too, up to the repository root
+        git_root = find_git_root(self.root_path)
+        if git_root is None:
+            return ()
+        rules: tuple[_IgnoreRule, ...] = ()
+        for parent in reversed(self.root_path.parents):
+            if parent.is_relative_to(git_root):
+                rules += _read_gitignore(parent)
+        return rules
+
+    def walk(self) -> list[Path]:
+        self._walk_dir(self.root_path, PurePosixPath(), self._get_parent_rules())
+        return sorted(self.result)
+
+    def _walk_dir(
+        self, dir_path: Path, rel_path: PurePosixPath, rules: tuple[_IgnoreRule, ...]
+    ) -> None:
+        rules += _read_gitignore(dir_path)
+        try:
+            with os.scandir(dir_path) as entries:
+                entries_list = sorted(entries, key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return
+        for entry in entries_list:
+            path = dir_path / entry.name
+            # Symlinked directories aren't followed, so cycles are impossible
+            if entry.is_dir(follow_symlinks=False):
+                child_rel_path = rel_path / entry.name
+                if _is_excluded(child_rel_path, self.excludes):
+                    continue
+                if _is_ignored(rules, path, is_dir=True):
+                    continue
+                self._walk_dir(path, child_rel_path, rules)
+            elif TOML_FILE_NAME_RE.match(entry.name) and entry.is_file():
+                if not _is_ignored(rules, path, is_dir=False):
+                    self.result.append(path)
+
+
+def _list_git_files(root_path: Path, excludes: Sequence[str]) -> list[Path]:
+    try:
+        output = subprocess.run(
+            [
+                "git",
+                "ls-files",
+                "-z",
+                "--cached",
+                "--others",
+                "--exclude-standard",
+                "--",
+                "*lambda-lift*.toml",
+            ],
+            capture_output=True,
+            check=True,
+            cwd=root_path,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as ex:
+        stderr = getattr(ex, "stderr", None) or b""
+        raise DiscoveryException(
+            f"Failed to list files in the git index at {root_path}: "
+            f"{ex} {stderr.decode(errors='replace')}"
+        ) from ex
+    result = set()
+    for raw_path in output.split(b"\0"):
+        if not raw_path:
+            continue
+        rel_path = PurePosixPath(os.fsdecode(raw_path))
+        if not TOML_FILE_NAME_RE.match(rel_path.name):
+            continue
+        parents = list(rel_path.parents)[:-1]  # Without "."
+        if any(_is_excluded(parent, excludes) for parent in parents):
+            continue
+        path = root_path / rel_path
+        # Deleted files are still listed until the deletion is staged
+        if path.is_file():
+            result.add(path)
+    return sorted(result)
+
+
+def find_config_paths(root_path: Path, discovery: DiscoveryConfig) -> list[Path]:
+    """
+    Returns the paths of all config files under root_path in a stable order.
+    Hidden and excluded directories, as well as paths ignored by .gitignore
+    files, are pruned without being listed.
+    """
+    excludes = (*DEFAULT_EXCLUDES, *discovery.excludes)
+    if discovery.use_git_index:
+        return _list_git_files(root_path, excludes)
+    return _Walker(root_path, excludes).walk()
@@ -6,3 +6,8 @@ from enum import Enum
 class Platform(Enum):
     ARM64 = "arm64"
     X86 = "x86"
+
+
+class TrimProfile(Enum):
+    SAFE = "safe"
+    AGGRESSIVE = "aggressive"
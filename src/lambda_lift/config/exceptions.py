@@ -11,8 +11,17 @@ class ConfigException(UserError): ...
 class InvalidConfigException(ConfigException):
     def __init__(self, toml_path: Path, message: str) -> None:
         super().__init__(f"Invalid config at {toml_path}: {message}")
+        self.toml_path = toml_path
+        self.message = message
+
+    def __reduce__(self) -> tuple:
+        # Configs are parsed in worker processes, so errors must survive pickling
+        return type(self), (self.toml_path, self.message)
 
 
 class NameCollisionException(ConfigException):
     def __init__(self, message: str) -> None:
         super().__init__(message)
+
+
+class DiscoveryException(ConfigException): ...
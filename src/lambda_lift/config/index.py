@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import importlib.metadata
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, is_dataclass
+from pathlib import Path
+from typing import Any, Sequence
+
+from lambda_lift.config import single_lambda
+from lambda_lift.config.parser import SingleLambdaConfigParser
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.exceptions import UserError
+from lambda_lift.utils.fs import atomic_output_path, get_user_cache_path
+from lambda_lift.utils.hashing import get_string_blake2b
+
+_INDEX_VERSION = 1
+# Below this number of changed configs, starting worker processes costs more
+# than parsing the configs in place
+_PARALLEL_PARSE_THRESHOLD = 16
+
+
+@dataclass(frozen=True)
+class ParsedConfig:
+    """
+    The result of parsing a config file. error is set if the config has a valid
+    name but is otherwise invalid; it is raised once the config is requested.
+    """
+
+    toml_path: Path
+    name: str
+    config: SingleLambdaConfig | None
+    error: UserError | None = None
+
+
+@dataclass(frozen=True)
+class _IndexEntry:
+    mtime_ns: int
+    size: int
+    config: SingleLambdaConfig
+
+
+def _get_schema() -> list[Any]:
+    """
+    Returns the fields of all config dataclasses, so that configs pickled by
+    a version of lambda-lift with different fields aren't loaded.
+    """
+    return [
+        [cls.__name__, *(field.name for field in fields(cls))]
+        for cls in vars(single_lambda).values()
+        if isinstance(cls, type)
+        and is_dataclass(cls)
+        and cls.__module__ == single_lambda.__name__
+    ]
+
+
+def _get_package_version() -> str | None:
+    """
+    The parser may change without changing the fields, e.g. in how paths are
+    resolved, so configs parsed by another release aren't loaded either.
+    """
+    try:
+        return importlib.metadata.version("lambda-lift")
+    except importlib.metadata.PackageNotFoundError:
+        return None  # Running from a source tree
+
+
+def _get_home_path() -> str:
+    # Paths starting with ~ are stored expanded
+    return str(Path("~").expanduser())
+
+
+def get_index_path(root_path: Path) -> Path:
+    """
+    Returns the location of the index of configs discovered from root_path.
+    """
+    root_hash = get_string_blake2b(str(root_path.absolute()))
+    return get_user_cache_path() / "registry" / f"{root_hash[:32]}.pickle"
+
+
+def _parse_config(toml_path: Path) -> ParsedConfig:
+    parser = SingleLambdaConfigParser(toml_path)
+    name = parser.name  # An invalid name fails the whole registry
+    try:
+        return ParsedConfig(toml_path, name, parser.parsed)
+    except UserError as ex:
+        return ParsedConfig(toml_path, name, None, ex)
+
+
+def parse_configs(toml_paths: Sequence[Path]) -> list[ParsedConfig]:
+    if len(toml_paths) < _PARALLEL_PARSE_THRESHOLD:
+        return [_parse_config(path) for path in toml_paths]
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 8)) as executor:
+        return list(executor.map(_parse_config, toml_paths, chunksize=8))
+
+
+def _is_dir_or_missing(path: Path | None) -> bool:
+    return path is None or not path.exists() or path.is_dir()
+
+
+def _is_still_valid(config: SingleLambdaConfig) -> bool:
+    """
+    Repeats the checks of the parser that depend on other files than the config.
+    The location of the git root used by the git_root placeholder isn't
+    rechecked: for a config at the same path, it only changes if a repository
+    is created or removed around it.
+    """
+    build = config.build
+    if not all(path.is_dir() for path in build.source_paths):
+        return False
+    if build.requirements_path is not None and not build.requirements_path.exists():
+        return False
+    if build.destination_path.is_dir():
+        return False
+    local_shared_cache = (
+        Path(build.shared_cache)
+        if build.shared_cache is not None and not build.shared_cache.startswith("s3://")
+        else None
+    )
+    return all(
+        _is_dir_or_missing(path)
+        for path in (
+            build.cache_path,
+            build.package_store,
+            build.pip_cache_path,
+            build.wheelhouse_path,
+            local_shared_cache,
+        )
+    )
+
+
+class ConfigsIndex:
+    """
+    An on-disk cache of parsed configs keyed by their paths. Entries are reused
+    while the size and mtime of the config file stay the same, so only new and
+    modified configs are parsed.
+    """
+
+    def __init__(self, index_path: Path) -> None:
+        self.index_path = index_path
+
+    def _load(self) -> dict[str, _IndexEntry]:
+        try:
+            with self.index_path.open("rb") as f:
+                index = pickle.load(f)
+        except Exception:
+            return {}  # Missing, corrupt, or written by an incompatible version
+        if not isinstance(index, dict) or index.get("version") != _INDEX_VERSION:
+            return {}
+        if index.get("package_version") != _get_package_version():
+            return {}
+        if index.get("home_path") != _get_home_path():
+            return {}
+        if index.get("schema") != _get_schema():
+            return {}
+        return index["entries"]
+
+    def _save(self, entries: dict[str, _IndexEntry]) -> None:
+        try:
+            with atomic_output_path(self.index_path) as temp_path:
+                with temp_path.open("wb") as f:
+                    index = {
+                        "version": _INDEX_VERSION,
+                        "package_version": _get_package_version(),
+                        "home_path": _get_home_path(),
+                        "schema": _get_schema(),
+                        "entries": entries,
+                    }
+                    pickle.dump(index, f)
+        except OSError:
+            pass  # The index is only an optimization
+
+    def parse(self, toml_paths: Sequence[Path]) -> list[ParsedConfig]:
+        """
+        Returns the parsed configs in the order of toml_paths, parsing changed
+        configs in parallel.
+        """
+        entries = self._load()
+        results: dict[Path, ParsedConfig] = {}
+        new_entries: dict[str, _IndexEntry] = {}
+        stale_paths: list[Path] = []
+        stats = {path: path.stat() for path in toml_paths}
+        for path in toml_paths:
+            entry = entries.get(str(path))
+            if (
+                entry is not None
+                and entry.mtime_ns == stats[path].st_mtime_ns
+                and entry.size == stats[path].st_size
+                and _is_still_valid(entry.config)
+            ):
+                results[path] = ParsedConfig(path, entry.config.name, entry.config)
+                new_entries[str(path)] = entry
+            else:
+                stale_paths.append(path)
+        for parsed in parse_configs(stale_paths):
+            results[parsed.toml_path] = parsed
+            if parsed.config is not None:
+                stat = stats[parsed.toml_path]
+                new_entries[str(parsed.toml_path)] = _IndexEntry(
+                    stat.st_mtime_ns, stat.st_size, parsed.config
+                )
+        if new_entries.keys() != entries.keys() or stale_paths:
+            self._save(new_entries)
+        return [results[path] for path in toml_paths]
@@ -6,13 +6,16 @@ from functools import cached_property
 from pathlib import Path
 from typing import Sequence, Any, Mapping, Iterator
 
-from lambda_lift.config.enums import Platform
+from lambda_lift.config.enums import Platform, TrimProfile
 from lambda_lift.config.exceptions import InvalidConfigException
 from lambda_lift.config.file_matching import TOML_FILE_NAME_RE
 from lambda_lift.config.single_lambda import (
     SingleLambdaConfig,
     BuildConfig,
+    CompressionConfig,
     DeploymentConfig,
+    SizeBudget,
+    TrimConfig,
 )
 from lambda_lift.utils.git import find_git_root
 
@@ -114,7 +117,7 @@ class SingleLambdaConfigParser:
 
     # Build
 
-    @property
+    @cached_property
     def build(self) -> BuildConfig:
         return BuildConfig(
             source_paths=self.source_paths,
@@ -124,9 +127,21 @@ class SingleLambdaConfigParser:
             platform=self.platform,
             python_executable=self.python_executable,
             ignore_libraries=self.ignore_libraries,
+            package_store=self.package_store,
+            pip_cache_path=self.pip_cache_path,
+            wheelhouse_path=self.wheelhouse_path,
+            offline=self.offline,
+            shared_cache=self.shared_cache,
+            compression=self.compression,
+            precompile=self.precompile,
+            precompile_optimization=self.precompile_optimization,
+            trim=self.trim,
+            strip_debug=self.strip_debug,
+            strip_tool=self.strip_tool,
+            size_budget=self.size_budget,
         )
 
-    @property
+    @cached_property
     def source_paths(self) -> list[Path]:
         source_paths = self.get_toml_list_of_strings("build", "source_paths")
         if source_paths is None:
@@ -145,11 +160,11 @@ class SingleLambdaConfigParser:
             raise InvalidConfigException(self.toml_path, "source_paths can't be empty")
         return result
 
-    @property
+    @cached_property
     def requirements_path(self) -> Path | None:
         return self.get_toml_path("build", "requirements_path", must_exist=True)
 
-    @property
+    @cached_property
     def destination_path(self) -> Path:
         result = self.get_toml_path("build", "destination_path", must_exist=False)
         if result is None:
@@ -160,7 +175,7 @@ class SingleLambdaConfigParser:
             )
         return result
 
-    @property
+    @cached_property
     def cache_path(self) -> Path:
         result = self.get_toml_path("build", "cache_path", must_exist=False)
         if result is None:
@@ -171,7 +186,7 @@ class SingleLambdaConfigParser:
             )
         return result
 
-    @property
+    @cached_property
     def platform(self) -> Platform:
         platform_str = self.get_toml_string("build", "platform")
         if platform_str is None:
@@ -183,14 +198,149 @@ class SingleLambdaConfigParser:
                 self.toml_path, f"Unknown platform {platform_str}"
             )
 
-    @property
+    @cached_property
     def python_executable(self) -> str | None:
         return self.get_toml_string("build", "python_executable")
 
-    @property
+    @cached_property
     def ignore_libraries(self) -> set[str]:
         return set(self.get_toml_list_of_strings("build", "ignore_libraries") or ())
 
+    @cached_property
+    def package_store(self) -> Path | None:
+        result = self.get_toml_path("build", "package_store", must_exist=False)
+        if result is not None and result.exists() and not result.is_dir():
+            raise InvalidConfigException(
+                self.toml_path, f"Package store {result} must be a directory"
+            )
+        return result
+
+    @cached_property
+    def pip_cache_path(self) -> Path | None:
+        result = self.get_toml_path("build", "pip_cache_path", must_exist=False)
+        if result is not None and result.exists() and not result.is_dir():
+            raise InvalidConfigException(
+                self.toml_path, f"pip cache path {result} must be a directory"
+            )
+        return result
+
+    @cached_property
+    def wheelhouse_path(self) -> Path | None:
+        result = self.get_toml_path("build", "wheelhouse_path", must_exist=False)
+        if result is not None and result.exists() and not result.is_dir():
+            raise InvalidConfigException(
+                self.toml_path, f"Wheelhouse path {result} must be a directory"
+            )
+        return result
+
+    @cached_property
+    def offline(self) -> bool:
+        result = self.get_toml_bool("build", "offline") or False
+        if result and self.wheelhouse_path is None:
+            raise InvalidConfigException(
+                self.toml_path, "offline requires wheelhouse_path to be set"
+            )
+        return result
+
+    @cached_property
+    def shared_cache(self) -> str | None:
+        value = self.get_toml_string("build", "shared_cache")
+        if value is None:
+            return None
+        if value.startswith("s3://"):
+            value = self.augment_value(value, "build.shared_cache")
+            if re.match(r"^s3://[^/]+(?:/.*|$)", value) is None:
+                raise InvalidConfigException(
+                    self.toml_path,
+                    "Invalid shared_cache. Expected format s3://bucket_name/prefix/ "
+                    "or a local directory",
+                )
+            return value
+        result = self.resolve_path(value, field="build.shared_cache")
+        if result.exists() and not result.is_dir():
+            raise InvalidConfigException(
+                self.toml_path, f"Shared cache {result} must be a directory"
+            )
+        return str(result)
+
+    @cached_property
+    def compression(self) -> CompressionConfig:
+        level = self.get_toml_int("build", "compression_level")
+        if level is not None and not 0 <= level <= 9:
+            raise InvalidConfigException(
+                self.toml_path, "compression_level must be between 0 and 9"
+            )
+        store_threshold = self.get_toml_float("build", "store_threshold")
+        if store_threshold is not None and not 0 < store_threshold <= 1:
+            raise InvalidConfigException(
+                self.toml_path, "store_threshold must be between 0 and 1"
+            )
+        return CompressionConfig(
+            level=level,
+            store_patterns=tuple(
+                self.get_toml_list_of_strings("build", "store_patterns") or ()
+            ),
+            store_threshold=store_threshold,
+        )
+
+    @cached_property
+    def precompile(self) -> bool:
+        return self.get_toml_bool("build", "precompile") or False
+
+    @cached_property
+    def precompile_optimization(self) -> int:
+        result = self.get_toml_int("build", "precompile_optimization") or 0
+        if result not in (0, 1, 2):
+            raise InvalidConfigException(
+                self.toml_path, "precompile_optimization must be 0, 1 or 2"
+            )
+        return result
+
+    @cached_property
+    def trim(self) -> TrimConfig:
+        profile_str = self.get_toml_string("build", "trim")
+        try:
+            profile = TrimProfile(profile_str) if profile_str is not None else None
+        except ValueError:
+            raise InvalidConfigException(
+                self.toml_path, f"Unknown trim profile {profile_str}"
+            )
+        excludes_table = self.get_toml_value("build", "trim_excludes") or {}
+        if not isinstance(excludes_table, dict):
+            raise InvalidConfigException(
+                self.toml_path, "Expected table at build.trim_excludes"
+            )
+        excludes = {
+            name: tuple(
+                self.get_toml_list_of_strings("build", "trim_excludes", name) or ()
+            )
+            for name in excludes_table
+        }
+        return TrimConfig(profile=profile, excludes=excludes)
+
+    @cached_property
+    def strip_debug(self) -> bool:
+        return self.get_toml_bool("build", "strip_debug") or False
+
+    @cached_property
+    def strip_tool(self) -> str | None:
+        return self.get_toml_string("build", "strip_tool")
+
+    def _get_size_limit(self, field: str) -> int | None:
+        value_mb = self.get_toml_float("build", field)
+        if value_mb is None:
+            return None
+        if value_mb <= 0:
+            raise InvalidConfigException(self.toml_path, f"{field} must be positive")
+        return int(value_mb * 2**20)
+
+    @cached_property
+    def size_budget(self) -> SizeBudget:
+        return SizeBudget(
+            max_zipped_size=self._get_size_limit("max_zipped_size_mb"),
+            max_unzipped_size=self._get_size_limit("max_unzipped_size_mb"),
+        )
+
     # Deployment
 
     def get_deployment(self, profile: str) -> DeploymentConfig:
@@ -199,6 +349,12 @@ class SingleLambdaConfigParser:
             name=self.get_deployment_lambda_name(profile),
             s3_path=self.get_s3_path(profile),
             aws_profile=self.get_deployment_aws_profile(profile),
+            dependencies_layer=self.get_dependencies_layer(profile),
+            staging_s3_path=self.get_staging_s3_path(profile),
+            s3_part_size=self.get_s3_part_size(profile),
+            s3_upload_concurrency=self.get_s3_upload_concurrency(profile),
+            publish_version=self.get_publish_version(profile),
+            alias=self.get_alias(profile),
         )
 
     @cached_property
@@ -228,15 +384,21 @@ class SingleLambdaConfigParser:
         return result
 
     def get_s3_path(self, profile: str) -> tuple[str, str] | None:
-        result = self.get_toml_string("deployment", profile, "s3_url")
+        return self.get_deployment_s3_url(profile, "s3_url")
+
+    def get_staging_s3_path(self, profile: str) -> tuple[str, str] | None:
+        return self.get_deployment_s3_url(profile, "staging_s3_url")
+
+    def get_deployment_s3_url(self, profile: str, key: str) -> tuple[str, str] | None:
+        result = self.get_toml_string("deployment", profile, key)
         if result is None:
             return None
-        result = self.augment_value(result, f"deployment.{profile}.s3_url")
+        result = self.augment_value(result, f"deployment.{profile}.{key}")
         match = re.match(r"^s3://([^/]+)(?:/(.*)|$)", result)
         if match is None:
             raise InvalidConfigException(
                 self.toml_path,
-                f"Invalid s3_url for deployment profile {profile}. "
+                f"Invalid {key} for deployment profile {profile}. "
                 f"Expected format s3://bucket_name/path/to/deployment/directory/.",
             )
         bucket = match.group(1)
@@ -248,6 +410,69 @@ class SingleLambdaConfigParser:
     def get_deployment_aws_profile(self, profile: str) -> str | None:
         return self.get_toml_string("deployment", profile, "aws_profile")
 
+    def get_s3_part_size(self, profile: str) -> int | None:
+        result = self.get_toml_int("deployment", profile, "s3_part_size_mb")
+        if result is None:
+            return None
+        # S3 multipart uploads require parts of at least 5 MiB
+        if result < 5:
+            raise InvalidConfigException(
+                self.toml_path,
+                f"s3_part_size_mb for deployment profile {profile} must be at least 5",
+            )
+        return result * 2**20
+
+    def get_s3_upload_concurrency(self, profile: str) -> int | None:
+        result = self.get_toml_int("deployment", profile, "s3_upload_concurrency")
+        if result is not None and result < 1:
+            raise InvalidConfigException(
+                self.toml_path,
+                f"s3_upload_concurrency for deployment profile {profile} must be "
+                f"positive",
+            )
+        return result
+
+    def get_dependencies_layer(self, profile: str) -> str | None:
+        result = self.get_toml_string("deployment", profile, "dependencies_layer")
+        if result is None:
+            return None
+        result = self.augment_value(result, f"deployment.{profile}.dependencies_layer")
+        if not re.match(r"^[a-zA-Z0-9_-]{1,140}$", result):
+            raise InvalidConfigException(
+                self.toml_path,
+                f"Invalid dependencies_layer {result} for deployment profile {profile}. "
+                f"Must be a layer name consisting of english alphanumeric characters, "
+                f"underscores and hyphens",
+            )
+        return result
+
+    def get_alias(self, profile: str) -> str | None:
+        result = self.get_toml_string("deployment", profile, "alias")
+        if result is None:
+            return None
+        result = self.augment_value(result, f"deployment.{profile}.alias")
+        # Aliases can't look like version numbers
+        if not re.match(r"^[a-zA-Z0-9_-]{1,128}$", result) or result.isdigit():
+            raise InvalidConfigException(
+                self.toml_path,
+                f"Invalid alias {result} for deployment profile {profile}. "
+                f"Must consist of english alphanumeric characters, underscores and "
+                f"hyphens, and must not be a number",
+            )
+        return result
+
+    def get_publish_version(self, profile: str) -> bool:
+        result = self.get_toml_bool("deployment", profile, "publish_version")
+        if self.get_alias(profile) is None:
+            return bool(result)
+        # An alias points to a published version
+        if result is False:
+            raise InvalidConfigException(
+                self.toml_path,
+                f"alias for deployment profile {profile} requires publish_version",
+            )
+        return True
+
     # TOML extraction helpers
 
     def augment_value(
@@ -265,8 +490,9 @@ class SingleLambdaConfigParser:
         )
 
     def resolve_path(self, value: str, *, field: str) -> Path:
-        return self.toml_path.parent / self.augment_value(
-            value, field, allow_git_root=True
+        return (
+            self.toml_path.parent
+            / Path(self.augment_value(value, field, allow_git_root=True)).expanduser()
         )
 
     def get_toml_value(self, *path: str) -> Any | None:
@@ -293,6 +519,37 @@ class SingleLambdaConfigParser:
             )
         return value
 
+    def get_toml_int(self, *path: str) -> int | None:
+        value = self.get_toml_value(*path)
+        if value is None:
+            return None
+        # bool is a subclass of int, but true/false aren't valid numbers here
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise InvalidConfigException(
+                self.toml_path, f"Expected integer at {'.'.join(path)}"
+            )
+        return value
+
+    def get_toml_float(self, *path: str) -> float | None:
+        value = self.get_toml_value(*path)
+        if value is None:
+            return None
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise InvalidConfigException(
+                self.toml_path, f"Expected number at {'.'.join(path)}"
+            )
+        return float(value)
+
+    def get_toml_bool(self, *path: str) -> bool | None:
+        value = self.get_toml_value(*path)
+        if value is None:
+            return None
+        if not isinstance(value, bool):
+            raise InvalidConfigException(
+                self.toml_path, f"Expected boolean at {'.'.join(path)}"
+            )
+        return value
+
     def get_toml_path(self, *path_parts: str, must_exist: bool = False) -> Path | None:
         value = self.get_toml_string(*path_parts)
         if value is None:
@@ -2,44 +2,67 @@ from __future__ import annotations
 
 from functools import cached_property
 from pathlib import Path
-from typing import Generator
+from typing import Collection, Generator
 
+from lambda_lift.config.discovery import DiscoveryConfig, find_config_paths
 from lambda_lift.config.exceptions import NameCollisionException
-from lambda_lift.config.file_matching import TOML_FILE_NAME_RE
-from lambda_lift.config.parser import SingleLambdaConfigParser
+from lambda_lift.config.index import ConfigsIndex, ParsedConfig, parse_configs
 from lambda_lift.config.single_lambda import (
     SingleLambdaConfig,
 )
 
 
 class ConfigsRegistry:
-    def __init__(self, root_path: Path) -> None:
+    def __init__(
+        self,
+        root_path: Path,
+        discovery: DiscoveryConfig = DiscoveryConfig(),
+        *,
+        index_path: Path | None = None,
+        reserved_names: Collection[str] = (),
+    ) -> None:
+        """
+        If index_path is given, parsed configs are cached there between runs.
+        Lambdas can't use reserved_names, e.g. names of CLI commands.
+        """
         self.root_path = root_path
+        self.discovery = discovery
+        self.index_path = index_path
+        self.reserved_names = reserved_names
 
     @property
-    def _config_paths(self) -> Generator[Path, None, None]:
-        for path in self.root_path.rglob("*.toml"):
-            if TOML_FILE_NAME_RE.match(path.name):
-                yield path
+    def _config_paths(self) -> list[Path]:
+        return find_config_paths(self.root_path, self.discovery)
 
     @cached_property
-    def _parsers(self) -> dict[str, SingleLambdaConfigParser]:
-        result: dict[str, SingleLambdaConfigParser] = {}
-        for path in self._config_paths:
-            parser = SingleLambdaConfigParser(path)
-            if parser.name in result:
+    def _configs(self) -> dict[str, ParsedConfig]:
+        if self.index_path is not None:
+            parsed_configs = ConfigsIndex(self.index_path).parse(self._config_paths)
+        else:
+            parsed_configs = parse_configs(self._config_paths)
+        result: dict[str, ParsedConfig] = {}
+        for parsed in parsed_configs:
+            if parsed.name in self.reserved_names:
                 raise NameCollisionException(
-                    f"Duplicate lambda name {parser.name} in {path} and {result[parser.name].toml_path}"
+                    f"Lambda name {parsed.name} in {parsed.toml_path} is reserved for a command, please rename the lambda"
                 )
-            result[parser.name] = parser
+            if parsed.name in result:
+                raise NameCollisionException(
+                    f"Duplicate lambda name {parsed.name} in {parsed.toml_path} and {result[parsed.name].toml_path}"
+                )
+            result[parsed.name] = parsed
         return result
 
     def __len__(self) -> int:
-        return len(self._parsers)
+        return len(self._configs)
 
     @property
     def names(self) -> Generator[str, None, None]:
-        yield from self._parsers.keys()
+        yield from self._configs.keys()
 
     def get(self, name: str) -> SingleLambdaConfig:
-        return self._parsers[name].parsed
+        parsed = self._configs[name]
+        if parsed.error is not None:
+            raise parsed.error
+        assert parsed.config is not None
+        return parsed.config
@@ -1,14 +1,88 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Mapping, Sequence, Collection
+from dataclasses import dataclass, field, replace
+from pathlib import Path, PurePosixPath
+from typing import Any, Mapping, Sequence, Collection
 
-from lambda_lift.config.enums import Platform
+from lambda_lift.config.enums import Platform, TrimProfile
 from lambda_lift.config.exceptions import InvalidConfigException
 from lambda_lift.utils.hashing import get_string_blake2b
 
+# Deflate level used by --fast builds
+_FAST_COMPRESSION_LEVEL = 1
+
+
+@dataclass(frozen=True)
+class CompressionConfig:
+    """
+    Controls how entries are compressed in the built zip files.
+    level is the deflate level (None for the zlib default). Entries matching
+    store_patterns are stored uncompressed. If store_threshold is set, entries
+    whose compressed size is above that fraction of their size are stored as well.
+    """
+
+    level: int | None = None
+    store_patterns: tuple[str, ...] = ()
+    store_threshold: float | None = None
+
+    @property
+    def is_default(self) -> bool:
+        return self == CompressionConfig()
+
+    @property
+    def fast(self) -> CompressionConfig:
+        """
+        The policy for quick local builds: the fastest deflate level and no
+        trial compression for the threshold check.
+        """
+        return replace(self, level=_FAST_COMPRESSION_LEVEL, store_threshold=None)
+
+    def is_stored(self, arcname: str) -> bool:
+        path = PurePosixPath(arcname)
+        return any(path.match(pattern) for pattern in self.store_patterns)
+
+    @property
+    def jsonable(self) -> dict:
+        return {
+            "level": self.level,
+            "store_patterns": list(self.store_patterns),
+            "store_threshold": self.store_threshold,
+        }
+
+
+@dataclass(frozen=True)
+class TrimConfig:
+    """
+    Controls which installed dependency files are removed before zipping.
+    excludes maps distribution names to glob patterns of their files.
+    """
+
+    profile: TrimProfile | None = None
+    excludes: Mapping[str, Sequence[str]] = field(default_factory=dict)
+
+    @property
+    def is_default(self) -> bool:
+        return self.profile is None and not self.excludes
+
+    @property
+    def jsonable(self) -> dict:
+        return {
+            "profile": self.profile.value if self.profile else None,
+            "excludes": {name: list(p) for name, p in self.excludes.items()},
+        }
+
+
+@dataclass(frozen=True)
+class SizeBudget:
+    """
+    Limits on the size of the built artifact in bytes, checked after every
+    build and before deploying. None means no limit besides the AWS quotas.
+    """
+
+    max_zipped_size: int | None = None
+    max_unzipped_size: int | None = None
+
 
 @dataclass(frozen=True)
 class BuildConfig:
@@ -19,10 +93,33 @@ class BuildConfig:
     platform: Platform
     python_executable: str | None
     ignore_libraries: Collection[str]
+    package_store: Path | None = None
+    # Where pip gets distributions from; these don't affect the built artifacts
+    pip_cache_path: Path | None = None
+    wheelhouse_path: Path | None = None
+    offline: bool = False
+    # Location of dependency zips shared between machines, either a local
+    # directory or an s3:// URL; entries are keyed by their inputs
+    shared_cache: str | None = None
+    compression: CompressionConfig = field(default_factory=CompressionConfig)
+    # Compresses source files with compression.fast. Cached dependencies keep
+    # the configured compression, so this isn't part of data_hash.
+    fast_compression: bool = False
+    precompile: bool = False
+    precompile_optimization: int = 0
+    trim: TrimConfig = field(default_factory=TrimConfig)
+    strip_debug: bool = False
+    strip_tool: str | None = None
+    # Only checked against the built artifacts
+    size_budget: SizeBudget = field(default_factory=SizeBudget)
+
+    @property
+    def source_compression(self) -> CompressionConfig:
+        return self.compression.fast if self.fast_compression else self.compression
 
     @property
     def data_hash(self) -> str:
-        jsonable_object = {
+        jsonable_object: dict[str, Any] = {
             "source_paths": [str(p) for p in self.source_paths],
             "requirements_path": str(self.requirements_path),
             "destination_path": str(self.destination_path),
@@ -31,6 +128,17 @@ class BuildConfig:
             "python_executable": self.python_executable,
             "ignore_libraries": sorted(self.ignore_libraries),
         }
+        # Optional fields are only hashed when set to keep existing caches valid
+        if self.package_store is not None:
+            jsonable_object["package_store"] = str(self.package_store)
+        if not self.compression.is_default:
+            jsonable_object["compression"] = self.compression.jsonable
+        if self.precompile:
+            jsonable_object["precompile_optimization"] = self.precompile_optimization
+        if not self.trim.is_default:
+            jsonable_object["trim"] = self.trim.jsonable
+        if self.strip_debug:
+            jsonable_object["strip_tool"] = self.strip_tool
         json_value = json.dumps(jsonable_object, sort_keys=True)
         return get_string_blake2b(json_value)
 
@@ -41,6 +149,12 @@ class DeploymentConfig:
     name: str
     s3_path: tuple[str, str] | None
     aws_profile: str | None
+    dependencies_layer: str | None = None
+    staging_s3_path: tuple[str, str] | None = None
+    s3_part_size: int | None = None
+    s3_upload_concurrency: int | None = None
+    publish_version: bool = False
+    alias: str | None = None
 
 
 @dataclass(frozen=True)
@@ -61,5 +175,12 @@ class SingleLambdaConfig:
                 )
             lambda_names[deployment.name] = profile
 
+    @property
+    def uses_dependencies_layer(self) -> bool:
+        return any(
+            deployment.dependencies_layer is not None
+            for deployment in self.deployments.values()
+        )
+
     def validate(self) -> None:
         self._validate_no_duplicate_lambda_names()
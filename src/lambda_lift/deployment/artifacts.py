@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import botocore.exceptions
+from boto3.s3.transfer import MB, TransferConfig
+
+from lambda_lift.config.single_lambda import DeploymentConfig
+from lambda_lift.deployment.clients import PooledSession
+from lambda_lift.deployment.exceptions import AwsError
+from lambda_lift.deployment.limits import MAX_DIRECT_UPLOAD_SIZE
+from lambda_lift.utils.cli_tools import rich_print
+
+# Same as the boto3 defaults
+_DEFAULT_PART_SIZE = 8 * MB
+_DEFAULT_UPLOAD_CONCURRENCY = 10
+
+
+@dataclass(frozen=True)
+class ArtifactHashes:
+    blake2b: str  # Used for S3 object keys
+    sha256: str  # Same format as CodeSha256 of Lambda functions
+
+
+_hashes_lock = threading.Lock()
+_hashes_cache: dict[tuple[Path, int, int], ArtifactHashes] = {}
+
+
+def get_artifact_hashes(path: Path) -> ArtifactHashes:
+    """
+    Computes both hashes of an artifact in a single pass. Results are kept for
+    the rest of the run, so an artifact deployed to several profiles is read once.
+    """
+    stat = path.stat()
+    key = (path.absolute(), stat.st_size, stat.st_mtime_ns)
+    with _hashes_lock:
+        if key in _hashes_cache:
+            return _hashes_cache[key]
+    blake2b_hasher = hashlib.blake2b()
+    sha256_hasher = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            blake2b_hasher.update(chunk)
+            sha256_hasher.update(chunk)
+    result = ArtifactHashes(
+        # Trailing == are trimmed the same way get_file_blake2b does it
+        blake2b=base64.urlsafe_b64encode(blake2b_hasher.digest())
+        .decode()
+        .replace("=", ""),
+        sha256=base64.b64encode(sha256_hasher.digest()).decode(),
+    )
+    with _hashes_lock:
+        _hashes_cache[key] = result
+    return result
+
+
+def get_transfer_config(deploy_config: DeploymentConfig) -> TransferConfig:
+    """
+    Multipart uploads stream the file from disk part by part, so memory usage
+    is bounded by part size times concurrency.
+    """
+    part_size = deploy_config.s3_part_size or _DEFAULT_PART_SIZE
+    return TransferConfig(
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=(
+            deploy_config.s3_upload_concurrency or _DEFAULT_UPLOAD_CONCURRENCY
+        ),
+    )
+
+
+def get_upload_s3_path(
+    deploy_config: DeploymentConfig, zip_path: Path
+) -> tuple[str, str] | None:
+    """
+    Returns the S3 location to upload the artifact to, or None if it should be
+    uploaded directly. Artifacts over the direct upload limit go through the
+    staging location when s3_url isn't set.
+    """
+    if deploy_config.s3_path is not None:
+        return deploy_config.s3_path
+    size = zip_path.stat().st_size
+    if size <= MAX_DIRECT_UPLOAD_SIZE:
+        return None
+    if deploy_config.staging_s3_path is None:
+        raise AwsError(
+            f"{zip_path} is {size} bytes, which exceeds the direct upload limit of "
+            f"{MAX_DIRECT_UPLOAD_SIZE} bytes. Set s3_url or staging_s3_url for "
+            f"function {deploy_config.name}"
+        )
+    rich_print(
+        f"[yellow]{zip_path.name} exceeds the direct upload limit, "
+        f"uploading via s3://{deploy_config.staging_s3_path[0]}"
+    )
+    return deploy_config.staging_s3_path
+
+
+def upload_artifact_to_s3(
+    *,
+    session: PooledSession,
+    deploy_config: DeploymentConfig,
+    zip_path: Path,
+    s3_path: tuple[str, str],
+) -> str:
+    """
+    Uploads the zip unless an object with the same content already exists.
+    Returns the key of the object.
+    """
+    s3_client = session.client("s3")
+    s3_bucket, s3_key_prefix = s3_path
+    s3_key = s3_key_prefix + f"{get_artifact_hashes(zip_path).blake2b}.zip"
+    try:
+        try:
+            s3_client.head_object(Bucket=s3_bucket, Key=s3_key)
+        except botocore.exceptions.ClientError as ex:
+            if ex.response["Error"]["Code"] != "404":
+                raise
+            s3_client.upload_file(
+                str(zip_path),
+                s3_bucket,
+                s3_key,
+                Config=get_transfer_config(deploy_config),
+            )
+    except botocore.exceptions.ClientError as ex:
+        raise AwsError(
+            f"Failed to upload code for {deploy_config.name} to S3: {ex}"
+        ) from ex
+    return s3_key
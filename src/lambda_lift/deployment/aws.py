@@ -1,24 +1,111 @@
 from __future__ import annotations
 
+import asyncio
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Mapping, Sequence
 
-import boto3
 import botocore.exceptions
+from rich import markup
+from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
 
-from lambda_lift.config.single_lambda import SingleLambdaConfig
-from lambda_lift.deployment.exceptions import AwsError
+from lambda_lift.config.single_lambda import SingleLambdaConfig, DeploymentConfig
+from lambda_lift.deployment.clients import AwsClientPool, PooledSession
+from lambda_lift.deployment.enums import DeployStatus
+from lambda_lift.deployment.exceptions import (
+    AwsError,
+    DeploymentError,
+    LayerLimitError,
+)
+from lambda_lift.deployment.limits import MAX_DIRECT_UPLOAD_SIZE, MAX_UNZIPPED_SIZE
+from lambda_lift.deployment.artifacts import (
+    get_artifact_hashes,
+    get_upload_s3_path,
+    upload_artifact_to_s3,
+)
+from lambda_lift.deployment.layers import (
+    check_layer_limits,
+    find_layer_version,
+    get_attached_layers,
+    get_layer_name,
+    publish_layer_version,
+    set_function_layers,
+    wait_for_function_update,
+)
+from lambda_lift.deployment.versions import (
+    publish_function_version,
+    wait_for_function_update_async,
+)
+from lambda_lift.packer.cache.state import (
+    get_dependencies_hash,
+    get_layer_zip_path,
+    get_source_zip_path,
+)
+from lambda_lift.packer.size_report import check_size_budget, get_size_report
+from lambda_lift.exceptions import UserError
 from lambda_lift.utils.cli_tools import get_console, rich_print
-from lambda_lift.utils.hashing import get_file_blake2b
+
+# Number of functions sharing an AWS profile and region starting from which
+# live code hashes are fetched with ListFunctions instead of one call per function.
+# ListFunctions pages through every function in the region (50 per page), so
+# in an account with many more functions than targets it can take more calls
+# than fetching the targets individually.
+_BULK_FETCH_THRESHOLD = 5
+# Threads for polling update statuses in addition to the deploying ones
+_POLL_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class DeployOutcome:
+    lambda_name: str
+    profile: str
+    function_name: str | None
+    status: DeployStatus
+    error: str | None = None
+    version: str | None = None
+
+
+def get_live_code_sha256(client: Any, function_name: str) -> str | None:
+    """
+    Returns CodeSha256 of the deployed function or None if it doesn't exist.
+    """
+    try:
+        response = client.get_function_configuration(FunctionName=function_name)
+    except botocore.exceptions.ClientError as ex:
+        if ex.response["Error"]["Code"] == "ResourceNotFoundException":
+            return None
+        raise AwsError(f"Failed to read configuration of {function_name}: {ex}") from ex
+    return response.get("CodeSha256")
+
+
+def fetch_live_code_hashes(session: PooledSession) -> dict[str, str]:
+    """
+    Returns CodeSha256 of all functions visible to the session, by function name.
+    """
+    client = session.client("lambda")
+    result: dict[str, str] = {}
+    try:
+        for page in client.get_paginator("list_functions").paginate():
+            for function in page.get("Functions", []):
+                result[function["FunctionName"]] = function["CodeSha256"]
+    except botocore.exceptions.ClientError as ex:
+        raise AwsError(f"Failed to list lambda functions: {ex}") from ex
+    return result
 
 
 def _deploy_lambda_via_direct(
     *,
-    session: boto3.Session,
+    session: PooledSession,
     lambda_name: str,
     zip_path: Path,
 ) -> None:
     client = session.client("lambda")
     try:
+        # The Lambda API takes the zip inline, so it has to be read into memory;
+        # its size is bounded by the direct upload limit
         client.update_function_code(
             FunctionName=lambda_name,
             ZipFile=zip_path.read_bytes(),
@@ -29,65 +116,439 @@ def _deploy_lambda_via_direct(
 
 def _deploy_lambda_via_s3(
     *,
-    session: boto3.Session,
-    lambda_name: str,
+    session: PooledSession,
+    deploy_config: DeploymentConfig,
     zip_path: Path,
-    s3_bucket: str,
-    s3_key_prefix: str,
+    s3_path: tuple[str, str],
 ) -> None:
-    s3_client = session.client("s3")
-    file_hash = get_file_blake2b(zip_path)
-    s3_key = s3_key_prefix + f"{file_hash}.zip"
-    try:
-        try:
-            s3_client.head_object(Bucket=s3_bucket, Key=s3_key)
-        except botocore.exceptions.ClientError as ex:
-            if ex.response["Error"]["Code"] != "404":
-                raise
-            with zip_path.open("rb") as f:
-                s3_client.upload_fileobj(f, s3_bucket, s3_key)
-    except botocore.exceptions.ClientError as ex:
-        raise AwsError(f"Failed to upload code for {lambda_name} to S3: {ex}") from ex
+    s3_key = upload_artifact_to_s3(
+        session=session,
+        deploy_config=deploy_config,
+        zip_path=zip_path,
+        s3_path=s3_path,
+    )
     lambda_client = session.client("lambda")
     try:
         lambda_client.update_function_code(
-            FunctionName=lambda_name,
-            S3Bucket=s3_bucket,
+            FunctionName=deploy_config.name,
+            S3Bucket=s3_path[0],
             S3Key=s3_key,
         )
     except botocore.exceptions.ClientError as ex:
-        raise AwsError(f"Failed to deploy {lambda_name} to AWS: {ex}") from ex
+        raise AwsError(f"Failed to deploy {deploy_config.name} to AWS: {ex}") from ex
+
 
+def _deploy_code(
+    *,
+    session: PooledSession,
+    deploy_config: DeploymentConfig,
+    zip_path: Path,
+    live_code_sha256: str | None,
+) -> DeployStatus:
+    if get_artifact_hashes(zip_path).sha256 == live_code_sha256:
+        return DeployStatus.UNCHANGED
+    s3_path = get_upload_s3_path(deploy_config, zip_path)
+    if s3_path is not None:
+        _deploy_lambda_via_s3(
+            session=session,
+            deploy_config=deploy_config,
+            zip_path=zip_path,
+            s3_path=s3_path,
+        )
+    else:
+        _deploy_lambda_via_direct(
+            session=session,
+            lambda_name=deploy_config.name,
+            zip_path=zip_path,
+        )
+    return DeployStatus.UPDATED
 
-def deploy_lambda(config: SingleLambdaConfig, profile: str) -> None:
-    deploy_config = config.deployments.get(profile)
-    if deploy_config is None:
+
+def _get_dependencies_layer_version(
+    *,
+    session: PooledSession,
+    config: SingleLambdaConfig,
+    deploy_config: DeploymentConfig,
+) -> str:
+    """
+    Returns the ARN of the layer version holding the current dependencies,
+    publishing a new version only if the dependencies have changed.
+    """
+    assert deploy_config.dependencies_layer is not None
+    client = session.client("lambda")
+    layer_name = deploy_config.dependencies_layer
+    dependencies_hash = get_dependencies_hash(config)
+    layer_arn = find_layer_version(client, layer_name, dependencies_hash)
+    if layer_arn is not None:
+        return layer_arn
+    layer_zip_path = get_layer_zip_path(config)
+    s3_path = deploy_config.s3_path or deploy_config.staging_s3_path
+    content: dict[str, Any]
+    if layer_zip_path.stat().st_size <= MAX_DIRECT_UPLOAD_SIZE:
+        content = {"ZipFile": layer_zip_path.read_bytes()}
+    elif s3_path is not None:
+        s3_key = upload_artifact_to_s3(
+            session=session,
+            deploy_config=deploy_config,
+            zip_path=layer_zip_path,
+            s3_path=s3_path,
+        )
+        content = {"S3Bucket": s3_path[0], "S3Key": s3_key}
+    else:
+        raise LayerLimitError(
+            f"Layer zip is larger than {MAX_DIRECT_UPLOAD_SIZE} bytes and "
+            f"neither s3_url nor staging_s3_url is set"
+        )
+    rich_print(f"[purple]Publishing a new version of layer {layer_name}")
+    return publish_layer_version(
+        client,
+        layer_name=layer_name,
+        dependencies_hash=dependencies_hash,
+        content=content,
+        platform=config.build.platform,
+    )
+
+
+def _deploy_lambda_with_layer(
+    *,
+    session: PooledSession,
+    config: SingleLambdaConfig,
+    deploy_config: DeploymentConfig,
+    live_code_sha256: str | None,
+) -> DeployStatus:
+    """
+    Deploys the source code only and attaches dependencies as a layer.
+    Falls back to deploying the full artifact if layer limits don't allow that.
+    """
+    client = session.client("lambda")
+    attached_layers = get_attached_layers(client, deploy_config.name)
+    other_layers = [
+        arn
+        for arn in attached_layers
+        if get_layer_name(arn) != deploy_config.dependencies_layer
+    ]
+    try:
+        check_layer_limits(
+            other_layers=other_layers,
+            layer_zip_path=get_layer_zip_path(config),
+            source_zip_path=get_source_zip_path(config),
+        )
+        layer_arn = _get_dependencies_layer_version(
+            session=session, config=config, deploy_config=deploy_config
+        )
+    except LayerLimitError as ex:
         rich_print(
-            f"[amber]Deployment profile {profile} is not set for lambda {config.name}, skipping"
-        )
-        return
-    with get_console().status(
-        f"[purple]Deploying {config.name} ({profile}) to AWS -> {deploy_config.name}..."
-    ):
-        session = boto3.Session(
-            profile_name=deploy_config.aws_profile,
-            region_name=deploy_config.region,
-        )
-        if deploy_config.s3_path is not None:
-            s3_bucket, s3_key_prefix = deploy_config.s3_path
-            _deploy_lambda_via_s3(
-                session=session,
-                lambda_name=deploy_config.name,
-                zip_path=config.build.destination_path,
-                s3_bucket=s3_bucket,
-                s3_key_prefix=s3_key_prefix,
+            f"[yellow]Can't use dependencies layer for {config.name}: {ex}. "
+            f"Deploying the full artifact instead."
+        )
+        status = _deploy_code(
+            session=session,
+            deploy_config=deploy_config,
+            zip_path=config.build.destination_path,
+            live_code_sha256=live_code_sha256,
+        )
+        if other_layers != attached_layers:
+            set_function_layers(client, deploy_config.name, other_layers)
+            status = DeployStatus.UPDATED
+        return status
+    # Dependencies are attached first, so the code never runs without them
+    new_layers = [*other_layers, layer_arn]
+    layers_changed = new_layers != attached_layers
+    if layers_changed:
+        set_function_layers(client, deploy_config.name, new_layers)
+    status = _deploy_code(
+        session=session,
+        deploy_config=deploy_config,
+        zip_path=get_source_zip_path(config),
+        live_code_sha256=live_code_sha256,
+    )
+    return DeployStatus.UPDATED if layers_changed else status
+
+
+def _check_artifact_size(config: SingleLambdaConfig) -> None:
+    """
+    Fails before anything is uploaded if the artifact exceeds its size budget
+    or the unzipped size quota of functions.
+    """
+    report = get_size_report(config.build.destination_path)
+    check_size_budget(config, report)
+    if report.uncompressed_size > MAX_UNZIPPED_SIZE:
+        raise AwsError(
+            f"Unzipped size of {config.name} is {report.uncompressed_size} bytes, "
+            f"the limit is {MAX_UNZIPPED_SIZE}"
+        )
+
+
+def _deploy_to_function(
+    *,
+    session: PooledSession,
+    config: SingleLambdaConfig,
+    deploy_config: DeploymentConfig,
+    live_code_hashes: Mapping[str, str] | None,
+) -> DeployStatus:
+    _check_artifact_size(config)
+    if live_code_hashes is not None:
+        live_code_sha256 = live_code_hashes.get(deploy_config.name)
+    else:
+        live_code_sha256 = get_live_code_sha256(
+            session.client("lambda"), deploy_config.name
+        )
+    if deploy_config.dependencies_layer is not None:
+        return _deploy_lambda_with_layer(
+            session=session,
+            config=config,
+            deploy_config=deploy_config,
+            live_code_sha256=live_code_sha256,
+        )
+    return _deploy_code(
+        session=session,
+        deploy_config=deploy_config,
+        zip_path=config.build.destination_path,
+        live_code_sha256=live_code_sha256,
+    )
+
+
+def _publish_version(
+    session: PooledSession, deploy_config: DeploymentConfig
+) -> str | None:
+    """
+    Waits for the deployed update to complete and publishes a version if the
+    deployment profile asks for it.
+    """
+    if not deploy_config.publish_version:
+        return None
+    client = session.client("lambda")
+    wait_for_function_update(client, deploy_config.name)
+    return publish_function_version(
+        client, deploy_config.name, alias=deploy_config.alias
+    )
+
+
+def _fetch_group_code_hashes(
+    client_pool: AwsClientPool,
+    targets: Sequence[tuple[SingleLambdaConfig, str, DeploymentConfig]],
+) -> dict[tuple[str | None, str], dict[str, str]]:
+    """
+    Fetches live code hashes in bulk for every (aws_profile, region) shared by
+    many target functions. Groups that can't be listed, e.g. because the role
+    lacks lambda:ListFunctions, are left out, so their hashes are requested per
+    function.
+    """
+    group_sizes = Counter(
+        (deploy_config.aws_profile, deploy_config.region)
+        for _, _, deploy_config in targets
+    )
+    result: dict[tuple[str | None, str], dict[str, str]] = {}
+    for group_key, size in group_sizes.items():
+        if size < _BULK_FETCH_THRESHOLD:
+            continue
+        try:
+            result[group_key] = fetch_live_code_hashes(client_pool.session(*group_key))
+        except AwsError as ex:
+            rich_print(
+                f"[yellow]{markup.escape(str(ex))}. "
+                f"Checking functions individually instead."
             )
-        else:
-            _deploy_lambda_via_direct(
+    return result
+
+
+def _get_failed_outcome(
+    config: SingleLambdaConfig,
+    profile: str,
+    deploy_config: DeploymentConfig,
+    ex: Exception,
+) -> DeployOutcome:
+    if isinstance(ex, UserError):
+        error = str(ex)
+    else:
+        error = "".join(traceback.format_exception(ex))
+    return DeployOutcome(
+        config.name, profile, deploy_config.name, DeployStatus.FAILED, error
+    )
+
+
+async def _deploy_target_async(
+    *,
+    session: PooledSession,
+    semaphore: asyncio.Semaphore,
+    config: SingleLambdaConfig,
+    profile: str,
+    deploy_config: DeploymentConfig,
+    live_code_hashes: Mapping[str, str] | None,
+) -> DeployOutcome:
+    version = None
+    try:
+        # Only uploads and update requests count towards jobs, not waiting
+        async with semaphore:
+            status = await asyncio.to_thread(
+                _deploy_to_function,
                 session=session,
-                lambda_name=deploy_config.name,
-                zip_path=config.build.destination_path,
+                config=config,
+                deploy_config=deploy_config,
+                live_code_hashes=live_code_hashes,
+            )
+        client = session.client("lambda")
+        if status == DeployStatus.UPDATED or deploy_config.publish_version:
+            await wait_for_function_update_async(client, deploy_config.name)
+        if deploy_config.publish_version:
+            version = await asyncio.to_thread(
+                publish_function_version,
+                client,
+                deploy_config.name,
+                alias=deploy_config.alias,
             )
-    rich_print(
-        f"[purple]Deployed {config.name} ({profile}) to AWS -> {deploy_config.name}"
+    except Exception as ex:
+        return _get_failed_outcome(config, profile, deploy_config, ex)
+    return DeployOutcome(
+        config.name, profile, deploy_config.name, status, version=version
+    )
+
+
+async def _deploy_targets_async(
+    *,
+    client_pool: AwsClientPool,
+    targets: Sequence[tuple[SingleLambdaConfig, str, DeploymentConfig]],
+    group_hashes: Mapping[tuple[str | None, str], Mapping[str, str]],
+    jobs: int,
+    on_done: Callable[[DeployOutcome], None],
+) -> None:
+    """
+    Runs the deployments as one pipeline: every function is waited for and
+    published as soon as its own update has been issued, independently of the
+    others.
+    """
+    # boto3 is blocking, so its calls run in threads of the default executor
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=jobs + _POLL_WORKERS)
     )
+    semaphore = asyncio.Semaphore(jobs)
+    tasks = []
+    for config, profile, deploy_config in targets:
+        group_key = (deploy_config.aws_profile, deploy_config.region)
+        coroutine = _deploy_target_async(
+            session=client_pool.session(*group_key),
+            semaphore=semaphore,
+            config=config,
+            profile=profile,
+            deploy_config=deploy_config,
+            live_code_hashes=group_hashes.get(group_key),
+        )
+        tasks.append(asyncio.create_task(coroutine))
+    for task in asyncio.as_completed(tasks):
+        on_done(await task)
+
+
+def deploy_lambdas(
+    configs: Sequence[SingleLambdaConfig],
+    profiles: Sequence[str],
+    *,
+    jobs: int = 1,
+    asynchronous: bool = False,
+) -> list[DeployOutcome]:
+    """
+    Deploys every lambda to every profile using up to `jobs` concurrent workers.
+    Sessions and clients are shared between all deployments with the same AWS
+    profile and region. Failures don't interrupt other deployments; they are
+    collected and raised together as DeploymentError once all work is done.
+
+    With `asynchronous`, deployments run on an asyncio pipeline that also waits
+    until every updated function is live; update statuses of all functions are
+    polled concurrently, so the fleet is live about as soon as its slowest
+    function. Versions are published once the update of the function completes.
+    """
+    client_pool = AwsClientPool()
+    outcomes: dict[tuple[str, str], DeployOutcome] = {}
+    targets: list[tuple[SingleLambdaConfig, str, DeploymentConfig]] = []
+    for profile in profiles:
+        for config in configs:
+            deploy_config = config.deployments.get(profile)
+            if deploy_config is None:
+                outcomes[(config.name, profile)] = DeployOutcome(
+                    config.name, profile, None, DeployStatus.SKIPPED
+                )
+            else:
+                targets.append((config, profile, deploy_config))
+    group_hashes = _fetch_group_code_hashes(client_pool, targets)
+
+    def deploy_target(
+        config: SingleLambdaConfig, profile: str, deploy_config: DeploymentConfig
+    ) -> DeployOutcome:
+        group_key = (deploy_config.aws_profile, deploy_config.region)
+        session = client_pool.session(*group_key)
+        try:
+            status = _deploy_to_function(
+                session=session,
+                config=config,
+                deploy_config=deploy_config,
+                live_code_hashes=group_hashes.get(group_key),
+            )
+            version = _publish_version(session, deploy_config)
+        except Exception as ex:
+            return _get_failed_outcome(config, profile, deploy_config, ex)
+        return DeployOutcome(
+            config.name, profile, deploy_config.name, status, version=version
+        )
+
+    with Progress(
+        SpinnerColumn(finished_text="-"),
+        TextColumn("{task.description}"),
+        TimeElapsedColumn(),
+        console=get_console(),
+        transient=True,
+    ) as progress:
+        task_id = progress.add_task(
+            f"[purple]Deploying {len(targets)} functions...", total=len(targets)
+        )
+
+        def on_done(outcome: DeployOutcome) -> None:
+            outcomes[(outcome.lambda_name, outcome.profile)] = outcome
+            progress.advance(task_id)
+
+        if asynchronous:
+            asyncio.run(
+                _deploy_targets_async(
+                    client_pool=client_pool,
+                    targets=targets,
+                    group_hashes=group_hashes,
+                    jobs=jobs,
+                    on_done=on_done,
+                )
+            )
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(deploy_target, config, profile, deploy_config)
+                    for config, profile, deploy_config in targets
+                ]
+                for future in futures:
+                    on_done(future.result())
+    # Keep the order of profiles and lambdas regardless of completion order
+    result = [
+        outcomes[(config.name, profile)] for profile in profiles for config in configs
+    ]
+    failed = [outcome for outcome in result if outcome.status == DeployStatus.FAILED]
+    if failed:
+        print_deploy_summary(result)
+        raise DeploymentError(
+            f"Failed to deploy {len(failed)} of {len(targets)} functions: "
+            + ", ".join(f"{o.lambda_name} ({o.profile})" for o in failed)
+        )
+    return result
+
+
+def print_deploy_summary(outcomes: Sequence[DeployOutcome]) -> None:
+    for outcome in outcomes:
+        if outcome.status == DeployStatus.SKIPPED:
+            continue
+        color = {
+            DeployStatus.UPDATED: "green",
+            DeployStatus.UNCHANGED: "bright_black",
+            DeployStatus.FAILED: "red",
+        }[outcome.status]
+        rich_print(
+            f"[{color}]{outcome.lambda_name} ({outcome.profile}) -> "
+            f"{outcome.function_name}: {outcome.status.value}"
+            + (f", version {outcome.version}" if outcome.version is not None else "")
+        )
+        if outcome.error is not None:
+            rich_print(f"[pink3]{markup.escape(outcome.error)}")
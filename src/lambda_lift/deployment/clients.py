@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Literal
+
+import boto3
+
+ServiceName = Literal["lambda", "s3"]
+
+
+class AwsClientPool:
+    """
+    Caches boto3 sessions and clients per (aws_profile, region) so that they are
+    created once per run. Creating clients isn't thread-safe, hence the lock;
+    the clients themselves can be shared between threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sessions: dict[tuple[str | None, str], boto3.Session] = {}
+        self._clients: dict[tuple[str | None, str, ServiceName], Any] = {}
+
+    def client(
+        self, service_name: ServiceName, aws_profile: str | None, region: str
+    ) -> Any:
+        key = (aws_profile, region, service_name)
+        with self._lock:
+            if key not in self._clients:
+                session_key = (aws_profile, region)
+                if session_key not in self._sessions:
+                    self._sessions[session_key] = boto3.Session(
+                        profile_name=aws_profile, region_name=region
+                    )
+                self._clients[key] = self._sessions[session_key].client(service_name)
+            return self._clients[key]
+
+    def session(self, aws_profile: str | None, region: str) -> PooledSession:
+        return PooledSession(self, aws_profile, region)
+
+
+class PooledSession:
+    """
+    A session-like object handing out pooled clients for one profile and region.
+    """
+
+    def __init__(
+        self, pool: AwsClientPool, aws_profile: str | None, region: str
+    ) -> None:
+        self.pool = pool
+        self.aws_profile = aws_profile
+        self.region = region
+
+    def client(self, service_name: ServiceName) -> Any:
+        return self.pool.client(service_name, self.aws_profile, self.region)
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class DeployStatus(Enum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    SKIPPED = "skipped"
+    FAILED = "failed"
@@ -4,3 +4,9 @@ from lambda_lift.exceptions import UserError
 
 
 class AwsError(UserError): ...
+
+
+class LayerLimitError(AwsError): ...
+
+
+class DeploymentError(AwsError): ...
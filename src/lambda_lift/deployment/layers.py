@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+import botocore.exceptions
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.deployment.exceptions import AwsError, LayerLimitError
+from lambda_lift.deployment.limits import MAX_LAYERS_PER_FUNCTION, MAX_UNZIPPED_SIZE
+
+# Layer versions are matched to dependency sets by their description
+_DESCRIPTION_PREFIX = "lambda-lift dependencies "
+
+
+def get_unzipped_size(zip_path: Path) -> int:
+    with zipfile.ZipFile(zip_path, "r") as zip_file:
+        return sum(info.file_size for info in zip_file.infolist())
+
+
+def get_layer_name(layer_version_arn: str) -> str:
+    # arn:aws:lambda:<region>:<account>:layer:<name>:<version>
+    return layer_version_arn.split(":")[6]
+
+
+def get_attached_layers(client: Any, function_name: str) -> list[str]:
+    try:
+        response = client.get_function_configuration(FunctionName=function_name)
+    except botocore.exceptions.ClientError as ex:
+        raise AwsError(f"Failed to read configuration of {function_name}: {ex}") from ex
+    return [layer["Arn"] for layer in response.get("Layers", [])]
+
+
+def check_layer_limits(
+    *,
+    other_layers: Sequence[str],
+    layer_zip_path: Path,
+    source_zip_path: Path,
+) -> None:
+    """
+    Raises LayerLimitError if the function can't use a dependencies layer.
+    Sizes of layers not managed by lambda-lift are unknown and aren't checked.
+    """
+    if len(other_layers) + 1 > MAX_LAYERS_PER_FUNCTION:
+        raise LayerLimitError(
+            f"Function already uses {len(other_layers)} other layers, "
+            f"the limit is {MAX_LAYERS_PER_FUNCTION}"
+        )
+    unzipped_size = get_unzipped_size(layer_zip_path) + get_unzipped_size(
+        source_zip_path
+    )
+    if unzipped_size > MAX_UNZIPPED_SIZE:
+        raise LayerLimitError(
+            f"Unzipped size of code and dependencies is {unzipped_size} bytes, "
+            f"the limit is {MAX_UNZIPPED_SIZE}"
+        )
+
+
+def find_layer_version(
+    client: Any, layer_name: str, dependencies_hash: str
+) -> str | None:
+    """
+    Returns the ARN of an existing layer version built from the same dependencies.
+    """
+    description = _DESCRIPTION_PREFIX + dependencies_hash
+    kwargs: dict[str, str] = {"LayerName": layer_name}
+    try:
+        while True:
+            response = client.list_layer_versions(**kwargs)
+            for version in response.get("LayerVersions", []):
+                if version.get("Description") == description:
+                    return version["LayerVersionArn"]
+            if "NextMarker" not in response:
+                return None
+            kwargs["Marker"] = response["NextMarker"]
+    except botocore.exceptions.ClientError as ex:
+        if ex.response["Error"]["Code"] == "ResourceNotFoundException":
+            return None
+        raise AwsError(f"Failed to list versions of layer {layer_name}: {ex}") from ex
+
+
+def publish_layer_version(
+    client: Any,
+    *,
+    layer_name: str,
+    dependencies_hash: str,
+    content: Mapping[str, Any],
+    platform: Platform,
+) -> str:
+    try:
+        response = client.publish_layer_version(
+            LayerName=layer_name,
+            Description=_DESCRIPTION_PREFIX + dependencies_hash,
+            Content=content,
+            CompatibleArchitectures=[
+                {Platform.ARM64: "arm64", Platform.X86: "x86_64"}[platform]
+            ],
+        )
+    except botocore.exceptions.ClientError as ex:
+        if ex.response["Error"]["Code"] in (
+            "CodeStorageExceededException",
+            "RequestEntityTooLargeException",
+        ):
+            raise LayerLimitError(f"Failed to publish layer {layer_name}: {ex}") from ex
+        raise AwsError(f"Failed to publish layer {layer_name}: {ex}") from ex
+    return response["LayerVersionArn"]
+
+
+def set_function_layers(client: Any, function_name: str, layers: list[str]) -> None:
+    """
+    Replaces the layers of the function once any update in progress completes;
+    updating the configuration during an update fails with a conflict.
+    """
+    wait_for_function_update(client, function_name)
+    try:
+        client.update_function_configuration(FunctionName=function_name, Layers=layers)
+        wait_for_function_update(client, function_name)
+    except botocore.exceptions.ClientError as ex:
+        raise AwsError(f"Failed to update layers of {function_name}: {ex}") from ex
+
+
+def wait_for_function_update(client: Any, function_name: str) -> None:
+    try:
+        client.get_waiter("function_updated_v2").wait(FunctionName=function_name)
+    except botocore.exceptions.WaiterError as ex:
+        raise AwsError(f"Update of {function_name} didn't complete: {ex}") from ex
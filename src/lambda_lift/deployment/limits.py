@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+# AWS Lambda quotas
+# See https://docs.aws.amazon.com/lambda/latest/dg/gettingstarted-limits.html
+MAX_LAYERS_PER_FUNCTION = 5
+MAX_UNZIPPED_SIZE = 250 * 2**20
+MAX_DIRECT_UPLOAD_SIZE = 50 * 2**20
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import botocore.exceptions
+
+from lambda_lift.deployment.exceptions import AwsError
+
+# Delays between polls of LastUpdateStatus, doubled after every poll
+_POLL_INITIAL_DELAY_SECONDS = 0.5
+_POLL_MAX_DELAY_SECONDS = 8.0
+_POLL_TIMEOUT_SECONDS = 10 * 60
+
+
+async def wait_for_function_update_async(
+    client: Any,
+    function_name: str,
+    *,
+    timeout: float = _POLL_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Polls LastUpdateStatus of the function with exponential backoff until the
+    last update has completed. Other coroutines run between the polls, so many
+    functions can be waited for at once.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = _POLL_INITIAL_DELAY_SECONDS
+    while True:
+        try:
+            response = await asyncio.to_thread(
+                client.get_function_configuration, FunctionName=function_name
+            )
+        except botocore.exceptions.ClientError as ex:
+            raise AwsError(
+                f"Failed to read configuration of {function_name}: {ex}"
+            ) from ex
+        status = response.get("LastUpdateStatus", "Successful")
+        if status == "Successful":
+            return
+        if status == "Failed":
+            raise AwsError(
+                f"Update of {function_name} failed: "
+                f"{response.get('LastUpdateStatusReason', 'unknown reason')}"
+            )
+        if loop.time() + delay > deadline:
+            raise AwsError(
+                f"Update of {function_name} didn't complete in {timeout:.0f} seconds"
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _POLL_MAX_DELAY_SECONDS)
+
+
+def _move_alias(client: Any, function_name: str, alias: str, version: str) -> None:
+    try:
+        client.update_alias(
+            FunctionName=function_name, Name=alias, FunctionVersion=version
+        )
+        return
+    except botocore.exceptions.ClientError as ex:
+        if ex.response["Error"]["Code"] != "ResourceNotFoundException":
+            raise AwsError(
+                f"Failed to move alias {alias} of {function_name}: {ex}"
+            ) from ex
+    try:
+        client.create_alias(
+            FunctionName=function_name, Name=alias, FunctionVersion=version
+        )
+    except botocore.exceptions.ClientError as ex:
+        raise AwsError(
+            f"Failed to create alias {alias} of {function_name}: {ex}"
+        ) from ex
+
+
+def publish_function_version(
+    client: Any, function_name: str, *, alias: str | None
+) -> str:
+    """
+    Publishes the current code and configuration of the function as a version
+    and points the alias, if any, to it. Lambda returns the latest version
+    instead of publishing a new one if nothing has changed. The last update of
+    the function must have completed. Returns the version number.
+    """
+    try:
+        version = client.publish_version(FunctionName=function_name)["Version"]
+    except botocore.exceptions.ClientError as ex:
+        raise AwsError(f"Failed to publish a version of {function_name}: {ex}") from ex
+    if alias is not None:
+        _move_alias(client, function_name, alias, version)
+    return version
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.packer.cache.state import (
+    get_dependencies_hash,
+    get_layer_zip_path,
+    get_source_zip_path,
+)
+from lambda_lift.utils.fs import atomic_output_path
+from lambda_lift.utils.hashing import get_file_blake2b, get_string_blake2b
+
+_MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ArtifactFingerprint:
+    """
+    Describes all inputs of the final artifact. Source files are recorded as
+    [size, mtime_ns, hash]; directories as None, since only their presence matters.
+    """
+
+    config_hash: str
+    dependencies_hash: str
+    source_files: dict[str, list[Any] | None]
+
+    def _content_hashes(self) -> dict[str, str | None]:
+        return {
+            key: record[2] if record is not None else None
+            for key, record in self.source_files.items()
+        }
+
+    def content_equals(self, other: ArtifactFingerprint) -> bool:
+        """
+        Compares the fingerprints ignoring file stats.
+        """
+        return (
+            self.config_hash == other.config_hash
+            and self.dependencies_hash == other.dependencies_hash
+            and self._content_hashes() == other._content_hashes()
+        )
+
+
+def _get_manifest_path(config: SingleLambdaConfig) -> Path:
+    return config.build.cache_path / f"artifact_{config.name}.json"
+
+
+def _get_output_paths(config: SingleLambdaConfig) -> list[Path]:
+    result = [config.build.destination_path]
+    if config.uses_dependencies_layer:
+        result += [get_source_zip_path(config), get_layer_zip_path(config)]
+    return result
+
+
+def _get_output_stats(config: SingleLambdaConfig) -> list[list[int]] | None:
+    result = []
+    for path in _get_output_paths(config):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        result.append([stat.st_size, stat.st_mtime_ns])
+    return result
+
+
+def _load_manifest(config: SingleLambdaConfig) -> dict[str, Any] | None:
+    try:
+        manifest = json.loads(_get_manifest_path(config).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != _MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _get_config_hash(config: SingleLambdaConfig) -> str:
+    # Fast builds compress source files differently from regular ones
+    if not config.build.fast_compression:
+        return config.build.data_hash
+    return get_string_blake2b(f"{config.build.data_hash}/fast")
+
+
+def get_artifact_fingerprint(
+    config: SingleLambdaConfig,
+    predicate: Callable[[Path], bool] = lambda path: True,
+    *,
+    paranoid: bool = False,
+) -> ArtifactFingerprint:
+    """
+    Walks the source paths and hashes only the files whose size or mtime differ
+    from the last recorded fingerprint, or all files if paranoid is set.
+    """
+    manifest = _load_manifest(config)
+    known_files: dict[str, Any] = manifest["source_files"] if manifest else {}
+    source_files: dict[str, list[Any] | None] = {}
+    for idx, folder in enumerate(config.build.source_paths):
+        for path in folder.rglob("*"):
+            if not predicate(path):
+                continue
+            key = f"{idx}/{path.relative_to(folder).as_posix()}"
+            if path.is_dir():
+                source_files[key] = None
+                continue
+            stat = path.stat()
+            known = known_files.get(key)
+            if (
+                not paranoid
+                and known
+                and known[0] == stat.st_size
+                and known[1] == stat.st_mtime_ns
+            ):
+                file_hash = known[2]
+            else:
+                file_hash = get_file_blake2b(path)
+            source_files[key] = [stat.st_size, stat.st_mtime_ns, file_hash]
+    return ArtifactFingerprint(
+        config_hash=_get_config_hash(config),
+        dependencies_hash=get_dependencies_hash(config),
+        source_files=source_files,
+    )
+
+
+def check_artifact_up_to_date(
+    config: SingleLambdaConfig, fingerprint: ArtifactFingerprint
+) -> bool:
+    """
+    Returns True if the artifacts were built from the same inputs and haven't been
+    modified since. If only file stats have changed, the manifest is refreshed so
+    that these files aren't hashed again next time.
+    """
+    manifest = _load_manifest(config)
+    if manifest is None:
+        return False
+    output_stats = _get_output_stats(config)
+    if output_stats is None or output_stats != manifest["outputs"]:
+        return False
+    stored = ArtifactFingerprint(
+        config_hash=manifest["config_hash"],
+        dependencies_hash=manifest["dependencies_hash"],
+        source_files=manifest["source_files"],
+    )
+    if not fingerprint.content_equals(stored):
+        return False
+    if fingerprint != stored:
+        _write_manifest(config, fingerprint, output_stats)
+    return True
+
+
+def bump_artifact_cache(
+    config: SingleLambdaConfig, fingerprint: ArtifactFingerprint
+) -> None:
+    output_stats = _get_output_stats(config)
+    assert output_stats is not None, "Artifacts must be built before bumping cache"
+    _write_manifest(config, fingerprint, output_stats)
+
+
+def _write_manifest(
+    config: SingleLambdaConfig,
+    fingerprint: ArtifactFingerprint,
+    output_stats: list[list[int]],
+) -> None:
+    manifest = {
+        "version": _MANIFEST_VERSION,
+        "config_hash": fingerprint.config_hash,
+        "dependencies_hash": fingerprint.dependencies_hash,
+        "source_files": fingerprint.source_files,
+        "outputs": output_stats,
+    }
+    with atomic_output_path(_get_manifest_path(config)) as temp_path:
+        temp_path.write_text(json.dumps(manifest))
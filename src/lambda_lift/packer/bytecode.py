@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path, PurePath
+from typing import Sequence
+
+from lambda_lift.exceptions import UserError
+
+# Runs in the target interpreter, so that the bytecode matches its version.
+# Compiled paths are stripped of the directory they are in, which keeps the
+# output independent of temporary directories; the import system replaces
+# them with the actual source paths at runtime.
+_COMPILE_SCRIPT = """
+import compileall, os, sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from py_compile import PycInvalidationMode
+
+optimization = int(sys.argv[1])
+with ProcessPoolExecutor() as executor:
+    for root_dir in sys.argv[2:]:
+        file_paths = []
+        for dir_path, dir_names, file_names in os.walk(root_dir):
+            dir_names.sort()
+            file_paths.extend(
+                os.path.join(dir_path, file_name)
+                for file_name in sorted(file_names)
+                if file_name.endswith(".py")
+            )
+        compile_file = partial(
+            compileall.compile_file,
+            stripdir=root_dir,
+            quiet=2,
+            optimize=optimization,
+            invalidation_mode=PycInvalidationMode.UNCHECKED_HASH,
+        )
+        results = executor.map(compile_file, file_paths, chunksize=64)
+        for file_path, success in zip(file_paths, results):
+            if not success:
+                print(file_path)
+"""
+
+
+def get_bytecode_suffix(optimization: int) -> str:
+    """
+    Returns the suffix of the bytecode files for the optimization level,
+    without the interpreter tag (e.g. ".opt-1.pyc").
+    """
+    return f".opt-{optimization}.pyc" if optimization else ".pyc"
+
+
+def is_bytecode_for_optimization(path: PurePath, optimization: int) -> bool:
+    """
+    Returns True if path is a bytecode file in __pycache__ compiled with the
+    given optimization level.
+    """
+    if path.parent.name != "__pycache__":
+        return False
+    if optimization:
+        return path.name.endswith(get_bytecode_suffix(optimization))
+    return path.name.endswith(".pyc") and ".opt-" not in path.name
+
+
+def compile_bytecode(
+    root_paths: Sequence[Path],
+    *,
+    python: str | None,
+    optimization: int,
+) -> list[Path]:
+    """
+    Compiles all Python files under root_paths into __pycache__ next to them.
+    The bytecode is written in unchecked-hash mode, so the interpreter never
+    compares it against the source. Hash randomization is disabled to keep the
+    output reproducible. Returns the files that failed to compile.
+    """
+    if not root_paths:
+        return []
+    cmd = [
+        python or sys.executable,
+        "-c",
+        _COMPILE_SCRIPT,
+        str(optimization),
+        *map(str, root_paths),
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            check=True,
+            text=True,
+            env={**os.environ, "PYTHONHASHSEED": "0"},
+        )
+    except (OSError, subprocess.CalledProcessError) as ex:
+        stderr = getattr(ex, "stderr", None) or ""
+        raise UserError(f"Failed to precompile bytecode: {ex}\n{stderr}") from ex
+    return [Path(line) for line in result.stdout.splitlines() if line]
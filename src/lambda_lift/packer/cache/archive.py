@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Mapping, Sequence
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.packer.cache.backends import CacheBackend, is_valid_key
+from lambda_lift.packer.cache.shared import get_shared_cache_key
+from lambda_lift.packer.cache.state import (
+    check_dependencies_up_to_date,
+    get_dependencies_zip_path,
+)
+from lambda_lift.packer.exceptions import SharedCacheError
+from lambda_lift.utils.cli_tools import rich_print
+from lambda_lift.utils.fs import atomic_output_path
+
+_ARCHIVE_VERSION = 1
+_MANIFEST_NAME = "lambda-lift-cache.json"
+
+
+def collect_cache_entries(configs: Sequence[SingleLambdaConfig]) -> dict[str, Path]:
+    """
+    Returns the built dependency zips of the given lambdas by their shared
+    cache keys. Lambdas that haven't been built or can't be shared are skipped.
+    """
+    result: dict[str, Path] = {}
+    for config in configs:
+        key = get_shared_cache_key(config)
+        if key is None:
+            rich_print(f"[yellow]{config.name}: dependencies can't be shared, skipped")
+        elif not check_dependencies_up_to_date(config):
+            rich_print(f"[yellow]{config.name}: dependencies aren't built, skipped")
+        else:
+            result[key] = get_dependencies_zip_path(config)
+    return result
+
+
+def export_cache_archive(archive_path: Path, entries: Mapping[str, Path]) -> None:
+    """
+    Writes the entries into a single uncompressed tar file; the zips are
+    compressed already.
+    """
+    manifest = json.dumps({"version": _ARCHIVE_VERSION, "keys": sorted(entries)})
+    with (
+        atomic_output_path(archive_path) as temp_path,
+        tarfile.open(temp_path, "w") as tar,
+    ):
+        info = tarfile.TarInfo(_MANIFEST_NAME)
+        info.size = len(manifest.encode())
+        tar.addfile(info, io.BytesIO(manifest.encode()))
+        for key in sorted(entries):
+            tar.add(entries[key], arcname=f"{key}.zip")
+
+
+def _read_manifest_keys(tar: tarfile.TarFile, archive_path: Path) -> list[str]:
+    try:
+        manifest_file = tar.extractfile(_MANIFEST_NAME)
+        assert manifest_file is not None
+        manifest = json.loads(manifest_file.read())
+    except (KeyError, json.JSONDecodeError) as ex:
+        raise SharedCacheError(
+            f"{archive_path} is not a lambda-lift cache archive"
+        ) from ex
+    if not isinstance(manifest, dict) or manifest.get("version") != _ARCHIVE_VERSION:
+        raise SharedCacheError(
+            f"{archive_path} was exported by an incompatible version of lambda-lift"
+        )
+    keys = manifest["keys"]
+    if not all(isinstance(key, str) and is_valid_key(key) for key in keys):
+        raise SharedCacheError(f"{archive_path} contains invalid keys")
+    return keys
+
+
+def import_cache_archive(archive_path: Path, backend: CacheBackend) -> list[str]:
+    """
+    Stores all entries of the archive in the backend. Returns their keys.
+    """
+    try:
+        with (
+            tarfile.open(archive_path, "r") as tar,
+            tempfile.TemporaryDirectory() as temp_dir,
+        ):
+            keys = _read_manifest_keys(tar, archive_path)
+            for key in keys:
+                entry_file = tar.extractfile(f"{key}.zip")
+                assert entry_file is not None
+                entry_path = Path(temp_dir) / f"{key}.zip"
+                with entry_path.open("wb") as f:
+                    shutil.copyfileobj(entry_file, f)
+                backend.store(key, entry_path)
+                entry_path.unlink()
+    except (OSError, tarfile.TarError, KeyError) as ex:
+        raise SharedCacheError(f"Failed to import {archive_path}: {ex}") from ex
+    return keys
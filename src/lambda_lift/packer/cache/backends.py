@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import os
+import re
+import shutil
+from abc import ABC, abstractmethod
+from functools import cache
+from pathlib import Path
+
+import boto3
+import botocore.exceptions
+
+from lambda_lift.packer.exceptions import SharedCacheError
+from lambda_lift.utils.fs import atomic_output_path
+
+_S3_URL_RE = re.compile(r"^s3://([^/]+)(?:/(.*)|$)")
+# Keys are urlsafe base64 digests, see get_shared_cache_key
+_KEY_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def is_valid_key(key: str) -> bool:
+    return _KEY_RE.match(key) is not None
+
+
+class CacheBackend(ABC):
+    """
+    A store of dependency zips keyed by the digest of their inputs. Storing a
+    key that already exists is a no-op unless overwrite is set, e.g. when loose
+    requirements have been resolved again.
+    """
+
+    @abstractmethod
+    def fetch(self, key: str, dest_path: Path) -> bool:
+        """
+        Writes the entry to dest_path atomically. Returns False if there is no
+        such entry.
+        """
+
+    @abstractmethod
+    def store(
+        self, key: str, source_path: Path, *, overwrite: bool = False
+    ) -> None: ...
+
+    @abstractmethod
+    def list_keys(self) -> list[str]: ...
+
+
+class LocalCacheBackend(CacheBackend):
+    def __init__(self, root_path: Path) -> None:
+        self.root_path = root_path
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self.root_path / f"{key}.zip"
+
+    def __str__(self) -> str:
+        return str(self.root_path)
+
+    def fetch(self, key: str, dest_path: Path) -> bool:
+        entry_path = self._get_entry_path(key)
+        if not entry_path.is_file():
+            return False
+        try:
+            with atomic_output_path(dest_path) as temp_path:
+                # Entries are never modified in place, so they can be shared
+                try:
+                    os.link(entry_path, temp_path)
+                except OSError:
+                    shutil.copyfile(entry_path, temp_path)
+        except OSError as ex:
+            raise SharedCacheError(f"Failed to fetch {key} from {self}: {ex}") from ex
+        return True
+
+    def store(self, key: str, source_path: Path, *, overwrite: bool = False) -> None:
+        entry_path = self._get_entry_path(key)
+        if entry_path.exists() and not overwrite:
+            return
+        try:
+            # Fetched entries may be hard links, so the entry is replaced rather
+            # than written in place
+            with atomic_output_path(entry_path) as temp_path:
+                shutil.copyfile(source_path, temp_path)
+        except OSError as ex:
+            raise SharedCacheError(f"Failed to store {key} in {self}: {ex}") from ex
+
+    def list_keys(self) -> list[str]:
+        try:
+            names = os.listdir(self.root_path)
+        except FileNotFoundError:
+            return []
+        keys = (name.removesuffix(".zip") for name in names if name.endswith(".zip"))
+        return sorted(key for key in keys if is_valid_key(key))
+
+
+class S3CacheBackend(CacheBackend):
+    """
+    Keeps entries as objects under a prefix of an S3 bucket. Credentials come
+    from the default chain (e.g. AWS_PROFILE). S3-compatible stores are
+    supported through endpoint_url or the AWS_ENDPOINT_URL_S3 variable.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str,
+        *,
+        endpoint_url: str | None = None,
+    ) -> None:
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = boto3.Session().client("s3", endpoint_url=endpoint_url)
+
+    def _get_object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.zip"
+
+    def __str__(self) -> str:
+        return f"s3://{self.bucket}/{self.prefix}"
+
+    def fetch(self, key: str, dest_path: Path) -> bool:
+        try:
+            with atomic_output_path(dest_path) as temp_path:
+                self._client.download_file(
+                    self.bucket, self._get_object_key(key), str(temp_path)
+                )
+        except botocore.exceptions.ClientError as ex:
+            if ex.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return False
+            raise SharedCacheError(f"Failed to fetch {key} from {self}: {ex}") from ex
+        except botocore.exceptions.BotoCoreError as ex:
+            raise SharedCacheError(f"Failed to fetch {key} from {self}: {ex}") from ex
+        return True
+
+    def store(self, key: str, source_path: Path, *, overwrite: bool = False) -> None:
+        object_key = self._get_object_key(key)
+        try:
+            if not overwrite:
+                try:
+                    self._client.head_object(Bucket=self.bucket, Key=object_key)
+                    return
+                except botocore.exceptions.ClientError as ex:
+                    if ex.response["Error"]["Code"] != "404":
+                        raise
+            self._client.upload_file(str(source_path), self.bucket, object_key)
+        except (
+            botocore.exceptions.ClientError,
+            botocore.exceptions.BotoCoreError,
+        ) as ex:
+            raise SharedCacheError(f"Failed to store {key} in {self}: {ex}") from ex
+
+    def list_keys(self) -> list[str]:
+        paginator = self._client.get_paginator("list_objects_v2")
+        keys = []
+        try:
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+                for item in page.get("Contents", ()):
+                    name = item["Key"][len(self.prefix) :]
+                    if name.endswith(".zip") and is_valid_key(name[:-4]):
+                        keys.append(name[:-4])
+        except (
+            botocore.exceptions.ClientError,
+            botocore.exceptions.BotoCoreError,
+        ) as ex:
+            raise SharedCacheError(f"Failed to list entries of {self}: {ex}") from ex
+        return sorted(keys)
+
+
+@cache
+def get_cache_backend(location: str) -> CacheBackend:
+    """
+    Returns the backend for an s3://bucket/prefix/ URL or a local directory.
+    Backends are created once per location, so that clients are reused.
+    """
+    match = _S3_URL_RE.match(location)
+    if match is None:
+        return LocalCacheBackend(Path(location).expanduser())
+    prefix = match.group(2) or ""
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+    return S3CacheBackend(match.group(1), prefix)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import zipfile
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.packer.cache.backends import get_cache_backend
+from lambda_lift.packer.cache.state import get_dependencies_zip_path
+from lambda_lift.packer.exceptions import SharedCacheError
+from lambda_lift.packer.resolution import get_resolution_key
+from lambda_lift.utils.cli_tools import rich_print
+from lambda_lift.utils.hashing import get_string_blake2b
+
+_KEY_VERSION = 1
+
+
+def get_shared_cache_key(config: SingleLambdaConfig) -> str | None:
+    """
+    Returns the digest of everything that determines the content of the
+    dependencies zip, or None if it can't be shared (no requirements, or
+    requirements with direct references). Included requirements and constraints
+    files are part of the key, paths aren't, so lambdas with identical
+    dependencies share the entry across machines.
+    """
+    build = config.build
+    # Covers the requirements, platform, python version and ignored libraries
+    resolution_key = get_resolution_key(config, build.platform.value)
+    if resolution_key is None:
+        return None
+    jsonable_object = {
+        "version": _KEY_VERSION,
+        "resolution": resolution_key,
+        "compression": build.compression.jsonable,
+        "precompile_optimization": (
+            build.precompile_optimization if build.precompile else None
+        ),
+        "trim": build.trim.jsonable,
+        "strip_tool": build.strip_tool if build.strip_debug else None,
+    }
+    return get_string_blake2b(json.dumps(jsonable_object, sort_keys=True))
+
+
+def fetch_shared_dependencies(config: SingleLambdaConfig) -> bool:
+    """
+    Replaces the dependencies zip with the entry of the shared cache. Returns
+    False if there is no shared cache, no entry, or it can't be fetched.
+    """
+    if config.build.shared_cache is None:
+        return False
+    key = get_shared_cache_key(config)
+    if key is None:
+        return False
+    backend = get_cache_backend(config.build.shared_cache)
+    deps_path = get_dependencies_zip_path(config)
+    try:
+        if not backend.fetch(key, deps_path):
+            return False
+    except SharedCacheError as ex:
+        rich_print(f"[yellow]{config.name}: {ex}")
+        return False
+    if not zipfile.is_zipfile(deps_path):
+        rich_print(
+            f"[yellow]{config.name}: ignoring corrupted entry {key} in {backend}"
+        )
+        deps_path.unlink()
+        return False
+    rich_print(f"[blue]{config.name}: dependencies fetched from {backend}")
+    return True
+
+
+def store_shared_dependencies(
+    config: SingleLambdaConfig, *, overwrite: bool = False
+) -> None:
+    """
+    Adds the built dependencies zip to the shared cache. overwrite replaces an
+    existing entry, e.g. after resolving loose requirements again. Failures are
+    reported but don't fail the build.
+    """
+    if config.build.shared_cache is None:
+        return
+    key = get_shared_cache_key(config)
+    if key is None:
+        return
+    try:
+        get_cache_backend(config.build.shared_cache).store(
+            key, get_dependencies_zip_path(config), overwrite=overwrite
+        )
+    except SharedCacheError as ex:
+        rich_print(f"[yellow]{config.name}: {ex}")
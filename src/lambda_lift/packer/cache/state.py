@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.exceptions import UserError
+from lambda_lift.packer.interpreter import get_python_version
+from lambda_lift.packer.resolution import get_requirements_hash
+from lambda_lift.utils.fs import atomic_output_path
+from lambda_lift.utils.hashing import get_file_blake2b
+
+_MANIFEST_VERSION = 1
+
+
+def _hash_file(path: Path | None) -> str:
+    if path is None:
+        return ""
+    return get_file_blake2b(path)
+
+
+def get_dependencies_zip_path(config: SingleLambdaConfig) -> Path:
+    config.build.cache_path.mkdir(parents=True, exist_ok=True)
+    return config.build.cache_path / f"dependencies_{config.name}.zip"
+
+
+def get_source_zip_path(config: SingleLambdaConfig) -> Path:
+    """
+    Returns the path of the artifact that contains only the source code.
+    It is deployed together with the dependencies layer.
+    """
+    config.build.cache_path.mkdir(parents=True, exist_ok=True)
+    return config.build.cache_path / f"source_{config.name}.zip"
+
+
+def get_layer_zip_path(config: SingleLambdaConfig) -> Path:
+    config.build.cache_path.mkdir(parents=True, exist_ok=True)
+    return config.build.cache_path / f"layer_{config.name}.zip"
+
+
+def _get_manifest_path(config: SingleLambdaConfig) -> Path:
+    return config.build.cache_path / f"dependencies_{config.name}.json"
+
+
+def _get_interpreter_version(config: SingleLambdaConfig) -> str | None:
+    # A missing interpreter fails the build anyway; it only has to invalidate
+    # the cache here
+    try:
+        return get_python_version(config.build.python_executable)
+    except UserError:
+        return None
+
+
+def _get_zip_stat(path: Path) -> dict[str, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+
+
+def _load_manifest(config: SingleLambdaConfig) -> dict[str, Any] | None:
+    try:
+        manifest = json.loads(_get_manifest_path(config).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != _MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(config: SingleLambdaConfig, manifest: dict[str, Any]) -> None:
+    with atomic_output_path(_get_manifest_path(config)) as temp_path:
+        temp_path.write_text(json.dumps(manifest))
+
+
+def get_dependencies_hash(config: SingleLambdaConfig) -> str:
+    """
+    Returns the hash of the dependencies zip recorded with the last cache bump.
+    """
+    manifest = _load_manifest(config)
+    if manifest is not None:
+        return manifest["zip"]["hash"]
+    return _hash_file(get_dependencies_zip_path(config))
+
+
+def check_dependencies_up_to_date(
+    config: SingleLambdaConfig, *, paranoid: bool = False
+) -> bool:
+    """
+    Returns True if dependencies zip file exists and doesn't need to be updated.
+    False otherwise. The zip is hashed only if its size, mtime or inode differ
+    from the recorded ones, or always if paranoid is set.
+    """
+    manifest = _load_manifest(config)
+    if manifest is None:
+        return False
+    requirements_hash = get_requirements_hash(config.build.requirements_path)
+    if (
+        manifest["requirements_hash"] != requirements_hash
+        or manifest["config_hash"] != config.build.data_hash
+        or manifest["platform"] != config.build.platform.value
+        or manifest["python_version"] != _get_interpreter_version(config)
+    ):
+        return False
+    deps_path = get_dependencies_zip_path(config)
+    zip_stat = _get_zip_stat(deps_path)
+    if zip_stat is None:
+        return False
+    stored_zip = manifest["zip"]
+    if not paranoid and zip_stat == stored_zip["stat"]:
+        return True
+    if _hash_file(deps_path) != stored_zip["hash"]:
+        return False
+    if zip_stat != stored_zip["stat"]:
+        # Only touched, so that it isn't hashed again next time
+        manifest["zip"] = {"stat": zip_stat, "hash": stored_zip["hash"]}
+        _write_manifest(config, manifest)
+    return True
+
+
+def bump_dependencies_cache(config: SingleLambdaConfig) -> None:
+    deps_zip_path = get_dependencies_zip_path(config)
+    zip_stat = _get_zip_stat(deps_zip_path)
+    assert zip_stat is not None, "Dependencies must be built before bumping cache"
+    manifest = {
+        "version": _MANIFEST_VERSION,
+        "requirements_hash": get_requirements_hash(config.build.requirements_path),
+        "config_hash": config.build.data_hash,
+        "platform": config.build.platform.value,
+        "python_version": _get_interpreter_version(config),
+        "zip": {"stat": zip_stat, "hash": _hash_file(deps_zip_path)},
+    }
+    _write_manifest(config, manifest)
+    # Written by versions that used a plain text cache state
+    (config.build.cache_path / f"hashes_{config.name}.txt").unlink(missing_ok=True)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping, Sequence
+
+from rich.table import Table
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.exceptions import UserError
+from lambda_lift.utils.cli_tools import get_console, rich_print
+
+# Values of platform.machine() on hosts that can run the lambda's native code
+_HOST_MACHINES: dict[Platform, tuple[str, ...]] = {
+    Platform.ARM64: ("aarch64", "arm64"),
+    Platform.X86: ("x86_64", "amd64"),
+}
+
+# Imports done by the interpreter on startup are reported before the marker
+_START_MARKER = "lambda-lift: importing handler"
+_IMPORT_TIME_PREFIX = "import time:"
+
+# Runs in isolated mode, so that the user site and PYTHON* variables don't leak in.
+# __import__ is used rather than importlib.import_module, since -X importtime
+# only reports modules imported through the import statement machinery.
+_IMPORT_SCRIPT = """
+import sys
+root_path, handler, marker = sys.argv[1:]
+sys.path.insert(0, root_path)
+module_name, _, function_name = handler.rpartition(".")
+print(marker, file=sys.stderr, flush=True)
+__import__(module_name)
+getattr(sys.modules[module_name], function_name)
+"""
+
+_TOP_MODULES_COUNT = 15
+
+
+@dataclass(frozen=True)
+class ColdStartRun:
+    # Total import time of the handler module
+    import_us: int
+    # Time from starting the interpreter until it exited
+    process_us: int
+    # Self and cumulative import time of every module imported by the handler
+    modules: Mapping[str, tuple[int, int]]
+
+
+@dataclass(frozen=True)
+class ColdStartResult:
+    artifact_path: Path
+    runs: Sequence[ColdStartRun]
+
+    @property
+    def import_times(self) -> list[int]:
+        return [run.import_us for run in self.runs]
+
+    @property
+    def process_times(self) -> list[int]:
+        return [run.process_us for run in self.runs]
+
+    def get_module_times(self) -> dict[str, tuple[int, int]]:
+        """
+        Returns median self and cumulative import times of every module across runs.
+        """
+        times: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for run in self.runs:
+            for name, module_times in run.modules.items():
+                times[name].append(module_times)
+        return {
+            name: (
+                int(statistics.median(t[0] for t in module_times)),
+                int(statistics.median(t[1] for t in module_times)),
+            )
+            for name, module_times in times.items()
+        }
+
+
+def percentile(values: Sequence[int], pct: float) -> int:
+    """
+    Returns the nearest-rank percentile of the values.
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def check_host_platform(config: SingleLambdaConfig) -> None:
+    """
+    Raises UserError unless native code built for the lambda can run on this host.
+    """
+    machine = platform.machine().lower()
+    if machine not in _HOST_MACHINES[config.build.platform]:
+        raise UserError(
+            f"{config.name} is built for {config.build.platform.value}, "
+            f"which can't run on this {machine} host"
+        )
+
+
+def parse_import_times(stderr: str) -> tuple[int, dict[str, tuple[int, int]]]:
+    """
+    Parses the -X importtime output of the import script. Returns the total import
+    time of the handler and the self and cumulative times of every imported module.
+    """
+    lines = stderr.splitlines()
+    if _START_MARKER not in lines:
+        raise UserError(f"Failed to import the handler:\n{stderr}")
+    total_us = 0
+    modules: dict[str, tuple[int, int]] = {}
+    for line in lines[lines.index(_START_MARKER) + 1 :]:
+        if not line.startswith(_IMPORT_TIME_PREFIX):
+            continue
+        self_us, cumulative_us, name = line[len(_IMPORT_TIME_PREFIX) :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header line
+        if not name.startswith("  "):
+            total_us += int(cumulative_us)  # Imported directly by the script
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return total_us, modules
+
+
+def _run_import(python: str, root_path: Path, handler: str) -> ColdStartRun:
+    # Lambda code is read-only, so bytecode not shipped in the zip is never
+    # cached between cold starts; -B keeps runs from warming up each other
+    cmd = [python, "-I", "-B", "-X", "importtime", "-c", _IMPORT_SCRIPT]
+    start_ns = time.perf_counter_ns()
+    try:
+        result = subprocess.run(
+            [*cmd, str(root_path), handler, _START_MARKER],
+            capture_output=True,
+            text=True,
+            cwd=root_path,
+        )
+    except OSError as ex:
+        raise UserError(f"Failed to run python executable {python}: {ex}") from ex
+    process_us = (time.perf_counter_ns() - start_ns) // 1000
+    if result.returncode != 0:
+        raise UserError(f"Failed to import handler {handler}:\n{result.stderr}")
+    import_us, modules = parse_import_times(result.stderr)
+    return ColdStartRun(import_us=import_us, process_us=process_us, modules=modules)
+
+
+def bench_coldstart(
+    config: SingleLambdaConfig,
+    artifact_path: Path,
+    *,
+    handler: str,
+    runs: int,
+) -> ColdStartResult:
+    """
+    Extracts the artifact into a fresh directory and imports the handler (e.g.
+    "main.lambda_handler") from it in `runs` separate interpreter processes
+    under -X importtime.
+    """
+    if "." not in handler:
+        raise UserError(f"Handler {handler} must be in the module.function format")
+    python = config.build.python_executable or sys.executable
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root_path = Path(temp_dir)
+        with zipfile.ZipFile(artifact_path, "r") as zip_file:
+            zip_file.extractall(root_path)
+        return ColdStartResult(
+            artifact_path=artifact_path,
+            runs=[_run_import(python, root_path, handler) for _ in range(runs)],
+        )
+
+
+def _format_ms(value_us: float) -> str:
+    return f"{value_us / 1000:.1f} ms"
+
+
+def _format_change(value_us: int, base_us: int) -> str:
+    change = value_us - base_us
+    color = "red" if change > 0 else "green"
+    return f"[{color}]{'+' if change >= 0 else '-'}{_format_ms(abs(change))}"
+
+
+def _get_percentiles(result: ColdStartResult) -> list[int]:
+    return [
+        percentile(values, pct)
+        for values in (result.import_times, result.process_times)
+        for pct in (50, 95)
+    ]
+
+
+def print_coldstart_results(
+    config: SingleLambdaConfig, results: Sequence[ColdStartResult]
+) -> None:
+    """
+    Prints the timings of the results side by side. Changes are relative to the
+    first result.
+    """
+    base = results[0]
+    rich_print(f"[blue]{config.name}: {len(base.runs)} runs per artifact")
+    table = Table(
+        "#", "Artifact", "Import p50", "Import p95", "Process p50", "Process p95"
+    )
+    base_values = _get_percentiles(base)
+    for idx, result in enumerate(results, start=1):
+        cells = []
+        for value, base_value in zip(_get_percentiles(result), base_values):
+            cell = _format_ms(value)
+            if result is not base:
+                cell += f" {_format_change(value, base_value)}"
+            cells.append(cell)
+        table.add_row(str(idx), str(result.artifact_path), *cells)
+    get_console().print(table)
+    module_times = [result.get_module_times() for result in results]
+    top_modules = sorted(
+        set().union(*module_times),
+        key=lambda name: max(times.get(name, (0, 0))[0] for times in module_times),
+        reverse=True,
+    )[:_TOP_MODULES_COUNT]
+    columns = ["Module"]
+    for idx in range(len(results)):
+        suffix = f" ({idx + 1})" if len(results) > 1 else ""
+        columns += [f"Self{suffix}", f"Cumulative{suffix}"]
+    table = Table(*columns)
+    for name in top_modules:
+        cells = [name]
+        for times in module_times:
+            if name in times:
+                cells += [_format_ms(value_us) for value_us in times[name]]
+            else:
+                cells += ["-", "-"]  # Not imported from this artifact
+        table.add_row(*cells)
+    get_console().print(table)
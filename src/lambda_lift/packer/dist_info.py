@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import csv
+import shutil
+from dataclasses import dataclass
+from email.parser import HeaderParser
+from pathlib import Path, PurePosixPath
+
+
+@dataclass(frozen=True)
+class InstalledDistribution:
+    """
+    A distribution installed with `pip install --target`, described by its
+    *.dist-info metadata directory.
+    """
+
+    name: str
+    version: str
+    dist_info_path: Path
+
+    @property
+    def pin(self) -> str:
+        return f"{self.name}=={self.version}"
+
+    def get_files(self, target: Path) -> list[Path]:
+        """
+        Returns the installed files listed in RECORD, or, if RECORD is missing,
+        the top level modules listed in top_level.txt.
+        """
+        record_path = self.dist_info_path / "RECORD"
+        if record_path.exists():
+            with record_path.open(newline="") as f:
+                return [
+                    path
+                    for row in csv.reader(f)
+                    if row and (path := _resolve_record_path(target, row[0]))
+                ]
+        top_level_path = self.dist_info_path / "top_level.txt"
+        if not top_level_path.exists():
+            return []
+        result: list[Path] = []
+        for module_name in top_level_path.read_text().split():
+            result.extend(target.glob(module_name))
+            result.extend(target.glob(f"{module_name}.*"))
+        return result
+
+
+def _resolve_record_path(target: Path, record_path: str) -> Path | None:
+    """
+    RECORD paths are relative to the installation's site-packages. With --target,
+    scripts are recorded as ../../bin/<name> and then moved to <target>/bin.
+    """
+    parts = PurePosixPath(record_path).parts
+    if ".." in parts:
+        parts = tuple(p for p in parts if p != "..")
+        if not parts or parts[0] != "bin":
+            return None
+    return target.joinpath(*parts)
+
+
+def find_installed_distributions(target: Path) -> list[InstalledDistribution]:
+    result: list[InstalledDistribution] = []
+    for dist_info_path in sorted(target.glob("*.dist-info")):
+        metadata_path = dist_info_path / "METADATA"
+        if not metadata_path.exists():
+            continue
+        metadata = HeaderParser().parsestr(
+            metadata_path.read_text(encoding="utf-8", errors="replace")
+        )
+        name, version = metadata.get("Name"), metadata.get("Version")
+        if name is None or version is None:
+            continue
+        result.append(InstalledDistribution(name, version, dist_info_path))
+    return result
+
+
+def remove_distribution(target: Path, distribution: InstalledDistribution) -> None:
+    """
+    Removes all files of the distribution, directories left empty by that, and
+    its metadata. Files that other installed distributions also list, e.g.
+    __init__.py of a shared namespace package, are kept.
+    """
+    kept_files = {
+        path
+        for other in find_installed_distributions(target)
+        if other.dist_info_path != distribution.dist_info_path
+        for path in other.get_files(target)
+    }
+    parents: set[Path] = set()
+    for path in distribution.get_files(target):
+        if path in kept_files:
+            continue
+        if path.is_dir() and not path.is_symlink():
+            if any(kept.is_relative_to(path) for kept in kept_files):
+                for child in path.rglob("*"):
+                    if child not in kept_files and not child.is_dir():
+                        child.unlink()
+                        parents.update(child.parents)
+            else:
+                shutil.rmtree(path)
+        else:
+            path.unlink(missing_ok=True)
+        parents.update(path.parents)
+    shutil.rmtree(distribution.dist_info_path, ignore_errors=True)
+    # Deepest directories first, so that nested empty directories are removed
+    for parent in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+        if parent.is_relative_to(target) and parent != target:
+            if parent.is_dir() and not any(parent.iterdir()):
+                parent.rmdir()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import struct
+
+# ELF64 structures, see https://refspecs.linuxfoundation.org/elf/gabi4+/contents.html
+_EHDR_FORMAT = "16sHHIQQQIHHHHHH"
+_PHDR_FORMAT = "IIQQQQQQ"
+_SHDR_FORMAT = "IIQQQQIIQQ"
+_EHDR_SIZE = 64
+_PHDR_SIZE = 56
+_SHDR_SIZE = 64
+
+ELF_MAGIC = b"\x7fELF"
+_ELFCLASS64 = 2
+_BYTE_ORDERS = {1: "<", 2: ">"}
+
+_SHT_NOBITS = 8
+_SHF_ALLOC = 0x2
+
+# Field indices
+_E_PHOFF, _E_SHOFF = 5, 6
+_E_PHENTSIZE, _E_PHNUM, _E_SHENTSIZE, _E_SHNUM, _E_SHSTRNDX = 9, 10, 11, 12, 13
+_P_OFFSET, _P_FILESZ = 2, 5
+_SH_NAME, _SH_TYPE, _SH_FLAGS, _SH_OFFSET, _SH_SIZE, _SH_ADDRALIGN = 0, 1, 2, 4, 5, 8
+
+
+def _is_debug_section(name: bytes) -> bool:
+    return name.startswith((b".debug_", b".zdebug_"))
+
+
+def _align(value: int, alignment: int) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def strip_debug_sections(data: bytes) -> bytes | None:
+    """
+    Returns the 64-bit ELF file without the contents of its debug sections,
+    or None if there is nothing to strip or the file layout isn't supported.
+
+    Only non-allocated sections located after all segments are touched, so
+    nothing the loader maps changes. Debug sections are kept in the section
+    table as SHT_NOBITS, so that no section indices (referenced by symbols and
+    other sections) change; the remaining trailing sections are packed after
+    the segments, followed by the section header table. The object's
+    architecture doesn't matter, so aarch64 objects can be stripped on x86.
+    """
+    if len(data) < _EHDR_SIZE or not data.startswith(ELF_MAGIC):
+        return None
+    order = _BYTE_ORDERS.get(data[5])
+    if data[4] != _ELFCLASS64 or order is None:
+        return None
+    header = list(struct.unpack_from(order + _EHDR_FORMAT, data, 0))
+    phoff, shoff = header[_E_PHOFF], header[_E_SHOFF]
+    phnum, shnum, shstrndx = header[_E_PHNUM], header[_E_SHNUM], header[_E_SHSTRNDX]
+    if (
+        shnum == 0  # No sections, or extended section numbering
+        or shstrndx >= shnum
+        or header[_E_SHENTSIZE] != _SHDR_SIZE
+        or (phnum and header[_E_PHENTSIZE] != _PHDR_SIZE)
+        or shoff + shnum * _SHDR_SIZE > len(data)
+        or phoff + phnum * _PHDR_SIZE > len(data)
+    ):
+        return None
+    # Everything up to the end of the last segment is kept byte for byte
+    segments_end = max(_EHDR_SIZE, phoff + phnum * _PHDR_SIZE)
+    for idx in range(phnum):
+        segment = struct.unpack_from(
+            order + _PHDR_FORMAT, data, phoff + idx * _PHDR_SIZE
+        )
+        segments_end = max(segments_end, segment[_P_OFFSET] + segment[_P_FILESZ])
+    sections = [
+        list(struct.unpack_from(order + _SHDR_FORMAT, data, shoff + idx * _SHDR_SIZE))
+        for idx in range(shnum)
+    ]
+    names_offset = sections[shstrndx][_SH_OFFSET]
+
+    def get_name(section: list[int]) -> bytes:
+        start = names_offset + section[_SH_NAME]
+        return data[start : data.index(b"\0", start)]
+
+    trailing: list[int] = []
+    debug: set[int] = set()
+    for idx, section in enumerate(sections[1:], start=1):
+        if section[_SH_TYPE] == _SHT_NOBITS or section[_SH_SIZE] == 0:
+            continue
+        start, end = section[_SH_OFFSET], section[_SH_OFFSET] + section[_SH_SIZE]
+        if end > len(data):
+            return None
+        is_debug = _is_debug_section(get_name(section))
+        if end <= segments_end:
+            if is_debug:
+                return None  # Unusual layout, leave the file alone
+            continue
+        if start < segments_end or section[_SH_FLAGS] & _SHF_ALLOC:
+            return None
+        trailing.append(idx)
+        if is_debug:
+            debug.add(idx)
+    if not debug:
+        return None
+    result = bytearray(data[:segments_end])
+    for idx in sorted(trailing, key=lambda i: sections[i][_SH_OFFSET]):
+        section = sections[idx]
+        if idx in debug:
+            section[_SH_TYPE] = _SHT_NOBITS
+            section[_SH_OFFSET] = len(result)
+            continue
+        start = section[_SH_OFFSET]
+        offset = _align(len(result), max(section[_SH_ADDRALIGN], 1))
+        result.extend(bytes(offset - len(result)))
+        result.extend(data[start : start + section[_SH_SIZE]])
+        section[_SH_OFFSET] = offset
+    result.extend(bytes(_align(len(result), 8) - len(result)))
+    header[_E_SHOFF] = len(result)
+    for section in sections:
+        result.extend(struct.pack(order + _SHDR_FORMAT, *section))
+    struct.pack_into(order + _EHDR_FORMAT, result, 0, *header)
+    return bytes(result)
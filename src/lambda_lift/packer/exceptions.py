@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from lambda_lift.exceptions import UserError
+
+
+class PackagingError(UserError): ...
+
+
+class SizeBudgetError(PackagingError): ...
+
+
+class LockTimeoutError(PackagingError): ...
+
+
+class SharedCacheError(PackagingError): ...
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from functools import cache
+
+from lambda_lift.exceptions import UserError
+
+
+@cache
+def get_python_version(python: str | None) -> str:
+    """
+    Returns the major.minor version of the given python executable, e.g. "3.12".
+    """
+    if python is None:
+        return f"{sys.version_info.major}.{sys.version_info.minor}"
+    try:
+        result = subprocess.run(
+            [python, "-c", "import sys; print('%d.%d' % sys.version_info[:2])"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as ex:
+        raise UserError(f"Failed to run python executable {python}: {ex}") from ex
+    return result.stdout.strip()
@@ -2,18 +2,67 @@ from __future__ import annotations
 
 import shutil
 import tempfile
+from contextlib import ExitStack, contextmanager
+from functools import partial
 from pathlib import Path
+from typing import Callable, Generator, Sequence
 
 from lambda_lift.config.enums import Platform
 from lambda_lift.config.single_lambda import SingleLambdaConfig
-from lambda_lift.packer.cache import (
+from lambda_lift.packer.artifact_cache import (
+    get_artifact_fingerprint,
+    check_artifact_up_to_date,
+    bump_artifact_cache,
+)
+from lambda_lift.packer.bytecode import compile_bytecode, is_bytecode_for_optimization
+from lambda_lift.packer.cache.shared import (
+    fetch_shared_dependencies,
+    store_shared_dependencies,
+)
+from lambda_lift.packer.cache.state import (
     get_dependencies_zip_path,
+    get_layer_zip_path,
+    get_source_zip_path,
     check_dependencies_up_to_date,
     bump_dependencies_cache,
 )
-from lambda_lift.packer.pip import run_pip_install, run_pip_freeze
-from lambda_lift.packer.zip import make_empty_zip, zip_folder, add_folders_to_zip
-from lambda_lift.utils.cli_tools import get_console, rich_print
+from lambda_lift.packer.dist_info import (
+    find_installed_distributions,
+    remove_distribution,
+)
+from lambda_lift.packer.exceptions import LockTimeoutError
+from lambda_lift.packer.pip import (
+    PipSources,
+    run_pip_install,
+    run_pip_download,
+    run_pip_resolve,
+    canonicalize_name,
+)
+from lambda_lift.packer.resolution import (
+    get_resolution_key,
+    get_resolution_path,
+    load_resolution,
+    save_resolution,
+)
+from lambda_lift.packer.size_report import (
+    check_size_budget,
+    get_size_report,
+    record_size_report,
+)
+from lambda_lift.packer.store import install_from_store
+from lambda_lift.packer.stripping import strip_shared_objects
+from lambda_lift.packer.trimming import trim_dependencies
+from lambda_lift.packer.zip import (
+    make_empty_zip,
+    zip_folder,
+    merge_folders_into_zip,
+    copy_zip_with_prefix,
+)
+from lambda_lift.utils.cli_tools import format_size, get_console, rich_print
+from lambda_lift.utils.locking import file_lock
+
+# How long to wait for another process building the same lambda
+DEFAULT_LOCK_TIMEOUT_SECONDS = 30 * 60
 
 
 def _get_pip_platform(platform: Platform) -> str:
@@ -30,72 +79,378 @@ def _zip_predicate(path: Path) -> bool:
     )
 
 
+def _precompiled_zip_predicate(optimization: int, path: Path) -> bool:
+    # Only bytecode compiled by lambda-lift is in the build directories
+    if path.suffix == ".pyc":
+        return is_bytecode_for_optimization(path, optimization)
+    return True
+
+
+def _get_artifact_predicate(config: SingleLambdaConfig) -> Callable[[Path], bool]:
+    """
+    Returns the predicate of entries shipped in the built zips. Without
+    precompile, bytecode is never shipped.
+    """
+    if not config.build.precompile:
+        return _zip_predicate
+    return partial(_precompiled_zip_predicate, config.build.precompile_optimization)
+
+
+def _precompile(config: SingleLambdaConfig, root_paths: Sequence[Path]) -> None:
+    failed = compile_bytecode(
+        root_paths,
+        python=config.build.python_executable,
+        optimization=config.build.precompile_optimization,
+    )
+    if failed:
+        rich_print(
+            f"[yellow]{config.name}: {len(failed)} files failed to precompile, "
+            f"they will be compiled at runtime"
+        )
+
+
+@contextmanager
+def _prepared_source_paths(
+    config: SingleLambdaConfig,
+) -> Generator[Sequence[Path], None, None]:
+    """
+    Yields the source folders to be zipped. With precompile, these are staging
+    copies with bytecode, so that the source folders are left untouched.
+    """
+    if not config.build.precompile:
+        yield config.build.source_paths
+        return
+    with tempfile.TemporaryDirectory() as temp_dir:
+        staged_paths = [
+            Path(temp_dir) / str(idx) for idx in range(len(config.build.source_paths))
+        ]
+        for source_path, staged_path in zip(config.build.source_paths, staged_paths):
+            shutil.copytree(
+                source_path,
+                staged_path,
+                ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+            )
+        _precompile(config, staged_paths)
+        yield staged_paths
+
+
+def _get_pip_sources(config: SingleLambdaConfig) -> PipSources:
+    """
+    Fills the wheelhouse (unless in offline mode) and returns the pip options
+    that make the following installs use only the wheelhouse.
+    """
+    build = config.build
+    if build.wheelhouse_path is None:
+        return PipSources(cache_dir=build.pip_cache_path)
+    assert build.requirements_path is not None
+    if build.offline:
+        rich_print(
+            f"[blue]{config.name}: offline mode, installing from the wheelhouse only"
+        )
+    else:
+        build.wheelhouse_path.mkdir(parents=True, exist_ok=True)
+        local_count, downloaded_count = run_pip_download(
+            dest=build.wheelhouse_path,
+            platform=_get_pip_platform(build.platform),
+            python=build.python_executable,
+            requirement=build.requirements_path,
+            cache_dir=build.pip_cache_path,
+        )
+        rich_print(
+            f"[blue]{config.name}: {local_count} wheels served from the wheelhouse, "
+            f"{downloaded_count} downloaded"
+        )
+    return PipSources(
+        cache_dir=build.pip_cache_path,
+        find_links=build.wheelhouse_path,
+        no_index=True,
+    )
+
+
+def _load_cached_pins(
+    config: SingleLambdaConfig, resolution_path: Path | None, refresh: bool
+) -> list[tuple[str, str]] | None:
+    if resolution_path is None or refresh:
+        return None
+    pins = load_resolution(resolution_path)
+    if pins is not None:
+        rich_print(
+            f"[blue]{config.name}: reusing resolved versions of {len(pins)} packages"
+        )
+    return pins
+
+
+def _install_dependencies(
+    config: SingleLambdaConfig,
+    install_path: Path,
+    *,
+    refresh_resolution: bool,
+) -> list[tuple[str, str]]:
+    """
+    Installs the dependencies without the ignored libraries into install_path.
+    Returns the installed versions.
+    """
+    requirements_path = config.build.requirements_path
+    assert requirements_path is not None
+    pip_sources = _get_pip_sources(config)
+    platform = _get_pip_platform(config.build.platform)
+    ignored = {canonicalize_name(name) for name in config.build.ignore_libraries}
+    resolution_key = get_resolution_key(config, platform)
+    resolution_path = (
+        get_resolution_path(config, resolution_key) if resolution_key else None
+    )
+    pins = _load_cached_pins(config, resolution_path, refresh_resolution)
+    if config.build.package_store is not None:
+        if pins is None:
+            pins = [
+                (name, version)
+                for name, version in run_pip_resolve(
+                    python=config.build.python_executable,
+                    platform=platform,
+                    requirement=requirements_path,
+                    sources=pip_sources,
+                )
+                if canonicalize_name(name) not in ignored
+            ]
+            if resolution_path is not None:
+                save_resolution(resolution_path, pins)
+        reused_count, installed_count = install_from_store(
+            store_path=config.build.package_store,
+            pins=pins,
+            platform=platform,
+            python=config.build.python_executable,
+            target=install_path,
+            pip_sources=pip_sources,
+        )
+        rich_print(
+            f"[blue]{config.name}: reused {reused_count} packages from the package "
+            f"store, installed {installed_count}"
+        )
+        return pins
+    if pins is not None:
+        # Install the exact versions resolved before, skipping the resolver
+        assert resolution_path is not None
+        if pins:
+            run_pip_install(
+                target=install_path,
+                platform=platform,
+                python=config.build.python_executable,
+                requirement=resolution_path,
+                no_deps=True,
+                no_compile=True,  # Bytecode is compiled separately if enabled
+                sources=pip_sources,
+            )
+        return pins
+    run_pip_install(
+        target=install_path,
+        platform=platform,
+        python=config.build.python_executable,
+        requirement=requirements_path,
+        no_compile=True,  # Bytecode is compiled separately if enabled
+        sources=pip_sources,
+    )
+    # Remove ignored distributions using their metadata
+    pins = []
+    for distribution in find_installed_distributions(install_path):
+        if canonicalize_name(distribution.name) in ignored:
+            remove_distribution(install_path, distribution)
+        else:
+            pins.append((distribution.name, distribution.version))
+    if resolution_path is not None:
+        save_resolution(resolution_path, pins)
+    return pins
+
+
+def _trim(config: SingleLambdaConfig, install_path: Path) -> None:
+    saved = trim_dependencies(install_path, config.build.trim)
+    rich_print(
+        f"[blue]{config.name}: trimmed {format_size(sum(saved.values()))} "
+        f"of dependencies"
+    )
+    for name, size in sorted(saved.items(), key=lambda item: (-item[1], item[0])):
+        rich_print(f"[blue]  {name}: {format_size(size)}")
+
+
+def _strip_debug(config: SingleLambdaConfig, install_path: Path) -> None:
+    stripped_count, saved_bytes = strip_shared_objects(
+        install_path, config.build.strip_tool
+    )
+    rich_print(
+        f"[blue]{config.name}: stripped debug sections from {stripped_count} "
+        f"shared objects, saved {format_size(saved_bytes)}"
+    )
+
+
 def build_dependencies_zip_file(
     config: SingleLambdaConfig,
+    *,
+    refresh_resolution: bool = False,
 ) -> None:
     if config.build.requirements_path is None:
         make_empty_zip(get_dependencies_zip_path(config))
         return
     with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        # Step 1: Install from requirements.txt
-        step_1_path = temp_path / "step_1"
-        step_1_path.mkdir()
-        run_pip_install(
-            target=step_1_path,
-            platform=_get_pip_platform(config.build.platform),
-            python=config.build.python_executable,
-            requirement=config.build.requirements_path,
+        install_path = Path(temp_dir)
+        # Step 1: Install dependencies
+        pins = _install_dependencies(
+            config, install_path, refresh_resolution=refresh_resolution
         )
-        # Step 2: Obtain list of filtered packages
-        filtered_packages: list[str] = []
-        for pkg in run_pip_freeze(step_1_path, python=config.build.python_executable):
-            if pkg.startswith("-e "):
-                pkg = pkg.removeprefix("-e ")
-            prefix, _, _ = pkg.partition("==")
-            if prefix not in config.build.ignore_libraries:
-                filtered_packages.append(pkg)
-        if not filtered_packages:  # No dependencies to install
-            make_empty_zip(get_dependencies_zip_path(config))
+        if not pins:
+            make_empty_zip(get_dependencies_zip_path(config))  # No dependencies left
             return
-        # Step 3: Install only filtered packages
-        step_3_path = temp_path / "step_3"
-        step_3_path.mkdir()
-        run_pip_install(
-            *filtered_packages,
-            target=step_3_path,
-            platform=_get_pip_platform(config.build.platform),
-            python=config.build.python_executable,
-            no_deps=True,
-        )
-        # Step 4: Pack everything into a lambda zip
+        # Step 2: Post-process installed files
+        if not config.build.trim.is_default:
+            _trim(config, install_path)
+        if config.build.strip_debug:
+            _strip_debug(config, install_path)
+        if config.build.precompile:
+            _precompile(config, [install_path])
+        # Step 3: Pack everything into a lambda zip
         zip_folder(
-            source_path=step_3_path,
+            source_path=install_path,
             dest_path=get_dependencies_zip_path(config),
-            predicate=_zip_predicate,
+            predicate=_get_artifact_predicate(config),
+            compression=config.build.compression,
         )
 
 
-def add_source_code(config: SingleLambdaConfig) -> None:
-    config.build.destination_path.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy(
-        get_dependencies_zip_path(config),
-        config.build.destination_path,
+def add_source_code(
+    config: SingleLambdaConfig, source_paths: Sequence[Path] | None = None
+) -> None:
+    merge_folders_into_zip(
+        base_zip_path=get_dependencies_zip_path(config),
+        dest_path=config.build.destination_path,
+        folders_to_add=(
+            config.build.source_paths if source_paths is None else source_paths
+        ),
+        predicate=_get_artifact_predicate(config),
+        compression=config.build.source_compression,
     )
-    add_folders_to_zip(
-        zip_path=config.build.destination_path,
-        folders_to_add=config.build.source_paths,
-        predicate=_zip_predicate,
+
+
+def build_layer_artifacts(
+    config: SingleLambdaConfig,
+    *,
+    force: bool,
+    source_paths: Sequence[Path] | None = None,
+) -> None:
+    """
+    Builds the artifacts used by deployment profiles with a dependencies layer:
+    the layer zip (dependencies under python/) and the source-only zip.
+    """
+    layer_zip_path = get_layer_zip_path(config)
+    if force or not layer_zip_path.exists():
+        copy_zip_with_prefix(
+            get_dependencies_zip_path(config), layer_zip_path, "python/"
+        )
+    merge_folders_into_zip(
+        base_zip_path=None,
+        dest_path=get_source_zip_path(config),
+        folders_to_add=(
+            config.build.source_paths if source_paths is None else source_paths
+        ),
+        predicate=_get_artifact_predicate(config),
+        compression=config.build.source_compression,
     )
 
 
-def package_lambda(config: SingleLambdaConfig) -> None:
+def run_packaging_stages(
+    config: SingleLambdaConfig,
+    on_stage: Callable[[str | None], None] = lambda stage: None,
+    *,
+    refresh_resolution: bool = False,
+    paranoid: bool = False,
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Runs all packaging steps for a single lambda without a progress display;
+    messages go through rich_print. on_stage is called with a short description
+    of a long-running stage when it starts and with None when it ends.
+    refresh_resolution forces dependencies to be rebuilt from freshly resolved
+    versions. paranoid hashes all cached files instead of trusting their
+    recorded stats. Raises SizeBudgetError if the artifact exceeds the size
+    budget, whether it was rebuilt or not.
+
+    Other processes building the same lambda with the same cache path are
+    waited for up to lock_timeout seconds, after which their results are reused
+    if still up to date.
+    """
+    lock_path = config.build.cache_path / f"build_{config.name}.lock"
+    with ExitStack() as stack:
+        try:
+            stack.enter_context(
+                file_lock(
+                    lock_path,
+                    timeout=lock_timeout,
+                    on_wait=lambda: on_stage("waiting for another build"),
+                )
+            )
+        except TimeoutError as ex:
+            raise LockTimeoutError(
+                f"{config.name} is being built by another process: {ex}"
+            ) from ex
+        on_stage(None)
+        _run_locked_packaging_stages(
+            config, on_stage, refresh_resolution=refresh_resolution, paranoid=paranoid
+        )
+
+
+def _run_locked_packaging_stages(
+    config: SingleLambdaConfig,
+    on_stage: Callable[[str | None], None],
+    *,
+    refresh_resolution: bool,
+    paranoid: bool,
+) -> None:
+    dependencies_rebuilt = False
+    if refresh_resolution or not check_dependencies_up_to_date(
+        config, paranoid=paranoid
+    ):
+        on_stage("working on dependencies")
+        # Refreshing means the shared entry may have outdated versions, so it
+        # is replaced with the freshly resolved ones
+        if refresh_resolution or not fetch_shared_dependencies(config):
+            build_dependencies_zip_file(config, refresh_resolution=refresh_resolution)
+            store_shared_dependencies(config, overwrite=refresh_resolution)
+        bump_dependencies_cache(config)
+        dependencies_rebuilt = True
+        on_stage(None)
+    fingerprint = get_artifact_fingerprint(config, _zip_predicate, paranoid=paranoid)
+    # Up-to-date artifacts are left untouched, including their mtime
+    if not check_artifact_up_to_date(config, fingerprint):
+        with _prepared_source_paths(config) as source_paths:
+            add_source_code(config, source_paths)
+            if config.uses_dependencies_layer:
+                build_layer_artifacts(
+                    config, force=dependencies_rebuilt, source_paths=source_paths
+                )
+        bump_artifact_cache(config, fingerprint)
+    size_report = get_size_report(config.build.destination_path)
+    record_size_report(config, size_report)
+    check_size_budget(config, size_report)
+
+
+def package_lambda(
+    config: SingleLambdaConfig,
+    *,
+    refresh_resolution: bool = False,
+    paranoid: bool = False,
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT_SECONDS,
+) -> None:
     with get_console().status(f"[blue]Packaging {config.name}...") as status:
-        if not check_dependencies_up_to_date(config):
-            base_status = status.status
-            status.update(f"[blue]Packaging {config.name} (working on dependencies)...")
-            build_dependencies_zip_file(config)
-            bump_dependencies_cache(config)
-            status.update(base_status)
-        add_source_code(config)
+        base_status = status.status
+
+        def on_stage(stage: str | None) -> None:
+            if stage is None:
+                status.update(base_status)
+            else:
+                status.update(f"[blue]Packaging {config.name} ({stage})...")
+
+        run_packaging_stages(
+            config,
+            on_stage,
+            refresh_resolution=refresh_resolution,
+            paranoid=paranoid,
+            lock_timeout=lock_timeout,
+        )
     rich_print(f"[blue]Packaging of {config.name} completed")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Sequence
+
+from rich import markup
+from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.exceptions import UserError
+from lambda_lift.packer.exceptions import PackagingError
+from lambda_lift.packer.packaging import (
+    DEFAULT_LOCK_TIMEOUT_SECONDS,
+    run_packaging_stages,
+)
+from lambda_lift.utils.cli_tools import get_console, redirect_rich_print, rich_print
+
+# Interval at which the main process refreshes progress while waiting for workers
+_POLL_INTERVAL_SECONDS = 0.1
+
+
+def _package_lambda_worker(
+    config: SingleLambdaConfig,
+    events: queue.Queue[tuple[str, str, str]],
+    refresh_resolution: bool,
+    paranoid: bool,
+    lock_timeout: float,
+) -> str | None:
+    """
+    Runs in a worker process. Returns None on success or an error description
+    on failure, so that the exception doesn't have to be pickled. Stages and
+    messages are sent to the main process as (name, kind, value) events, so
+    that they don't interfere with its progress display.
+    """
+    events.put((config.name, "stage", "packaging"))
+    try:
+        with redirect_rich_print(
+            lambda message: events.put((config.name, "message", message))
+        ):
+            run_packaging_stages(
+                config,
+                lambda stage: events.put((config.name, "stage", stage or "packaging")),
+                refresh_resolution=refresh_resolution,
+                paranoid=paranoid,
+                lock_timeout=lock_timeout,
+            )
+    except UserError as ex:
+        return str(ex)
+    except Exception:
+        return traceback.format_exc()
+    return None
+
+
+def package_lambdas_in_parallel(
+    configs: Sequence[SingleLambdaConfig],
+    jobs: int,
+    *,
+    refresh_resolution: bool = False,
+    paranoid: bool = False,
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Packages the given lambdas using a pool of worker processes.
+    Failures don't interrupt other builds and are reported together at the end.
+    """
+    errors: dict[str, str] = {}
+    with (
+        multiprocessing.Manager() as manager,
+        ProcessPoolExecutor(max_workers=jobs) as executor,
+        Progress(
+            SpinnerColumn(finished_text="-"),
+            TextColumn("{task.description}"),
+            TimeElapsedColumn(),
+            console=get_console(),
+        ) as progress,
+    ):
+        events = manager.Queue()
+        task_ids = {
+            config.name: progress.add_task(
+                f"[blue]{config.name}: queued", total=1, start=False
+            )
+            for config in configs
+        }
+        futures: dict[Future[str | None], str] = {
+            executor.submit(
+                _package_lambda_worker,
+                config,
+                events,
+                refresh_resolution,
+                paranoid,
+                lock_timeout,
+            ): config.name
+            for config in configs
+        }
+        pending = set(futures.keys())
+        while pending:
+            done, pending = wait(
+                pending, timeout=_POLL_INTERVAL_SECONDS, return_when=FIRST_COMPLETED
+            )
+            while True:
+                try:
+                    name, kind, value = events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "message":
+                    rich_print(value)  # Printed above the progress display
+                    continue
+                progress.start_task(task_ids[name])
+                progress.update(task_ids[name], description=f"[blue]{name}: {value}")
+            for future in done:
+                name = futures[future]
+                try:
+                    error = future.result()
+                except Exception as ex:  # Worker process crashed
+                    error = f"{type(ex).__name__}: {ex}"
+                if error is None:
+                    description = f"[blue]{name}: completed"
+                else:
+                    errors[name] = error
+                    description = f"[red]{name}: failed"
+                progress.update(task_ids[name], description=description, completed=1)
+                progress.stop_task(task_ids[name])
+    for name in (config.name for config in configs):
+        if name in errors:
+            rich_print(
+                f"[red][bold]Packaging of {name} failed\n[/bold]"
+                f"{markup.escape(errors[name])}"
+            )
+    if errors:
+        raise PackagingError(
+            f"Failed to package {len(errors)} of {len(configs)} lambdas: "
+            f"{', '.join(sorted(errors))}"
+        )
+    rich_print(f"[blue]Packaging of {len(configs)} lambdas completed")
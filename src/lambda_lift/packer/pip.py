@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import json
+import re
 import shlex
 import subprocess
 import sys
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
 
 from rich import markup
@@ -11,6 +15,26 @@ from lambda_lift.exceptions import UserError
 from lambda_lift.utils.cli_tools import rich_print
 
 
+@dataclass(frozen=True)
+class PipSources:
+    """
+    Controls where pip looks for distributions: a persistent download cache,
+    a local wheelhouse directory, and whether the package index may be used.
+    """
+
+    cache_dir: Path | None = None
+    find_links: Path | None = None
+    no_index: bool = False
+
+    @property
+    def args(self) -> list[str]:
+        return [
+            *(("--cache-dir", str(self.cache_dir)) if self.cache_dir else ()),
+            *(("--find-links", str(self.find_links)) if self.find_links else ()),
+            *(("--no-index",) if self.no_index else ()),
+        ]
+
+
 def run_pip_install(
     *packages: str,
     python: str | None = None,
@@ -20,16 +44,20 @@ def run_pip_install(
     only_binary: str = ":all:",
     upgrade: bool = False,
     no_deps: bool = False,
+    no_compile: bool = False,
     requirement: Path | None = None,
+    sources: PipSources = PipSources(),
 ) -> None:
     cmd = [
         *((python or sys.executable), "-m", "pip", "install"),
+        *sources.args,
         *(("--target", str(target)) if target else ()),
         *(("--platform", platform) if platform else ()),
         *(("--implementation", implementation) if implementation else ()),
         *(("--only-binary", only_binary) if only_binary else ()),
         *(("--upgrade",) if upgrade else ()),
         *(("--no-deps",) if no_deps else ()),
+        *(("--no-compile",) if no_compile else ()),
         *(("--requirement", str(requirement)) if requirement else ()),
         *packages,
     ]
@@ -49,19 +77,95 @@ def run_pip_install(
         raise UserError(f"pip install failed")
 
 
-def run_pip_freeze(
-    path: Path,
+def canonicalize_name(name: str) -> str:
+    """
+    Normalizes a distribution name as defined in PEP 503.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def run_pip_resolve(
     *,
     python: str | None = None,
-) -> list[str]:
-    cmd = [(python or sys.executable), "-m", "pip", "freeze", "--path", str(path)]
+    platform: str | None = None,
+    implementation: str | None = "cp",
+    only_binary: str = ":all:",
+    requirement: Path,
+    sources: PipSources = PipSources(),
+) -> list[tuple[str, str]]:
+    """
+    Resolves requirements without installing anything.
+    Returns a list of (distribution name, version) pairs.
+    Requires pip 22.2 or newer.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report_path = Path(temp_dir) / "report.json"
+        cmd = [
+            *((python or sys.executable), "-m", "pip", "install"),
+            *("--dry-run", "--ignore-installed", "--quiet"),
+            *sources.args,
+            *("--report", str(report_path)),
+            # Platform options are only accepted together with --target
+            *("--target", str(Path(temp_dir) / "target")),
+            *(("--platform", platform) if platform else ()),
+            *(("--implementation", implementation) if implementation else ()),
+            *(("--only-binary", only_binary) if only_binary else ()),
+            *("--requirement", str(requirement)),
+        ]
+        sp = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _, stderr = sp.communicate()
+        if sp.returncode != 0:
+            cmd_str = " ".join(map(shlex.quote, cmd))
+            rich_print(
+                f"[red][bold]pip dependency resolution failed\n> [/bold]"
+                f"{markup.escape(cmd_str)}\n[pink3]{markup.escape(stderr.decode())}"
+            )
+            raise UserError(f"pip dependency resolution failed")
+        report = json.loads(report_path.read_text())
+    return [
+        (item["metadata"]["name"], item["metadata"]["version"])
+        for item in report["install"]
+    ]
+
+
+def run_pip_download(
+    *,
+    dest: Path,
+    python: str | None = None,
+    platform: str | None = None,
+    implementation: str | None = "cp",
+    only_binary: str = ":all:",
+    requirement: Path,
+    cache_dir: Path | None = None,
+) -> tuple[int, int]:
+    """
+    Downloads the wheels of all requirements into dest, reusing the wheels that
+    are already there. Returns the number of wheels found locally and the number
+    of wheels downloaded.
+    """
+    cmd = [
+        *((python or sys.executable), "-m", "pip", "download"),
+        *("--dest", str(dest), "--find-links", str(dest)),
+        *(("--cache-dir", str(cache_dir)) if cache_dir else ()),
+        *(("--platform", platform) if platform else ()),
+        *(("--implementation", implementation) if implementation else ()),
+        *(("--only-binary", only_binary) if only_binary else ()),
+        *("--requirement", str(requirement)),
+    ]
     sp = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     stdout, stderr = sp.communicate()
     if sp.returncode != 0:
         cmd_str = " ".join(map(shlex.quote, cmd))
         rich_print(
-            f"[red][bold]pip freeze failed\n> [/bold]{markup.escape(cmd_str)}\n"
-            f"[pink3]{markup.escape(stderr.decode())}",
+            f"[red][bold]pip download failed\n> [/bold]{markup.escape(cmd_str)}\n"
+            f"[pink3]{markup.escape(stderr.decode())}"
         )
-        raise UserError(f"pip freeze failed")
-    return stdout.decode().splitlines()
+        raise UserError(f"pip download failed")
+    local_count = downloaded_count = 0
+    for line in stdout.decode(errors="replace").splitlines():
+        line = line.strip()
+        if line.startswith("File was already downloaded"):
+            local_count += 1
+        elif line.startswith("Saved "):
+            downloaded_count += 1
+    return local_count, downloaded_count
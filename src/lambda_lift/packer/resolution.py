@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Sequence
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.packer.interpreter import get_python_version
+from lambda_lift.packer.pip import canonicalize_name
+from lambda_lift.utils.fs import atomic_output_path
+from lambda_lift.utils.hashing import get_file_blake2b, get_string_blake2b
+
+# Requirement lines that can't be reproduced from a name==version pin
+_DIRECT_REFERENCE_RE = re.compile(r"^\s*(-e|--editable|\.|/)|://|\s@\s", re.MULTILINE)
+# Options including other requirements or constraints files
+_NESTED_FILE_RE = re.compile(
+    r"^\s*(?:-r|-c|--requirement|--constraint)(?:\s*=\s*|\s*)(\S+)", re.MULTILINE
+)
+
+
+def get_requirements_files(requirements_path: Path) -> list[Path]:
+    """
+    Returns the requirements file followed by all files it includes with -r
+    and -c, recursively. Like pip, nested paths are relative to the including
+    file. Missing files are returned as well; pip reports them.
+    """
+    result: list[Path] = []
+    pending = [requirements_path]
+    while pending:
+        path = pending.pop(0)
+        if path in result:
+            continue
+        result.append(path)
+        try:
+            text = path.read_text()
+        except FileNotFoundError:
+            continue
+        pending.extend(
+            path.parent / match.group(1) for match in _NESTED_FILE_RE.finditer(text)
+        )
+    return result
+
+
+def get_requirements_hash(requirements_path: Path | None) -> str:
+    """
+    Returns the digest of the requirements file and all files it includes.
+    Paths aren't part of it. Without includes, it is the digest of the file.
+    """
+    if requirements_path is None:
+        return ""
+    paths = get_requirements_files(requirements_path)
+    if len(paths) == 1:
+        return get_file_blake2b(requirements_path)
+    return get_string_blake2b(
+        json.dumps([get_file_blake2b(p) if p.is_file() else None for p in paths])
+    )
+
+
+def get_resolution_key(config: SingleLambdaConfig, platform: str) -> str | None:
+    """
+    Returns the key of the resolved pins for the current requirements, or None
+    if the requirements can't be cached as plain pins (e.g. direct URLs).
+    """
+    requirements_path = config.build.requirements_path
+    if requirements_path is None:
+        return None
+    for path in get_requirements_files(requirements_path):
+        if path.is_file() and _DIRECT_REFERENCE_RE.search(path.read_text()):
+            return None
+    jsonable_object = {
+        "requirements": get_requirements_hash(requirements_path),
+        "platform": platform,
+        "python_version": get_python_version(config.build.python_executable),
+        "ignore_libraries": sorted(
+            canonicalize_name(name) for name in config.build.ignore_libraries
+        ),
+    }
+    return get_string_blake2b(json.dumps(jsonable_object, sort_keys=True))
+
+
+def get_resolution_path(config: SingleLambdaConfig, key: str) -> Path:
+    """
+    Pins are stored in requirements format, so that the file can be passed
+    to pip directly. Lambdas sharing a cache path share their resolutions.
+    """
+    return config.build.cache_path / "resolutions" / f"{key}.txt"
+
+
+def load_resolution(path: Path) -> list[tuple[str, str]] | None:
+    try:
+        lines = path.read_text().splitlines()
+    except FileNotFoundError:
+        return None
+    result: list[tuple[str, str]] = []
+    for line in lines:
+        name, separator, version = line.partition("==")
+        if not separator or not name or not version:
+            return None  # Corrupted file, resolve again
+        result.append((name, version))
+    return result
+
+
+def save_resolution(path: Path, pins: Sequence[tuple[str, str]]) -> None:
+    with atomic_output_path(path) as temp_path:
+        temp_path.write_text(
+            "".join(f"{name}=={version}\n" for name, version in sorted(pins))
+        )
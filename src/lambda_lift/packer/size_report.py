@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import zipfile
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from rich.table import Table
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.deployment.limits import MAX_DIRECT_UPLOAD_SIZE, MAX_UNZIPPED_SIZE
+from lambda_lift.packer.exceptions import SizeBudgetError
+from lambda_lift.utils.cli_tools import format_size, get_console, rich_print
+from lambda_lift.utils.fs import atomic_output_path
+
+_HISTORY_VERSION = 1
+_LARGEST_FILES_COUNT = 10
+_PRINTED_PACKAGES_COUNT = 20
+
+
+@dataclass(frozen=True)
+class SizeEntry:
+    name: str
+    compressed_size: int
+    uncompressed_size: int
+
+    @property
+    def jsonable(self) -> list[Any]:
+        return [self.name, self.compressed_size, self.uncompressed_size]
+
+
+@dataclass(frozen=True)
+class SizeReport:
+    """
+    Sizes of a zip file: the file itself, its entries grouped by their top-level
+    name (package, module or dist-info directory) and its largest entries.
+    Both groups are sorted by compressed size, largest first.
+    """
+
+    zip_size: int
+    packages: tuple[SizeEntry, ...]
+    largest_files: tuple[SizeEntry, ...]
+
+    @property
+    def compressed_size(self) -> int:
+        return sum(entry.compressed_size for entry in self.packages)
+
+    @property
+    def uncompressed_size(self) -> int:
+        return sum(entry.uncompressed_size for entry in self.packages)
+
+    @property
+    def jsonable(self) -> dict[str, Any]:
+        return {
+            "zip_size": self.zip_size,
+            "packages": [entry.jsonable for entry in self.packages],
+            "largest_files": [entry.jsonable for entry in self.largest_files],
+        }
+
+    @classmethod
+    def from_jsonable(cls, value: dict[str, Any]) -> SizeReport:
+        return cls(
+            zip_size=value["zip_size"],
+            packages=tuple(SizeEntry(*entry) for entry in value["packages"]),
+            largest_files=tuple(SizeEntry(*entry) for entry in value["largest_files"]),
+        )
+
+
+def _sorted_entries(entries: list[SizeEntry]) -> tuple[SizeEntry, ...]:
+    return tuple(
+        sorted(entries, key=lambda entry: (-entry.compressed_size, entry.name))
+    )
+
+
+def get_size_report(
+    zip_path: Path, *, largest_files_count: int = _LARGEST_FILES_COUNT
+) -> SizeReport:
+    """
+    Builds the size report from the central directory of the zip file, which
+    lists the sizes of all entries; no entry is read or decompressed.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zip_file:
+        infos = [info for info in zip_file.infolist() if not info.is_dir()]
+    packages: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for info in infos:
+        sizes = packages[info.filename.split("/", 1)[0]]
+        sizes[0] += info.compress_size
+        sizes[1] += info.file_size
+    files = _sorted_entries(
+        [SizeEntry(info.filename, info.compress_size, info.file_size) for info in infos]
+    )
+    return SizeReport(
+        zip_size=zip_path.stat().st_size,
+        packages=_sorted_entries(
+            [SizeEntry(name, *sizes) for name, sizes in packages.items()]
+        ),
+        largest_files=files[:largest_files_count],
+    )
+
+
+def _get_history_path(config: SingleLambdaConfig) -> Path:
+    return config.build.cache_path / f"size_{config.name}.json"
+
+
+def _load_history(config: SingleLambdaConfig) -> dict[str, Any]:
+    try:
+        history = json.loads(_get_history_path(config).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(history, dict) or history.get("version") != _HISTORY_VERSION:
+        return {}
+    return history
+
+
+def record_size_report(config: SingleLambdaConfig, report: SizeReport) -> None:
+    """
+    Records the report of a new build, keeping the report of the previous one.
+    """
+    current = _load_history(config).get("current")
+    if current == report.jsonable:
+        return
+    history = {
+        "version": _HISTORY_VERSION,
+        "current": report.jsonable,
+        "previous": current,
+    }
+    with atomic_output_path(_get_history_path(config)) as temp_path:
+        temp_path.write_text(json.dumps(history))
+
+
+def get_previous_size_report(
+    config: SingleLambdaConfig, report: SizeReport
+) -> SizeReport | None:
+    """
+    Returns the report of the build preceding the one described by report,
+    or None if it isn't known.
+    """
+    history = _load_history(config)
+    current = history.get("current")
+    previous = history.get("previous") if current == report.jsonable else current
+    return SizeReport.from_jsonable(previous) if previous is not None else None
+
+
+def check_size_budget(config: SingleLambdaConfig, report: SizeReport) -> None:
+    """
+    Raises SizeBudgetError if the artifact exceeds the configured size budget.
+    """
+    budget = config.build.size_budget
+    violations = []
+    if budget.max_zipped_size is not None and report.zip_size > budget.max_zipped_size:
+        violations.append(
+            f"zipped size {format_size(report.zip_size)} exceeds the budget "
+            f"of {format_size(budget.max_zipped_size)}"
+        )
+    if (
+        budget.max_unzipped_size is not None
+        and report.uncompressed_size > budget.max_unzipped_size
+    ):
+        violations.append(
+            f"unzipped size {format_size(report.uncompressed_size)} exceeds the "
+            f"budget of {format_size(budget.max_unzipped_size)}"
+        )
+    if violations:
+        raise SizeBudgetError(f"Artifact of {config.name}: " + ", ".join(violations))
+
+
+def _format_change(size: int, previous_size: int | None) -> str:
+    if previous_size is None:
+        return "[yellow]new"
+    change = size - previous_size
+    if change == 0:
+        return "[bright_black]-"
+    color = "red" if change > 0 else "green"
+    return f"[{color}]{'+' if change > 0 else '-'}{format_size(abs(change))}"
+
+
+def _format_total(size: int, limit: int, previous_size: int | None) -> str:
+    result = f"{format_size(size)} ({size / limit:.0%} of {format_size(limit)})"
+    if previous_size is not None:
+        result += f" {_format_change(size, previous_size)}"
+    return result
+
+
+def print_size_report(
+    config: SingleLambdaConfig,
+    report: SizeReport,
+    previous: SizeReport | None,
+) -> None:
+    """
+    Prints the report, with changes relative to the previous report if given.
+    Totals are compared against the AWS quotas for direct uploads and unzipped code.
+    """
+    rich_print(f"[blue]{config.name}: {config.build.destination_path}")
+    rich_print(
+        "  Zipped: "
+        + _format_total(
+            report.zip_size,
+            MAX_DIRECT_UPLOAD_SIZE,
+            previous.zip_size if previous else None,
+        )
+    )
+    rich_print(
+        "  Unzipped: "
+        + _format_total(
+            report.uncompressed_size,
+            MAX_UNZIPPED_SIZE,
+            previous.uncompressed_size if previous else None,
+        )
+    )
+    previous_packages = (
+        {entry.name: entry for entry in previous.packages} if previous else {}
+    )
+    table = Table("Package", "Compressed", "Uncompressed", "Change")
+    for entry in report.packages[:_PRINTED_PACKAGES_COUNT]:
+        previous_entry = previous_packages.get(entry.name)
+        table.add_row(
+            entry.name,
+            format_size(entry.compressed_size),
+            format_size(entry.uncompressed_size),
+            (
+                _format_change(
+                    entry.compressed_size,
+                    previous_entry.compressed_size if previous_entry else None,
+                )
+                if previous
+                else ""
+            ),
+        )
+    if len(report.packages) > _PRINTED_PACKAGES_COUNT:
+        others = report.packages[_PRINTED_PACKAGES_COUNT:]
+        table.add_row(
+            f"{len(others)} more",
+            format_size(sum(entry.compressed_size for entry in others)),
+            format_size(sum(entry.uncompressed_size for entry in others)),
+            "",
+        )
+    current_names = {entry.name for entry in report.packages}
+    for name, entry in previous_packages.items():
+        if name not in current_names:
+            table.add_row(
+                name, "", "", f"[green]removed (-{format_size(entry.compressed_size)})"
+            )
+    get_console().print(table)
+    table = Table("Largest file", "Compressed", "Uncompressed")
+    for entry in report.largest_files:
+        table.add_row(
+            entry.name,
+            format_size(entry.compressed_size),
+            format_size(entry.uncompressed_size),
+        )
+    get_console().print(table)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Sequence
+
+from lambda_lift.packer.interpreter import get_python_version
+from lambda_lift.packer.pip import (
+    PipSources,
+    canonicalize_name,
+    run_pip_install,
+)
+from lambda_lift.utils.fs import link_tree
+
+# Maximum number of concurrent pip processes populating the store
+_STORE_INSTALL_JOBS = 4
+
+
+def get_store_entry_path(
+    store_path: Path,
+    *,
+    name: str,
+    version: str,
+    platform: str,
+    python_version: str,
+) -> Path:
+    """
+    Returns the directory holding the installed files of a single distribution.
+    """
+    return (
+        store_path
+        / platform
+        / f"py{python_version}"
+        / f"{canonicalize_name(name)}-{version}"
+    )
+
+
+def _install_into_store(
+    entry_path: Path,
+    *,
+    name: str,
+    version: str,
+    platform: str,
+    python: str | None,
+    pip_sources: PipSources,
+) -> None:
+    entry_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=entry_path.parent, prefix=".tmp-") as temp_dir:
+        install_path = Path(temp_dir) / "install"
+        run_pip_install(
+            f"{name}=={version}",
+            target=install_path,
+            platform=platform,
+            python=python,
+            no_deps=True,
+            no_compile=True,  # Bytecode isn't shipped
+            sources=pip_sources,
+        )
+        install_path.mkdir(exist_ok=True)  # Distributions without any files
+        try:
+            # Renaming is atomic, so the store never exposes partial entries
+            install_path.rename(entry_path)
+        except OSError:
+            if not entry_path.is_dir():
+                raise
+            # Another process has populated the same entry concurrently
+
+
+def install_from_store(
+    *,
+    store_path: Path,
+    pins: Sequence[tuple[str, str]],
+    platform: str,
+    python: str | None,
+    target: Path,
+    pip_sources: PipSources = PipSources(),
+) -> tuple[int, int]:
+    """
+    Installs the pinned distributions missing from the store, and links the
+    store entries into target. Files in target are shared with the store, so
+    they must be replaced rather than modified in place.
+    Returns the number of distributions reused from the store and the number
+    of distributions installed.
+    """
+    python_version = get_python_version(python)
+    entries: dict[tuple[str, str], Path] = {
+        (name, version): get_store_entry_path(
+            store_path,
+            name=name,
+            version=version,
+            platform=platform,
+            python_version=python_version,
+        )
+        for name, version in pins
+    }
+    missing = [pin for pin, path in entries.items() if not path.is_dir()]
+    if missing:
+        with ThreadPoolExecutor(
+            max_workers=min(_STORE_INSTALL_JOBS, len(missing))
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _install_into_store,
+                    entries[(name, version)],
+                    name=name,
+                    version=version,
+                    platform=platform,
+                    python=python,
+                    pip_sources=pip_sources,
+                )
+                for name, version in missing
+            ]
+            for future in futures:
+                future.result()
+    # Later entries override files of earlier ones, as pip would do
+    for entry_path in sorted(entries.values()):
+        link_tree(entry_path, target)
+    return len(entries) - len(missing), len(missing)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+
+from lambda_lift.exceptions import UserError
+from lambda_lift.packer.elf import ELF_MAGIC, strip_debug_sections
+from lambda_lift.utils.fs import atomic_output_path
+
+
+def _is_shared_object(path: Path) -> bool:
+    # Matches both extension modules (foo.cpython-312-x86_64-linux-gnu.so)
+    # and versioned libraries (libfoo.so.1.2)
+    if "so" not in path.name.split(".")[1:]:
+        return False
+    if path.is_symlink() or not path.is_file():
+        return False
+    with path.open("rb") as f:
+        return f.read(len(ELF_MAGIC)) == ELF_MAGIC
+
+
+def _strip_with_tool(path: Path, temp_path: Path, strip_tool: str) -> None:
+    try:
+        subprocess.run(
+            [strip_tool, "--strip-debug", "-o", str(temp_path), str(path)],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except FileNotFoundError as ex:
+        raise UserError(f"Strip tool {strip_tool} not found") from ex
+    except subprocess.CalledProcessError as ex:
+        raise UserError(f"Failed to strip {path}: {ex.stderr}") from ex
+
+
+def _strip_file(path: Path, strip_tool: str | None) -> int:
+    """
+    Replaces the file with its stripped version. The file is replaced rather
+    than modified in place, since it may be linked from the package store.
+    Returns the number of bytes saved.
+    """
+    size_before = path.stat().st_size
+    stripped: bytes | None = None
+    if strip_tool is None:
+        stripped = strip_debug_sections(path.read_bytes())
+        if stripped is None:
+            return 0  # Nothing to strip, the file is left untouched
+    with atomic_output_path(path) as temp_path:
+        if stripped is None:
+            _strip_with_tool(path, temp_path, str(strip_tool))
+        else:
+            temp_path.write_bytes(stripped)
+        shutil.copymode(path, temp_path)
+    return size_before - path.stat().st_size
+
+
+def strip_shared_objects(target: Path, strip_tool: str | None) -> tuple[int, int]:
+    """
+    Removes debug sections from all ELF shared objects in target, either with
+    the given strip tool or with the built-in ELF section remover.
+    Returns the number of stripped files and the number of bytes saved.
+    """
+    stripped_count = saved_bytes = 0
+    for path in sorted(target.rglob("*")):
+        if not _is_shared_object(path):
+            continue
+        saved = _strip_file(path, strip_tool)
+        if saved > 0:
+            stripped_count += 1
+            saved_bytes += saved
+    return stripped_count, saved_bytes
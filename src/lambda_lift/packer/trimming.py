@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from lambda_lift.config.enums import TrimProfile
+from lambda_lift.config.single_lambda import TrimConfig
+from lambda_lift.packer.dist_info import find_installed_distributions
+from lambda_lift.packer.pip import canonicalize_name
+
+# Patterns are matched against paths relative to the installation directory.
+# "*" matches across directories, so "*/tests/*" matches tests at any depth.
+
+# Files that are never used at runtime
+_SAFE_PATTERNS = (
+    # Type stubs
+    "*.pyi",
+    # C/C++ and Cython sources and headers
+    "*.c",
+    "*.h",
+    "*.cpp",
+    "*.hpp",
+    "*.pyx",
+    "*.pxd",
+    "*.pxi",
+    # Installer bookkeeping; METADATA is kept for importlib.metadata
+    "*.dist-info/RECORD",
+    "*.dist-info/INSTALLER",
+    "*.dist-info/REQUESTED",
+    "*.dist-info/direct_url.json",
+    # Windows launchers shipped by setuptools
+    "*.exe",
+)
+
+# Files that are almost never used at runtime, but that some packages might load
+_AGGRESSIVE_PATTERNS = (
+    "tests/*",
+    "*/tests/*",
+    "test/*",
+    "*/test/*",
+    "examples/*",
+    "*/examples/*",
+    "*.md",
+    "*.rst",
+    # Console scripts
+    "bin/*",
+)
+
+# Documentation directories only lose files that aren't code: some packages
+# import modules from them, e.g. botocore.docs and boto3.docs
+_AGGRESSIVE_NON_CODE_PATTERNS = (
+    "docs/*",
+    "*/docs/*",
+    "doc/*",
+    "*/doc/*",
+)
+_CODE_SUFFIXES = frozenset((".py", ".pyc", ".so", ".pyd"))
+
+_PROFILE_PATTERNS: dict[TrimProfile, tuple[str, ...]] = {
+    TrimProfile.SAFE: _SAFE_PATTERNS,
+    TrimProfile.AGGRESSIVE: _SAFE_PATTERNS + _AGGRESSIVE_PATTERNS,
+}
+_PROFILE_NON_CODE_PATTERNS: dict[TrimProfile, tuple[str, ...]] = {
+    TrimProfile.SAFE: (),
+    TrimProfile.AGGRESSIVE: _AGGRESSIVE_NON_CODE_PATTERNS,
+}
+
+# Savings of files not listed in any distribution's RECORD
+UNKNOWN_DISTRIBUTION = "(unknown)"
+
+
+def trim_dependencies(target: Path, trim: TrimConfig) -> dict[str, int]:
+    """
+    Removes the files of the installed dependencies that match the trimming
+    profile or the excludes of their distribution, and directories left empty.
+    Returns the number of bytes removed per distribution name.
+    """
+    profile_patterns = _PROFILE_PATTERNS[trim.profile] if trim.profile else ()
+    non_code_patterns = _PROFILE_NON_CODE_PATTERNS[trim.profile] if trim.profile else ()
+    excludes = {
+        canonicalize_name(name): tuple(patterns)
+        for name, patterns in trim.excludes.items()
+    }
+    # Ownership must be read before RECORD files are trimmed
+    owners: dict[Path, str] = {}
+    for distribution in find_installed_distributions(target):
+        for path in distribution.get_files(target):
+            owners[path] = distribution.name
+    saved: dict[str, int] = defaultdict(int)
+    parents: set[Path] = set()
+    for path in sorted(target.rglob("*")):
+        if path.is_dir():
+            continue
+        owner = owners.get(path)
+        patterns = profile_patterns
+        if owner is not None:
+            patterns += excludes.get(canonicalize_name(owner), ())
+        if path.suffix not in _CODE_SUFFIXES:
+            patterns += non_code_patterns
+        relative_path = path.relative_to(target).as_posix()
+        if any(fnmatchcase(relative_path, pattern) for pattern in patterns):
+            saved[owner or UNKNOWN_DISTRIBUTION] += path.lstat().st_size
+            path.unlink()
+            parents.update(path.parents)
+    # Deepest directories first, so that nested empty directories are removed
+    for parent in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+        if parent.is_relative_to(target) and parent != target:
+            if parent.is_dir() and not any(parent.iterdir()):
+                parent.rmdir()
+    return dict(saved)
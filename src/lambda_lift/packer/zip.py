@@ -1,42 +1,415 @@
 from __future__ import annotations
 
-import shutil
+import os
+import struct
 import tempfile
 import zipfile
-from pathlib import Path
-from typing import Callable, Iterable
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from copy import copy
+from functools import partial
+from pathlib import Path, PurePosixPath
+from typing import IO, Callable, Iterable, Iterator
 
+import repro_zipfile
 from repro_zipfile import ReproducibleZipFile
 
+from lambda_lift.config.single_lambda import CompressionConfig
+from lambda_lift.utils.fs import atomic_output_path
+
+# Data descriptor flag: sizes and CRC follow the data instead of the local header
+_DATA_DESCRIPTOR_FLAG = 0x08
+_COPY_CHUNK_SIZE = 1024 * 1024
+# Maximum total size of files compressed ahead of being written
+_MAX_IN_FLIGHT_BYTES = 256 * 1024 * 1024
+
+
+def _get_default_compress_jobs() -> int:
+    return min(32, os.cpu_count() or 1)
+
+
+def _split_chunks(data: bytes) -> Iterator[bytes]:
+    for offset in range(0, len(data), _COPY_CHUNK_SIZE):
+        yield data[offset : offset + _COPY_CHUNK_SIZE]
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(_COPY_CHUNK_SIZE):
+            yield chunk
+
+
+def _deflate_chunks(chunks: Iterable[bytes], level: int | None) -> Iterator[bytes]:
+    """
+    Compresses the chunks with the same compressor settings as zipfile uses for
+    ZIP_DEFLATED. With level 0, the framing of stored deflate blocks depends on
+    how the input is fed to zlib, so files are always fed in chunks of
+    _COPY_CHUNK_SIZE, whether they are compressed in memory or streamed.
+    """
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, -15
+    )
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+def _is_deflate_worth_it(
+    compression: CompressionConfig, file_size: int, compress_size: int
+) -> bool:
+    threshold = compression.store_threshold
+    return threshold is None or compress_size <= file_size * threshold
+
+
+def _compress_file(
+    path: Path, arcname: str, compression: CompressionConfig
+) -> tuple[zipfile.ZipInfo, bytes]:
+    """
+    Compresses a file in memory according to the compression policy.
+    Returns the entry info and the data to be written after its header.
+    """
+    data = path.read_bytes()
+    info = zipfile.ZipInfo.from_file(path, arcname)
+    info.file_size = len(data)
+    info.CRC = zlib.crc32(data)
+    info.compress_type = zipfile.ZIP_STORED
+    payload = data
+    if not compression.is_stored(arcname):
+        compressed = b"".join(_deflate_chunks(_split_chunks(data), compression.level))
+        if _is_deflate_worth_it(compression, len(data), len(compressed)):
+            info.compress_type = zipfile.ZIP_DEFLATED
+            payload = compressed
+    info.compress_size = len(payload)
+    return info, payload
+
+
+def _stream_file(
+    zip_file: zipfile.ZipFile,
+    path: Path,
+    arcname: str,
+    compression: CompressionConfig,
+) -> None:
+    """
+    Adds a file to the zip without loading it into memory. The local header
+    needs the CRC and sizes before the data, so the file is compressed into a
+    temporary file first, computing the CRC as it goes.
+    """
+    info = zipfile.ZipInfo.from_file(path, arcname)
+    info.CRC = 0
+    info.file_size = 0
+
+    def read_tracked() -> Iterator[bytes]:
+        for chunk in _read_chunks(path):
+            info.CRC = zlib.crc32(chunk, info.CRC)
+            info.file_size += len(chunk)
+            yield chunk
+
+    if compression.is_stored(arcname):
+        for _ in read_tracked():
+            pass
+    else:
+        with tempfile.TemporaryFile() as compressed_file:
+            for compressed in _deflate_chunks(read_tracked(), compression.level):
+                compressed_file.write(compressed)
+            compress_size = compressed_file.tell()
+            if _is_deflate_worth_it(compression, info.file_size, compress_size):
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.compress_size = compress_size
+                compressed_file.seek(0)
+                _write_raw_entry(
+                    zip_file,
+                    info,
+                    iter(partial(compressed_file.read, _COPY_CHUNK_SIZE), b""),
+                )
+                return
+    info.compress_type = zipfile.ZIP_STORED
+    info.compress_size = info.file_size
+    _write_raw_entry(zip_file, info, _read_chunks(path))
+
+
+def _write_path(
+    zip_file: zipfile.ZipFile,
+    path: Path,
+    arcname: str,
+    compression: CompressionConfig,
+    max_buffered_bytes: int,
+) -> None:
+    """
+    Adds a file or a directory to the zip according to the compression policy.
+    Files larger than max_buffered_bytes are streamed instead of being
+    compressed in memory; both produce the same entry.
+    """
+    if path.is_dir():
+        zip_file.write(path, arcname)
+    elif path.stat().st_size > max_buffered_bytes:
+        _stream_file(zip_file, path, arcname, compression)
+    else:
+        info, payload = _compress_file(path, arcname, compression)
+        _write_raw_entry(zip_file, info, [payload])
+
+
+class _EntryWriter:
+    """
+    Writes entries to a zip in the order they are added, while files are
+    compressed ahead in a thread pool (zlib releases the GIL). The total size
+    of files being compressed or waiting to be written is capped by
+    max_in_flight_bytes; larger files are streamed through a temporary file
+    when it's their turn to be written. With jobs=1, everything is compressed
+    and written sequentially. The output doesn't depend on the number of jobs.
+    """
+
+    def __init__(
+        self,
+        zip_file: zipfile.ZipFile,
+        compression: CompressionConfig,
+        jobs: int | None = None,
+        max_in_flight_bytes: int | None = None,
+    ) -> None:
+        self._zip_file = zip_file
+        self._compression = compression
+        self._max_in_flight_bytes = max_in_flight_bytes or _MAX_IN_FLIGHT_BYTES
+        jobs = jobs or _get_default_compress_jobs()
+        self._executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        # Entries in output order: a pending compression or a deferred write
+        self._queue: deque[
+            tuple[Future[tuple[zipfile.ZipInfo, bytes]], int] | Callable[[], None]
+        ] = deque()
+        self._in_flight_bytes = 0
+
+    def __enter__(self) -> _EntryWriter:
+        return self
+
+    def __exit__(self, exc_type: object, *args: object) -> None:
+        try:
+            if exc_type is None:
+                while self._queue:
+                    self._write_next()
+        finally:
+            self._queue.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def add_path(self, path: Path, arcname: str) -> None:
+        size = 0 if path.is_dir() else path.stat().st_size
+        if self._executor is None or path.is_dir() or size > self._max_in_flight_bytes:
+            self.add_deferred(
+                lambda: _write_path(
+                    self._zip_file,
+                    path,
+                    arcname,
+                    self._compression,
+                    self._max_in_flight_bytes,
+                )
+            )
+            return
+        while self._queue and self._in_flight_bytes + size > self._max_in_flight_bytes:
+            self._write_next()
+        future = self._executor.submit(_compress_file, path, arcname, self._compression)
+        self._queue.append((future, size))
+        self._in_flight_bytes += size
+
+    def add_deferred(self, write: Callable[[], None]) -> None:
+        """
+        Adds a write that runs in order with the other entries.
+        """
+        if not self._queue:
+            write()
+        else:
+            self._queue.append(write)
+
+    def _write_next(self) -> None:
+        item = self._queue.popleft()
+        if callable(item):
+            item()
+            return
+        future, size = item
+        info, payload = future.result()
+        _write_raw_entry(self._zip_file, info, [payload])
+        self._in_flight_bytes -= size
+
 
 def zip_folder(
     source_path: Path,
     dest_path: Path,
     predicate: Callable[[Path], bool] = lambda path: True,
+    compression: CompressionConfig = CompressionConfig(),
+    jobs: int | None = None,
 ) -> None:
-    with ReproducibleZipFile(dest_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+    with (
+        atomic_output_path(dest_path) as temp_path,
+        ReproducibleZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zip_file,
+        _EntryWriter(zip_file, compression, jobs) as writer,
+    ):
         for path in sorted(source_path.rglob("*")):
             if predicate(path):
-                zip_file.write(path, path.relative_to(source_path))
+                writer.add_path(path, path.relative_to(source_path).as_posix())
 
 
 def make_empty_zip(dest_path: Path) -> None:
-    with ReproducibleZipFile(dest_path, "w", zipfile.ZIP_DEFLATED):
+    with (
+        atomic_output_path(dest_path) as temp_path,
+        ReproducibleZipFile(temp_path, "w", zipfile.ZIP_DEFLATED),
+    ):
         pass
 
 
+def _entry_sort_key(name: str) -> PurePosixPath:
+    # Matches the order produced by zip_folder, which sorts Path objects
+    return PurePosixPath(name.rstrip("/"))
+
+
+def _read_raw_entry_data(src_fp: IO[bytes], info: zipfile.ZipInfo) -> Iterable[bytes]:
+    """
+    Yields the still-compressed data of an entry, skipping its local file header.
+    """
+    src_fp.seek(info.header_offset)
+    header = src_fp.read(zipfile.sizeFileHeader)  # type: ignore[attr-defined]
+    if len(header) != zipfile.sizeFileHeader:  # type: ignore[attr-defined]
+        raise zipfile.BadZipFile(f"Truncated file header for {info.filename}")
+    fields = struct.unpack(zipfile.structFileHeader, header)  # type: ignore[attr-defined]
+    if fields[zipfile._FH_SIGNATURE] != zipfile.stringFileHeader:  # type: ignore[attr-defined]
+        raise zipfile.BadZipFile(f"Bad magic number for {info.filename}")
+    src_fp.seek(
+        fields[zipfile._FH_FILENAME_LENGTH]  # type: ignore[attr-defined]
+        + fields[zipfile._FH_EXTRA_FIELD_LENGTH],  # type: ignore[attr-defined]
+        os.SEEK_CUR,
+    )
+    remaining = info.compress_size
+    while remaining > 0:
+        chunk = src_fp.read(min(remaining, _COPY_CHUNK_SIZE))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _write_raw_entry(
+    zip_file: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    raw_chunks: Iterable[bytes],
+) -> None:
+    """
+    Appends an entry whose data is already compressed. The info must have CRC,
+    compress_type, compress_size and file_size filled in. Timestamps and
+    permissions are normalized the same way ReproducibleZipFile does it.
+    """
+    info = copy(info)
+    info.date_time = repro_zipfile.date_time()
+    if info.is_dir():
+        info.external_attr = (0o40000 | repro_zipfile.dir_mode()) << 16
+        info.external_attr |= 0x10  # MS-DOS directory flag
+    else:
+        info.external_attr = repro_zipfile.file_mode() << 16
+    info.flag_bits &= ~_DATA_DESCRIPTOR_FLAG
+    with zip_file._lock:  # type: ignore[attr-defined]
+        fp = zip_file.fp
+        assert fp is not None, "Attempt to write to ZIP archive that was closed"
+        if zip_file._seekable:  # type: ignore[attr-defined]
+            fp.seek(zip_file.start_dir)  # type: ignore[attr-defined]
+        info.header_offset = fp.tell()
+        zip_file._writecheck(info)  # type: ignore[attr-defined]
+        zip_file._didModify = True  # type: ignore[attr-defined]
+        fp.write(info.FileHeader())
+        for chunk in raw_chunks:
+            fp.write(chunk)
+        zip_file.filelist.append(info)
+        zip_file.NameToInfo[info.filename] = info
+        zip_file.start_dir = fp.tell()  # type: ignore[attr-defined]
+
+
+def merge_folders_into_zip(
+    base_zip_path: Path | None,
+    dest_path: Path,
+    folders_to_add: Iterable[Path],
+    predicate: Callable[[Path], bool] = lambda path: True,
+    compression: CompressionConfig = CompressionConfig(),
+    jobs: int | None = None,
+) -> None:
+    """
+    Writes dest_path with all entries of base_zip_path and all files of folders_to_add.
+    Entries of the base zip are copied without recompression. Files from the folders
+    override base zip entries with the same path, and later folders override earlier
+    ones. The order of entries is the same as if everything was extracted into a
+    single directory and zipped with zip_folder.
+    """
+    # Maps entry key to either a file system path or a base zip entry
+    entries: dict[PurePosixPath, tuple[str, Path | zipfile.ZipInfo]] = {}
+    with (
+        zipfile.ZipFile(base_zip_path, "r")
+        if base_zip_path is not None
+        else nullcontext()
+    ) as base_zip:
+        if base_zip is not None:
+            for info in base_zip.infolist():
+                if predicate(Path(info.filename)):
+                    entries[_entry_sort_key(info.filename)] = (info.filename, info)
+        for folder in folders_to_add:
+            if not folder.is_dir():
+                raise FileNotFoundError(f"Source folder {folder} does not exist")
+            for path in folder.rglob("*"):
+                if predicate(path):
+                    arcname = path.relative_to(folder).as_posix()
+                    entries[_entry_sort_key(arcname)] = (arcname, path)
+        with (
+            atomic_output_path(dest_path) as temp_path,
+            ReproducibleZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zip_file,
+            _EntryWriter(zip_file, compression, jobs) as writer,
+        ):
+            for key in sorted(entries):
+                arcname, source = entries[key]
+                if isinstance(source, Path):
+                    writer.add_path(source, arcname)
+                else:
+                    assert base_zip is not None and base_zip.fp is not None
+                    writer.add_deferred(
+                        partial(
+                            _write_raw_entry,
+                            zip_file,
+                            source,
+                            _read_raw_entry_data(base_zip.fp, source),
+                        )
+                    )
+
+
+def copy_zip_with_prefix(source_path: Path, dest_path: Path, prefix: str) -> None:
+    """
+    Copies all entries of source_path into dest_path under the given directory
+    prefix (e.g. "python/") without recompressing them.
+    """
+    with (
+        zipfile.ZipFile(source_path, "r") as source_zip,
+        atomic_output_path(dest_path) as temp_path,
+        ReproducibleZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zip_file,
+    ):
+        assert source_zip.fp is not None
+        for info in sorted(
+            source_zip.infolist(), key=lambda i: _entry_sort_key(i.filename)
+        ):
+            prefixed_info = copy(info)
+            prefixed_info.filename = prefix + info.filename
+            prefixed_info.orig_filename = prefix + info.filename
+            _write_raw_entry(
+                zip_file,
+                prefixed_info,
+                _read_raw_entry_data(source_zip.fp, info),
+            )
+
+
 def add_folders_to_zip(
     zip_path: Path,
     folders_to_add: Iterable[Path],
     predicate: Callable[[Path], bool] = lambda path: True,
+    compression: CompressionConfig = CompressionConfig(),
+    jobs: int | None = None,
 ) -> None:
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        work_dir = temp_path / "work"
-        work_dir.mkdir(parents=True, exist_ok=True)
-        if zip_path.exists():
-            with zipfile.ZipFile(zip_path, "r") as zip_file:
-                zip_file.extractall(work_dir)
-        for folder in folders_to_add:
-            shutil.copytree(folder, work_dir, dirs_exist_ok=True)
-        zip_folder(work_dir, zip_path, predicate)
+    merge_folders_into_zip(
+        base_zip_path=zip_path if zip_path.exists() else None,
+        dest_path=zip_path,
+        folders_to_add=folders_to_add,
+        predicate=predicate,
+        compression=compression,
+        jobs=jobs,
+    )
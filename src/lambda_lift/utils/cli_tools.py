@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from functools import cache
+from typing import Callable, Generator
 
 from rich.console import Console
 
+_print_handler: Callable[[str], None] | None = None
+
 
 @cache
 def get_console() -> Console:
@@ -11,4 +15,31 @@ def get_console() -> Console:
 
 
 def rich_print(value: str) -> None:
-    get_console().print(value, highlight=False)
+    if _print_handler is not None:
+        _print_handler(value)
+    else:
+        get_console().print(value, highlight=False)
+
+
+@contextmanager
+def redirect_rich_print(handler: Callable[[str], None]) -> Generator[None, None, None]:
+    """
+    Passes messages of rich_print to handler instead of printing them, e.g. to
+    forward them from a worker process to the main one.
+    """
+    global _print_handler
+    previous_handler = _print_handler
+    _print_handler = handler
+    try:
+        yield
+    finally:
+        _print_handler = previous_handler
+
+
+def format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
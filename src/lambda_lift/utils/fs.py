@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator
+
+
+@contextmanager
+def atomic_output_path(dest_path: Path) -> Generator[Path, None, None]:
+    """
+    Yields a temporary path next to dest_path. Once the block completes successfully,
+    the temporary file replaces dest_path; otherwise it is removed. Readers of
+    dest_path thus never see a partially written file.
+    """
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = dest_path.with_name(
+        f".{dest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        yield temp_path
+        os.replace(temp_path, dest_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def link_tree(source_path: Path, dest_path: Path) -> None:
+    """
+    Recreates the directory structure of source_path in dest_path, hard linking
+    the files, or copying them if linking isn't possible (e.g. across file
+    systems). Existing files in dest_path are replaced. Bytecode caches are skipped.
+    """
+    for dir_path, dir_names, file_names in os.walk(source_path):
+        dir_names[:] = [name for name in dir_names if name != "__pycache__"]
+        target_dir = dest_path / Path(dir_path).relative_to(source_path)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for file_name in file_names:
+            source_file = Path(dir_path) / file_name
+            target_file = target_dir / file_name
+            target_file.unlink(missing_ok=True)
+            try:
+                os.link(source_file, target_file)
+            except OSError:
+                shutil.copy2(source_file, target_file)
+
+
+def get_user_cache_path() -> Path:
+    """
+    Returns the per-user cache directory of lambda-lift. It can be overridden
+    with the LAMBDA_LIFT_CACHE_DIR environment variable.
+    """
+    if override := os.environ.get("LAMBDA_LIFT_CACHE_DIR"):
+        return Path(override)
+    if os.name == "nt" and (local_app_data := os.environ.get("LOCALAPPDATA")):
+        return Path(local_app_data) / "lambda-lift" / "Cache"
+    if xdg_cache_home := os.environ.get("XDG_CACHE_HOME"):
+        return Path(xdg_cache_home) / "lambda-lift"
+    return Path.home() / ".cache" / "lambda-lift"
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Callable, Generator
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(file: IO[bytes]) -> bool:
+        file.seek(0)
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(file: IO[bytes]) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(file: IO[bytes]) -> bool:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock(file: IO[bytes]) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+# Interval at which a waiting process retries to acquire a held lock
+_POLL_INTERVAL_SECONDS = 0.1
+
+
+@contextmanager
+def file_lock(
+    lock_path: Path,
+    *,
+    timeout: float,
+    on_wait: Callable[[], None] = lambda: None,
+) -> Generator[None, None, None]:
+    """
+    Holds an exclusive lock on lock_path for the duration of the block. The lock
+    is released by the OS if the process dies, so stale lock files are harmless
+    and are never removed. If the lock is held by someone else, on_wait is called
+    once and the lock is retried until timeout seconds pass, then TimeoutError
+    is raised.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a+b") as file:
+        deadline = time.monotonic() + timeout
+        waiting = False
+        while not _try_lock(file):
+            if not waiting:
+                waiting = True
+                on_wait()
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Timed out after {timeout:g} seconds waiting for lock {lock_path}"
+                )
+            time.sleep(_POLL_INTERVAL_SECONDS)
+        try:
+            yield
+        finally:
+            _unlock(file)
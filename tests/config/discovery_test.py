@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from lambda_lift.config.discovery import DiscoveryConfig, find_config_paths
+from lambda_lift.config.exceptions import DiscoveryException
+
+_FILES = (
+    "lambda-lift.toml",
+    "services/a/lambda-lift-a.toml",
+    "services/a/dist/lambda-lift-a.toml",
+    "services/b/lambda-lift-b.toml",
+    "services/b/generated/lambda-lift-gen.toml",
+    "services/b/generated/keep/lambda-lift-keep.toml",
+    "services/c/lambda-lift-c.toml",
+    "services/c/lambda-lift-scratch.toml",
+    "services/c/other.toml",
+    "node_modules/pkg/lambda-lift-pkg.toml",
+    ".venv/lib/lambda-lift-venv.toml",
+    "legacy/old/lambda-lift-old.toml",
+)
+
+_GITIGNORES = {
+    ".gitignore": "dist/\n/legacy/old\n# comment\n\n",
+    "services/b/.gitignore": "generated/*\n!generated/keep/\n",
+    "services/c/.gitignore": "lambda-lift-scratch.toml\n",
+}
+
+
+@pytest.fixture(name="repo_path")
+def repo_fixture() -> Generator[Path, None, None]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = Path(temp_dir)
+        subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+        for name in _FILES:
+            (repo_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (repo_path / name).write_text("")
+        for name, content in _GITIGNORES.items():
+            (repo_path / name).write_text(content)
+        yield repo_path
+
+
+def _find(root_path: Path, discovery: DiscoveryConfig = DiscoveryConfig()) -> list[str]:
+    paths = find_config_paths(root_path, discovery)
+    return [path.relative_to(root_path).as_posix() for path in paths]
+
+
+class TestDiscovery:
+    def test_walk(self, repo_path: Path) -> None:
+        assert _find(repo_path) == [
+            "lambda-lift.toml",
+            "services/a/lambda-lift-a.toml",
+            "services/b/generated/keep/lambda-lift-keep.toml",
+            "services/b/lambda-lift-b.toml",
+            "services/c/lambda-lift-c.toml",
+        ]
+
+    def test_excludes(self, repo_path: Path) -> None:
+        assert _find(repo_path, DiscoveryConfig(excludes=["b", "services/c"])) == [
+            "lambda-lift.toml",
+            "services/a/lambda-lift-a.toml",
+        ]
+
+    def test_parent_gitignore(self, repo_path: Path) -> None:
+        # Rules of .gitignore files above the root apply to the subtree
+        assert _find(repo_path / "services" / "a") == ["lambda-lift-a.toml"]
+
+    def test_git_index(self, repo_path: Path) -> None:
+        subprocess.run(
+            ["git", "add", "services/a/lambda-lift-a.toml"], cwd=repo_path, check=True
+        )
+        # Ignored files, hidden and excluded directories are skipped
+        assert _find(repo_path, DiscoveryConfig(use_git_index=True)) == _find(repo_path)
+        discovery = DiscoveryConfig(excludes=["a"], use_git_index=True)
+        assert _find(repo_path / "services", discovery) == [
+            "b/generated/keep/lambda-lift-keep.toml",
+            "b/lambda-lift-b.toml",
+            "c/lambda-lift-c.toml",
+        ]
+
+    def test_git_index_outside_repo(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(DiscoveryException):
+                find_config_paths(Path(temp_dir), DiscoveryConfig(use_git_index=True))
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from lambda_lift.config import index
+from lambda_lift.config.exceptions import InvalidConfigException
+from lambda_lift.config.index import ConfigsIndex, get_index_path
+from lambda_lift.config.registry import ConfigsRegistry
+
+
+def _write_config(path: Path, name: str, platform: str = "arm64") -> Path:
+    toml_path = path / name / f"lambda-lift-{name}.toml"
+    (path / name / "src").mkdir(parents=True, exist_ok=True)
+    toml_path.write_text(
+        "[general]\n"
+        f'name = "{name}"\n'
+        "[build]\n"
+        'source_paths = ["src"]\n'
+        'destination_path = "dist/lambda.zip"\n'
+        'cache_path = ".cache"\n'
+        f'platform = "{platform}"\n'
+    )
+    return toml_path
+
+
+@pytest.fixture(name="root_path")
+def root_fixture() -> Generator[Path, None, None]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+
+class TestConfigsIndex:
+    def test_unchanged_configs_are_reused(
+        self, root_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        paths = [_write_config(root_path, name) for name in ("a", "b")]
+        configs_index = ConfigsIndex(root_path / "index.pickle")
+        first = configs_index.parse(paths)
+        assert [parsed.name for parsed in first] == ["a", "b"]
+        assert (root_path / "index.pickle").exists()
+
+        def fail(_path: Path) -> None:
+            raise AssertionError("Unchanged config was parsed")
+
+        monkeypatch.setattr(index, "_parse_config", fail)
+        second = configs_index.parse(paths)
+        assert [parsed.config for parsed in second] == [
+            parsed.config for parsed in first
+        ]
+
+    def test_modified_config_is_parsed(self, root_path: Path) -> None:
+        path = _write_config(root_path, "a")
+        configs_index = ConfigsIndex(root_path / "index.pickle")
+        (parsed,) = configs_index.parse([path])
+        assert parsed.config is not None
+        assert parsed.config.build.platform.value == "arm64"
+        _write_config(root_path, "a", platform="x86")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (parsed,) = configs_index.parse([path])
+        assert parsed.config is not None
+        assert parsed.config.build.platform.value == "x86"
+
+    def test_missing_source_path_is_revalidated(self, root_path: Path) -> None:
+        path = _write_config(root_path, "a")
+        configs_index = ConfigsIndex(root_path / "index.pickle")
+        configs_index.parse([path])
+        (root_path / "a" / "src").rmdir()
+        (parsed,) = configs_index.parse([path])
+        assert isinstance(parsed.error, InvalidConfigException)
+
+    def test_package_store_is_revalidated(self, root_path: Path) -> None:
+        path = _write_config(root_path, "a")
+        with path.open("a") as f:
+            f.write('package_store = "store"\n')
+        configs_index = ConfigsIndex(root_path / "index.pickle")
+        configs_index.parse([path])
+        (root_path / "a" / "store").write_text("")
+        (parsed,) = configs_index.parse([path])
+        assert isinstance(parsed.error, InvalidConfigException)
+
+    def test_other_version_is_ignored(
+        self, root_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = _write_config(root_path, "a")
+        configs_index = ConfigsIndex(root_path / "index.pickle")
+        monkeypatch.setattr(index, "_get_package_version", lambda: "1.0")
+        configs_index.parse([path])
+        monkeypatch.setattr(index, "_get_package_version", lambda: "1.1")
+        parsed_paths: list[Path] = []
+        parse_config = index._parse_config
+
+        def tracking_parse_config(path: Path) -> index.ParsedConfig:
+            parsed_paths.append(path)
+            return parse_config(path)
+
+        monkeypatch.setattr(index, "_parse_config", tracking_parse_config)
+        configs_index.parse([path])
+        assert parsed_paths == [path]
+
+    def test_home_change_is_reparsed(
+        self, root_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = _write_config(root_path, "a")
+        with path.open("a") as f:
+            f.write('package_store = "~/store"\n')
+        configs_index = ConfigsIndex(root_path / "index.pickle")
+        monkeypatch.setenv("HOME", str(root_path / "home1"))
+        (parsed,) = configs_index.parse([path])
+        assert parsed.config is not None
+        assert parsed.config.build.package_store == root_path / "home1" / "store"
+        monkeypatch.setenv("HOME", str(root_path / "home2"))
+        (parsed,) = configs_index.parse([path])
+        assert parsed.config is not None
+        assert parsed.config.build.package_store == root_path / "home2" / "store"
+
+    def test_invalid_config(self, root_path: Path) -> None:
+        path = _write_config(root_path, "a", platform="sparc")
+        (parsed,) = ConfigsIndex(root_path / "index.pickle").parse([path])
+        assert parsed.name == "a"
+        assert parsed.config is None
+        assert isinstance(parsed.error, InvalidConfigException)
+
+    def test_parallel_parsing(
+        self, root_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(index, "_PARALLEL_PARSE_THRESHOLD", 2)
+        paths = [_write_config(root_path, name) for name in ("a", "b", "c")]
+        paths.append(_write_config(root_path, "d", platform="sparc"))
+        parsed = ConfigsIndex(root_path / "index.pickle").parse(paths)
+        assert [item.name for item in parsed] == ["a", "b", "c", "d"]
+        assert all(item.config is not None for item in parsed[:3])
+        assert isinstance(parsed[3].error, InvalidConfigException)
+
+    def test_corrupt_index_is_ignored(self, root_path: Path) -> None:
+        path = _write_config(root_path, "a")
+        (root_path / "index.pickle").write_bytes(b"not a pickle")
+        (parsed,) = ConfigsIndex(root_path / "index.pickle").parse([path])
+        assert parsed.config is not None
+
+    def test_index_path(self, root_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("LAMBDA_LIFT_CACHE_DIR", str(root_path / "cache"))
+        index_path = get_index_path(root_path)
+        assert index_path.parent == root_path / "cache" / "registry"
+        assert get_index_path(root_path / "other") != index_path
+
+
+class TestIndexedRegistry:
+    def test_registry(self, root_path: Path) -> None:
+        _write_config(root_path, "a")
+        _write_config(root_path, "b", platform="sparc")
+        index_path = root_path / "index.pickle"
+        for _ in range(2):
+            registry = ConfigsRegistry(root_path, index_path=index_path)
+            assert set(registry.names) == {"a", "b"}
+            assert registry.get("a").name == "a"
+            with pytest.raises(InvalidConfigException):
+                registry.get("b")
+            with pytest.raises(KeyError):
+                registry.get("c")
+
+    def test_removed_config(self, root_path: Path) -> None:
+        _write_config(root_path, "a")
+        path = _write_config(root_path, "b")
+        index_path = root_path / "index.pickle"
+        assert len(ConfigsRegistry(root_path, index_path=index_path)) == 2
+        path.unlink()
+        registry = ConfigsRegistry(root_path, index_path=index_path)
+        assert set(registry.names) == {"a"}
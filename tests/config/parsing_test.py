@@ -4,13 +4,16 @@ from pathlib import Path
 
 import pytest
 
-from lambda_lift.config.enums import Platform
+from lambda_lift.config.enums import Platform, TrimProfile
 from lambda_lift.config.exceptions import InvalidConfigException
 from lambda_lift.config.parser import SingleLambdaConfigParser
 from lambda_lift.config.single_lambda import (
     BuildConfig,
+    CompressionConfig,
     SingleLambdaConfig,
     DeploymentConfig,
+    SizeBudget,
+    TrimConfig,
 )
 
 
@@ -167,6 +170,163 @@ class TestParsing:
         parser = self._make_parser("ignore_libraries/lambda-lift-missing")
         assert parser.ignore_libraries == set()
 
+    # Package store
+
+    def test_package_store_missing(self) -> None:
+        parser = self._make_parser("package_store/lambda-lift-missing")
+        assert parser.package_store is None
+
+    def test_package_store_relative(self) -> None:
+        parser = self._make_parser("package_store/lambda-lift-relative")
+        assert parser.package_store.resolve() == (
+            self._use_toml_file("package_store/lambda-lift-relative").parent / "store"
+        )
+
+    def test_package_store_home(self) -> None:
+        parser = self._make_parser("package_store/lambda-lift-home")
+        assert parser.package_store == Path.home() / ".cache" / "lambda-lift-test-store"
+
+    def test_pip_sources_missing(self) -> None:
+        parser = self._make_parser("pip_sources/lambda-lift-missing")
+        assert parser.pip_cache_path is None
+        assert parser.wheelhouse_path is None
+        assert parser.offline is False
+
+    def test_pip_sources_online(self) -> None:
+        parser = self._make_parser("pip_sources/lambda-lift-online")
+        toml_dir = self._use_toml_file("pip_sources/lambda-lift-online").parent
+        assert parser.pip_cache_path.resolve() == toml_dir / "pip-cache"
+        assert parser.wheelhouse_path.resolve() == toml_dir / "wheelhouse"
+        assert parser.offline is False
+
+    def test_pip_sources_offline(self) -> None:
+        parser = self._make_parser("pip_sources/lambda-lift-offline")
+        assert parser.offline is True
+
+    def test_pip_sources_offline_requires_wheelhouse(self) -> None:
+        parser = self._make_parser("pip_sources/lambda-lift-offline-no-wheelhouse")
+        with pytest.raises(InvalidConfigException):
+            _ = parser.offline
+
+    def test_pip_sources_offline_invalid(self) -> None:
+        parser = self._make_parser("pip_sources/lambda-lift-offline-invalid")
+        with pytest.raises(InvalidConfigException):
+            _ = parser.offline
+
+    def test_compression_missing(self) -> None:
+        parser = self._make_parser("compression/lambda-lift-missing")
+        assert parser.compression == CompressionConfig()
+        assert parser.compression.is_default
+
+    def test_compression_normal(self) -> None:
+        parser = self._make_parser("compression/lambda-lift-normal")
+        assert parser.compression == CompressionConfig(
+            level=9, store_patterns=("*.so", "*.gz"), store_threshold=0.95
+        )
+        assert parser.compression.fast == CompressionConfig(
+            level=1, store_patterns=("*.so", "*.gz")
+        )
+
+    def test_compression_invalid_level(self) -> None:
+        parser = self._make_parser("compression/lambda-lift-invalid-level")
+        with pytest.raises(InvalidConfigException):
+            _ = parser.compression
+
+    def test_compression_invalid_threshold(self) -> None:
+        parser = self._make_parser("compression/lambda-lift-invalid-threshold")
+        with pytest.raises(InvalidConfigException):
+            _ = parser.compression
+
+    def test_precompile_missing(self) -> None:
+        parser = self._make_parser("precompile/lambda-lift-missing")
+        assert parser.precompile is False
+        assert parser.precompile_optimization == 0
+
+    def test_precompile_normal(self) -> None:
+        parser = self._make_parser("precompile/lambda-lift-normal")
+        assert parser.precompile is True
+        assert parser.precompile_optimization == 2
+
+    def test_precompile_invalid_optimization(self) -> None:
+        parser = self._make_parser("precompile/lambda-lift-invalid")
+        with pytest.raises(InvalidConfigException):
+            _ = parser.precompile_optimization
+
+    def test_trim_missing(self) -> None:
+        parser = self._make_parser("trim/lambda-lift-missing")
+        assert parser.trim == TrimConfig()
+        assert parser.trim.is_default
+
+    def test_trim_normal(self) -> None:
+        parser = self._make_parser("trim/lambda-lift-normal")
+        assert parser.trim == TrimConfig(
+            profile=TrimProfile.AGGRESSIVE,
+            excludes={
+                "numpy": ("numpy/doc/*",),
+                "botocore": ("botocore/data/*/examples-1.json",),
+            },
+        )
+
+    def test_trim_invalid_profile(self) -> None:
+        parser = self._make_parser("trim/lambda-lift-invalid-profile")
+        with pytest.raises(InvalidConfigException):
+            _ = parser.trim
+
+    def test_trim_invalid_excludes(self) -> None:
+        parser = self._make_parser("trim/lambda-lift-invalid-excludes")
+        with pytest.raises(InvalidConfigException):
+            _ = parser.trim
+
+    def test_strip_missing(self) -> None:
+        parser = self._make_parser("strip/lambda-lift-missing")
+        assert parser.strip_debug is False
+        assert parser.strip_tool is None
+
+    def test_strip_normal(self) -> None:
+        parser = self._make_parser("strip/lambda-lift-normal")
+        assert parser.strip_debug is True
+        assert parser.strip_tool == "aarch64-linux-gnu-strip"
+
+    # Shared cache
+
+    def test_shared_cache_missing(self) -> None:
+        parser = self._make_parser("shared_cache/lambda-lift-missing")
+        assert parser.shared_cache is None
+
+    def test_shared_cache_relative(self) -> None:
+        parser = self._make_parser("shared_cache/lambda-lift-relative")
+        assert parser.shared_cache is not None
+        assert Path(parser.shared_cache).resolve() == (
+            self._use_toml_file("shared_cache/lambda-lift-relative").parent.parent
+            / "shared"
+        )
+
+    def test_shared_cache_s3(self) -> None:
+        parser = self._make_parser("shared_cache/lambda-lift-s3")
+        assert parser.shared_cache == "s3://cache-bucket/s3/deps"
+
+    def test_shared_cache_invalid(self) -> None:
+        parser = self._make_parser("shared_cache/lambda-lift-invalid")
+        with pytest.raises(InvalidConfigException):
+            parser.shared_cache
+
+    # Size budget
+
+    def test_size_budget_missing(self) -> None:
+        parser = self._make_parser("size_budget/lambda-lift-missing")
+        assert parser.size_budget == SizeBudget()
+
+    def test_size_budget_normal(self) -> None:
+        parser = self._make_parser("size_budget/lambda-lift-normal")
+        assert parser.size_budget == SizeBudget(
+            max_zipped_size=40 * 2**20, max_unzipped_size=2**19
+        )
+
+    def test_size_budget_invalid(self) -> None:
+        parser = self._make_parser("size_budget/lambda-lift-invalid")
+        with pytest.raises(InvalidConfigException):
+            parser.size_budget
+
     # Deployment
 
     def test_deployment_list_profiles(self) -> None:
@@ -212,6 +372,39 @@ class TestParsing:
         assert parser.get_deployment_aws_profile("profile1") is None
         assert parser.get_deployment_aws_profile("profile2") == "aws_p2"
 
+    def test_deployment_extract_upload_settings(self) -> None:
+        parser = self._make_parser("deployment/lambda-lift-normal")
+        assert parser.get_staging_s3_path("profile1") is None
+        assert parser.get_staging_s3_path("profile6") == ("staging-bucket", "normal/")
+        assert parser.get_s3_part_size("profile1") is None
+        assert parser.get_s3_part_size("profile6") == 16 * 2**20
+        assert parser.get_s3_upload_concurrency("profile1") is None
+        assert parser.get_s3_upload_concurrency("profile6") == 8
+
+    def test_deployment_extract_dependencies_layer(self) -> None:
+        parser = self._make_parser("deployment/lambda-lift-normal")
+        assert parser.get_dependencies_layer("profile1") is None
+        assert parser.get_dependencies_layer("profile6") == "normal-deps"
+
+    def test_deployment_invalid_dependencies_layer(self) -> None:
+        parser = self._make_parser("deployment/lambda-lift-invalid-layer")
+        with pytest.raises(InvalidConfigException):
+            parser.get_dependencies_layer("profile1")
+
+    def test_deployment_extract_versioning(self) -> None:
+        parser = self._make_parser("deployment/lambda-lift-normal")
+        assert parser.get_publish_version("profile1") is False
+        assert parser.get_alias("profile1") is None
+        assert parser.get_publish_version("profile6") is True
+        assert parser.get_alias("profile6") == "live"
+
+    def test_deployment_invalid_alias(self) -> None:
+        parser = self._make_parser("deployment/lambda-lift-invalid-alias")
+        with pytest.raises(InvalidConfigException):
+            parser.get_publish_version("profile1")
+        with pytest.raises(InvalidConfigException):
+            parser.get_alias("profile2")
+
     def test_deployment_missing_region(self) -> None:
         parser = self._make_parser("deployment/lambda-lift-missing-region")
         with pytest.raises(InvalidConfigException):
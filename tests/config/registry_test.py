@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Collection
 
 import pytest
 
@@ -9,10 +10,12 @@ from lambda_lift.config.registry import ConfigsRegistry
 
 
 class TestSingleLambdaConfig:
-    def _make_registry(self, name: str) -> ConfigsRegistry:
+    def _make_registry(
+        self, name: str, reserved_names: Collection[str] = ()
+    ) -> ConfigsRegistry:
         path = Path(__file__).parent / "test_assets" / "registry" / name
         assert path.exists(), f"Path {path} does not exist"
-        return ConfigsRegistry(path)
+        return ConfigsRegistry(path, reserved_names=reserved_names)
 
     def test_normal(self) -> None:
         registry = self._make_registry("normal")
@@ -26,3 +29,10 @@ class TestSingleLambdaConfig:
         registry = self._make_registry("name_conflict")
         with pytest.raises(NameCollisionException):
             print(list(registry.names))
+
+    def test_reserved_name(self) -> None:
+        registry = self._make_registry("normal", reserved_names={"b", "size"})
+        with pytest.raises(
+            NameCollisionException, match="Lambda name b in .* reserved"
+        ):
+            print(list(registry.names))
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generator
+
+import botocore.exceptions
+import pytest
+
+from lambda_lift.config.single_lambda import DeploymentConfig
+from lambda_lift.deployment import artifacts
+from lambda_lift.deployment.artifacts import get_artifact_hashes
+from lambda_lift.deployment.aws import _deploy_code
+from lambda_lift.deployment.enums import DeployStatus
+from lambda_lift.deployment.exceptions import AwsError
+from lambda_lift.utils.hashing import get_file_blake2b
+
+
+@dataclass
+class FakeAwsApi:
+    """
+    An in-memory stand-in for the S3 and Lambda calls made while uploading code.
+    """
+
+    objects: dict[tuple[str, str], Any] = field(default_factory=dict)
+    code_updates: list[dict[str, Any]] = field(default_factory=list)
+
+    def client(self, service_name: str) -> FakeAwsApi:
+        return self
+
+    def head_object(self, Bucket: str, Key: str) -> None:
+        if (Bucket, Key) not in self.objects:
+            raise botocore.exceptions.ClientError(
+                {"Error": {"Code": "404"}}, "HeadObject"
+            )
+
+    def upload_file(self, path: str, bucket: str, key: str, Config: Any) -> None:
+        self.objects[(bucket, key)] = Config
+
+    def update_function_code(self, **kwargs: Any) -> None:
+        self.code_updates.append(kwargs)
+
+
+@pytest.fixture(name="zip_path")
+def zip_path_fixture() -> Generator[Path, None, None]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_path = Path(temp_dir) / "lambda.zip"
+        zip_path.write_bytes(b"0123456789" * 10)
+        yield zip_path
+
+
+def _make_deploy_config(**kwargs: Any) -> DeploymentConfig:
+    return DeploymentConfig(
+        region="us-west-2",
+        name="test-prod",
+        s3_path=None,
+        aws_profile=None,
+        **kwargs,
+    )
+
+
+class TestArtifacts:
+    def test_hashes(self, zip_path: Path) -> None:
+        hashes = get_artifact_hashes(zip_path)
+        assert hashes.blake2b == get_file_blake2b(zip_path)
+        sha256 = hashlib.sha256(zip_path.read_bytes()).digest()
+        assert hashes.sha256 == base64.b64encode(sha256).decode()
+
+    def test_hashes_are_cached_by_stat(self, zip_path: Path) -> None:
+        hashes = get_artifact_hashes(zip_path)
+        stat = zip_path.stat()
+        zip_path.write_bytes(b"9876543210" * 10)
+        os.utime(zip_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert get_artifact_hashes(zip_path) == hashes
+        zip_path.write_bytes(b"changed")
+        assert get_artifact_hashes(zip_path) != hashes
+
+    def test_direct_upload(self, zip_path: Path) -> None:
+        api = FakeAwsApi()
+        status = _deploy_code(
+            session=api,  # type: ignore[arg-type]
+            deploy_config=_make_deploy_config(),
+            zip_path=zip_path,
+            live_code_sha256=None,
+        )
+        assert status == DeployStatus.UPDATED
+        assert api.code_updates == [
+            {"FunctionName": "test-prod", "ZipFile": zip_path.read_bytes()}
+        ]
+
+    def test_fallback_to_staging_bucket(
+        self, zip_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(artifacts, "MAX_DIRECT_UPLOAD_SIZE", 10)
+        api = FakeAwsApi()
+        deploy_config = _make_deploy_config(
+            staging_s3_path=("staging", "lambdas/"),
+            s3_part_size=8 * 2**20,
+            s3_upload_concurrency=3,
+        )
+        _deploy_code(
+            session=api,  # type: ignore[arg-type]
+            deploy_config=deploy_config,
+            zip_path=zip_path,
+            live_code_sha256=None,
+        )
+        s3_key = f"lambdas/{get_file_blake2b(zip_path)}.zip"
+        transfer_config = api.objects[("staging", s3_key)]
+        assert transfer_config.multipart_chunksize == 8 * 2**20
+        assert transfer_config.max_concurrency == 3
+        assert api.code_updates == [
+            {"FunctionName": "test-prod", "S3Bucket": "staging", "S3Key": s3_key}
+        ]
+
+    def test_too_large_without_staging_bucket(
+        self, zip_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(artifacts, "MAX_DIRECT_UPLOAD_SIZE", 10)
+        with pytest.raises(AwsError):
+            _deploy_code(
+                session=FakeAwsApi(),  # type: ignore[arg-type]
+                deploy_config=_make_deploy_config(),
+                zip_path=zip_path,
+                live_code_sha256=None,
+            )
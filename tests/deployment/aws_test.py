@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generator
+
+import pytest
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import (
+    BuildConfig,
+    DeploymentConfig,
+    SingleLambdaConfig,
+    SizeBudget,
+)
+from lambda_lift.deployment import clients, versions
+from lambda_lift.deployment.artifacts import get_artifact_hashes
+from lambda_lift.deployment.aws import deploy_lambdas
+from lambda_lift.deployment.enums import DeployStatus
+from lambda_lift.deployment.exceptions import DeploymentError
+
+if TYPE_CHECKING:
+    from conftest import FakeLambdaApi
+
+
+@dataclass(frozen=True)
+class DeployFixture:
+    temp_path: Path
+    api: FakeLambdaApi
+
+    def make_configs(
+        self,
+        count: int,
+        size_budget: SizeBudget = SizeBudget(),
+        **deploy_options: Any,
+    ) -> list[SingleLambdaConfig]:
+        zip_path = self.temp_path / "lambda.zip"
+        with zipfile.ZipFile(zip_path, "w") as zip_file:
+            zip_file.writestr("main.py", "print('hello')")
+        return [
+            SingleLambdaConfig(
+                name=f"lambda-{i}",
+                build=BuildConfig(
+                    source_paths=[self.temp_path],
+                    requirements_path=None,
+                    destination_path=zip_path,
+                    cache_path=self.temp_path / "cache",
+                    platform=Platform.ARM64,
+                    python_executable=None,
+                    ignore_libraries=[],
+                    size_budget=size_budget,
+                ),
+                deployments={
+                    "prod": DeploymentConfig(
+                        region="us-west-2",
+                        name=f"lambda-{i}-prod",
+                        s3_path=None,
+                        aws_profile=None,
+                        **deploy_options,
+                    )
+                },
+                _toml_path=self.temp_path / f"lambda-lift-{i}.toml",
+            )
+            for i in range(count)
+        ]
+
+
+@pytest.fixture(name="df")
+def deploy_fixture(
+    lambda_api: FakeLambdaApi, monkeypatch: pytest.MonkeyPatch
+) -> Generator[DeployFixture, None, None]:
+    def make_session(**kwargs: Any) -> FakeLambdaApi:
+        lambda_api.calls["Session"] += 1
+        return lambda_api
+
+    monkeypatch.setattr(clients.boto3, "Session", make_session)
+    monkeypatch.setattr(versions, "_POLL_INITIAL_DELAY_SECONDS", 0.001)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield DeployFixture(Path(temp_dir), lambda_api)
+
+
+class TestDeploy:
+    def test_unchanged_functions_are_skipped(self, df: DeployFixture) -> None:
+        configs = df.make_configs(6)
+        live_hash = get_artifact_hashes(configs[0].build.destination_path).sha256
+        for i in range(6):
+            df.api.code_hashes[f"lambda-{i}-prod"] = live_hash if i != 3 else "stale"
+        outcomes = deploy_lambdas(configs, ["prod", "staging"])
+        assert [o.status for o in outcomes if o.profile == "prod"] == [
+            DeployStatus.UNCHANGED,
+            DeployStatus.UNCHANGED,
+            DeployStatus.UNCHANGED,
+            DeployStatus.UPDATED,
+            DeployStatus.UNCHANGED,
+            DeployStatus.UNCHANGED,
+        ]
+        assert all(
+            o.status == DeployStatus.SKIPPED for o in outcomes if o.profile == "staging"
+        )
+        assert df.api.calls == {
+            "Session": 1,
+            "list_functions": 1,
+            "update_function_code": 1,
+        }
+
+    def test_few_functions_are_checked_individually(self, df: DeployFixture) -> None:
+        configs = df.make_configs(2)
+        df.api.code_hashes = {"lambda-0-prod": "stale", "lambda-1-prod": "stale"}
+        outcomes = deploy_lambdas(configs, ["prod"])
+        assert [o.status for o in outcomes] == [DeployStatus.UPDATED] * 2
+        assert df.api.calls == {
+            "Session": 1,
+            "get_function_configuration": 2,
+            "update_function_code": 2,
+        }
+
+    def test_falls_back_when_listing_is_denied(self, df: DeployFixture) -> None:
+        configs = df.make_configs(6)
+        df.api.code_hashes = {f"lambda-{i}-prod": "stale" for i in range(6)}
+        df.api.can_list_functions = False
+        outcomes = deploy_lambdas(configs, ["prod"])
+        assert [o.status for o in outcomes] == [DeployStatus.UPDATED] * 6
+        assert df.api.calls == {
+            "Session": 1,
+            "list_functions": 1,
+            "get_function_configuration": 6,
+            "update_function_code": 6,
+        }
+
+    def test_concurrent_deploy_collects_errors(self, df: DeployFixture) -> None:
+        configs = df.make_configs(8)
+        df.api.code_hashes = {f"lambda-{i}-prod": "stale" for i in range(8)}
+        df.api.failing_functions = {"lambda-2-prod", "lambda-5-prod"}
+        with pytest.raises(DeploymentError) as ex_info:
+            deploy_lambdas(configs, ["prod"], jobs=4)
+        assert "lambda-2 (prod), lambda-5 (prod)" in str(ex_info.value)
+        assert df.api.calls["update_function_code"] == 6
+        assert df.api.calls["Session"] == 1
+
+    def test_size_budget_checked_before_deploy(self, df: DeployFixture) -> None:
+        configs = df.make_configs(2, SizeBudget(max_unzipped_size=10))
+        df.api.code_hashes = {"lambda-0-prod": "stale", "lambda-1-prod": "stale"}
+        with pytest.raises(DeploymentError):
+            deploy_lambdas(configs, ["prod"])
+        assert df.api.calls["update_function_code"] == 0
+
+
+class TestAsyncDeploy:
+    def test_waits_for_updates(self, df: DeployFixture) -> None:
+        configs = df.make_configs(6)
+        df.api.code_hashes = {f"lambda-{i}-prod": "stale" for i in range(6)}
+        df.api.update_polls = {"lambda-0-prod": 4}
+        outcomes = deploy_lambdas(configs, ["prod"], jobs=2, asynchronous=True)
+        assert [o.status for o in outcomes] == [DeployStatus.UPDATED] * 6
+        assert all(count == 0 for count in df.api.pending_polls.values())
+        # Hashes are listed in bulk, then every function is polled until it's live
+        assert df.api.calls == {
+            "Session": 1,
+            "list_functions": 1,
+            "update_function_code": 6,
+            "get_function_configuration": 10,
+        }
+
+    def test_publishes_without_waiting_for_other_functions(
+        self, df: DeployFixture
+    ) -> None:
+        configs = df.make_configs(2, publish_version=True, alias="live")
+        df.api.code_hashes = {"lambda-0-prod": "stale", "lambda-1-prod": "stale"}
+        df.api.update_polls = {"lambda-0-prod": 5}
+        df.api.aliases = {("lambda-0-prod", "live"): "0"}
+        outcomes = deploy_lambdas(configs, ["prod"], jobs=2, asynchronous=True)
+        assert [o.version for o in outcomes] == ["1", "1"]
+        assert df.api.aliases == {
+            ("lambda-0-prod", "live"): "1",
+            ("lambda-1-prod", "live"): "1",
+        }
+        assert df.api.calls["create_alias"] == 1
+        publish_index = df.api.events.index(("publish", "lambda-1-prod"))
+        assert ("poll", "lambda-0-prod") in df.api.events[publish_index:]
+
+    def test_failed_update(self, df: DeployFixture) -> None:
+        configs = df.make_configs(3, publish_version=True)
+        df.api.code_hashes = {f"lambda-{i}-prod": "stale" for i in range(3)}
+        df.api.failed_updates = {"lambda-1-prod"}
+        with pytest.raises(DeploymentError) as ex_info:
+            deploy_lambdas(configs, ["prod"], asynchronous=True)
+        assert str(ex_info.value).endswith(": lambda-1 (prod)")
+        assert df.api.calls["publish_version"] == 2
+
+    def test_synchronous_deploy_publishes(self, df: DeployFixture) -> None:
+        configs = df.make_configs(2, publish_version=True)
+        df.api.code_hashes = {"lambda-0-prod": "stale", "lambda-1-prod": "stale"}
+        df.api.update_polls = {"lambda-0-prod": 3}
+        outcomes = deploy_lambdas(configs, ["prod"])
+        assert [o.version for o in outcomes] == ["1", "1"]
+        assert df.api.calls["publish_version"] == 2
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+import botocore.exceptions
+import pytest
+
+
+@dataclass
+class FakeLambdaApi:
+    """
+    An in-memory stand-in for the Lambda API holding code hashes, code and
+    layers of functions, and versions of layers. An update of a function stays
+    in progress for update_polls[name] polls.
+    """
+
+    code_hashes: dict[str, str] = field(default_factory=dict)
+    code: dict[str, bytes] = field(default_factory=dict)
+    layers: dict[str, list[str]] = field(default_factory=dict)
+    layer_versions: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    calls: Counter[str] = field(default_factory=Counter)
+    failing_functions: set[str] = field(default_factory=set)
+    update_polls: dict[str, int] = field(default_factory=dict)
+    failed_updates: set[str] = field(default_factory=set)
+    pending_polls: dict[str, int] = field(default_factory=dict)
+    aliases: dict[tuple[str, str], str] = field(default_factory=dict)
+    events: list[tuple[str, str]] = field(default_factory=list)
+    can_list_functions: bool = True
+
+    def client(self, service_name: str) -> FakeLambdaApi:
+        assert service_name == "lambda"
+        return self
+
+    def get_function_configuration(self, FunctionName: str) -> dict[str, Any]:
+        self.calls["get_function_configuration"] += 1
+        self.events.append(("poll", FunctionName))
+        response: dict[str, Any] = {
+            "Layers": [{"Arn": arn} for arn in self.layers.get(FunctionName, [])]
+        }
+        if FunctionName in self.code_hashes:
+            response["CodeSha256"] = self.code_hashes[FunctionName]
+        if self.pending_polls.get(FunctionName, 0) > 0:
+            self.pending_polls[FunctionName] -= 1
+            response["LastUpdateStatus"] = "InProgress"
+        elif FunctionName in self.failed_updates:
+            response["LastUpdateStatus"] = "Failed"
+            response["LastUpdateStatusReason"] = "Bad handler"
+        else:
+            response["LastUpdateStatus"] = "Successful"
+        return response
+
+    def get_waiter(self, name: str) -> Any:
+        assert name == "function_updated_v2"
+        api = self
+
+        class Waiter:
+            def wait(self, FunctionName: str) -> None:
+                while (
+                    api.get_function_configuration(FunctionName)["LastUpdateStatus"]
+                    == "InProgress"
+                ):
+                    pass
+
+        return Waiter()
+
+    def get_paginator(self, name: str) -> Any:
+        assert name == "list_functions"
+        api = self
+
+        class Paginator:
+            def paginate(self) -> Iterator[dict[str, Any]]:
+                api.calls["list_functions"] += 1
+                if not api.can_list_functions:
+                    raise botocore.exceptions.ClientError(
+                        {"Error": {"Code": "AccessDeniedException"}}, "ListFunctions"
+                    )
+                items = list(api.code_hashes.items())
+                for i in range(0, len(items), 2):
+                    yield {
+                        "Functions": [
+                            {"FunctionName": name, "CodeSha256": code_hash}
+                            for name, code_hash in items[i : i + 2]
+                        ]
+                    }
+
+        return Paginator()
+
+    def update_function_code(self, FunctionName: str, ZipFile: bytes) -> None:
+        if FunctionName in self.failing_functions:
+            raise RuntimeError(f"Update of {FunctionName} failed")
+        self.calls["update_function_code"] += 1
+        self.code[FunctionName] = ZipFile
+        self.code_hashes[FunctionName] = base64.b64encode(
+            hashlib.sha256(ZipFile).digest()
+        ).decode()
+        self.pending_polls[FunctionName] = self.update_polls.get(FunctionName, 0)
+
+    def update_function_configuration(
+        self, FunctionName: str, Layers: list[str]
+    ) -> None:
+        assert self.pending_polls.get(FunctionName, 0) == 0, "ResourceConflict"
+        self.calls["update_function_configuration"] += 1
+        self.layers[FunctionName] = list(Layers)
+
+    def list_layer_versions(self, LayerName: str, **kwargs: Any) -> dict[str, Any]:
+        self.calls["list_layer_versions"] += 1
+        return {"LayerVersions": list(reversed(self.layer_versions.get(LayerName, [])))}
+
+    def publish_layer_version(
+        self, LayerName: str, Description: str, Content: dict[str, Any], **kwargs: Any
+    ) -> dict[str, Any]:
+        self.calls["publish_layer_version"] += 1
+        versions = self.layer_versions.setdefault(LayerName, [])
+        arn = (
+            f"arn:aws:lambda:us-west-2:123456789012:layer:{LayerName}:"
+            f"{len(versions) + 1}"
+        )
+        versions.append(
+            {"LayerVersionArn": arn, "Description": Description, "Content": Content}
+        )
+        return {"LayerVersionArn": arn}
+
+    def publish_version(self, FunctionName: str) -> dict[str, Any]:
+        assert self.pending_polls.get(FunctionName, 0) == 0, "ResourceConflict"
+        self.calls["publish_version"] += 1
+        self.events.append(("publish", FunctionName))
+        return {"Version": "1"}
+
+    def update_alias(self, FunctionName: str, Name: str, FunctionVersion: str) -> None:
+        if (FunctionName, Name) not in self.aliases:
+            raise botocore.exceptions.ClientError(
+                {"Error": {"Code": "ResourceNotFoundException"}}, "UpdateAlias"
+            )
+        self.aliases[(FunctionName, Name)] = FunctionVersion
+
+    def create_alias(self, FunctionName: str, Name: str, FunctionVersion: str) -> None:
+        self.calls["create_alias"] += 1
+        self.aliases[(FunctionName, Name)] = FunctionVersion
+
+
+@pytest.fixture(name="lambda_api")
+def lambda_api_fixture() -> FakeLambdaApi:
+    return FakeLambdaApi()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Generator
+
+import pytest
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import (
+    BuildConfig,
+    DeploymentConfig,
+    SingleLambdaConfig,
+)
+from lambda_lift.deployment.aws import _deploy_lambda_with_layer, get_live_code_sha256
+from lambda_lift.packer.packaging import package_lambda
+
+if TYPE_CHECKING:
+    from conftest import FakeLambdaApi
+
+LAYER_ARN_PREFIX = "arn:aws:lambda:us-west-2:123456789012:layer:"
+
+
+@dataclass(frozen=True)
+class LayerFixture:
+    temp_path: Path
+    config: SingleLambdaConfig
+    api: FakeLambdaApi
+
+    def deploy(self) -> None:
+        _deploy_lambda_with_layer(
+            session=self.api,  # type: ignore[arg-type]
+            config=self.config,
+            deploy_config=self.config.deployments["prod"],
+            live_code_sha256=get_live_code_sha256(self.api, "test-prod"),
+        )
+
+    def deployed_names(self) -> list[str]:
+        zip_path = self.temp_path / "deployed.zip"
+        zip_path.write_bytes(self.api.code["test-prod"])
+        return zipfile.ZipFile(zip_path).namelist()
+
+
+@pytest.fixture(name="lf")
+def layer_fixture(lambda_api: FakeLambdaApi) -> Generator[LayerFixture, None, None]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        (temp_path / "src").mkdir()
+        (temp_path / "src" / "handler.py").write_text("def handler(e, c): ...")
+        config = SingleLambdaConfig(
+            name="test",
+            build=BuildConfig(
+                source_paths=[temp_path / "src"],
+                requirements_path=None,
+                destination_path=temp_path / "dist" / "test.zip",
+                cache_path=temp_path / "cache",
+                platform=Platform.ARM64,
+                python_executable=None,
+                ignore_libraries=[],
+            ),
+            deployments={
+                "prod": DeploymentConfig(
+                    region="us-west-2",
+                    name="test-prod",
+                    s3_path=None,
+                    aws_profile=None,
+                    dependencies_layer="test-deps",
+                )
+            },
+            _toml_path=temp_path / "lambda-lift.toml",
+        )
+        package_lambda(config)
+        yield LayerFixture(temp_path, config, lambda_api)
+
+
+class TestLayers:
+    def test_layer_published_once(self, lf: LayerFixture) -> None:
+        lf.deploy()
+        assert lf.api.layers["test-prod"] == [f"{LAYER_ARN_PREFIX}test-deps:1"]
+        assert lf.deployed_names() == ["handler.py"]
+        lf.api.calls.clear()
+        lf.deploy()
+        assert "publish_layer_version" not in lf.api.calls
+        assert "update_function_configuration" not in lf.api.calls
+        assert "update_function_code" not in lf.api.calls
+
+    def test_other_layers_are_kept(self, lf: LayerFixture) -> None:
+        other_layer = f"{LAYER_ARN_PREFIX}other:3"
+        lf.api.layers["test-prod"] = [other_layer, f"{LAYER_ARN_PREFIX}test-deps:7"]
+        lf.deploy()
+        assert lf.api.layers["test-prod"] == [
+            other_layer,
+            f"{LAYER_ARN_PREFIX}test-deps:1",
+        ]
+
+    def test_fallback_on_layer_count(self, lf: LayerFixture) -> None:
+        other_layers = [f"{LAYER_ARN_PREFIX}other-{i}:1" for i in range(5)]
+        lf.api.layers["test-prod"] = [*other_layers, f"{LAYER_ARN_PREFIX}test-deps:1"]
+        lf.deploy()
+        assert "publish_layer_version" not in lf.api.calls
+        assert lf.api.layers["test-prod"] == other_layers
+        assert lf.api.code["test-prod"] == lf.config.build.destination_path.read_bytes()
+
+    def test_waits_for_update_in_progress(self, lf: LayerFixture) -> None:
+        lf.api.pending_polls["test-prod"] = 3
+        lf.deploy()
+        assert lf.api.pending_polls["test-prod"] == 0
+        assert lf.api.layers["test-prod"] == [f"{LAYER_ARN_PREFIX}test-deps:1"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import BuildConfig, SingleLambdaConfig
+from lambda_lift.packer.packaging import run_packaging_stages
+
+
+@dataclass(frozen=True)
+class ArtifactFixture:
+    temp_path: Path
+    config: SingleLambdaConfig
+
+    @property
+    def handler_path(self) -> Path:
+        return self.temp_path / "src" / "handler.py"
+
+    def build(self) -> int:
+        """
+        Builds the lambda and returns mtime of the artifact.
+        """
+        run_packaging_stages(self.config)
+        return self.config.build.destination_path.stat().st_mtime_ns
+
+    def read_handler(self) -> bytes:
+        with zipfile.ZipFile(self.config.build.destination_path) as zip_file:
+            return zip_file.read("handler.py")
+
+
+@pytest.fixture(name="af")
+def artifact_fixture() -> Generator[ArtifactFixture, None, None]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        (temp_path / "src").mkdir()
+        (temp_path / "src" / "handler.py").write_text("def handler(e, c): ...")
+        config = SingleLambdaConfig(
+            name="test",
+            build=BuildConfig(
+                source_paths=[temp_path / "src"],
+                requirements_path=None,
+                destination_path=temp_path / "dist" / "test.zip",
+                cache_path=temp_path / "cache",
+                platform=Platform.ARM64,
+                python_executable=None,
+                ignore_libraries=[],
+            ),
+            deployments={},
+            _toml_path=temp_path / "lambda-lift.toml",
+        )
+        yield ArtifactFixture(temp_path, config)
+
+
+class TestArtifactCache:
+    def test_no_change(self, af: ArtifactFixture) -> None:
+        mtime = af.build()
+        assert af.build() == mtime
+
+    def test_source_changed(self, af: ArtifactFixture) -> None:
+        af.build()
+        af.handler_path.write_text("def handler(e, c): return 1")
+        af.build()
+        assert af.read_handler() == b"def handler(e, c): return 1"
+
+    def test_source_added(self, af: ArtifactFixture) -> None:
+        af.build()
+        (af.temp_path / "src" / "pkg").mkdir()
+        af.build()
+        with zipfile.ZipFile(af.config.build.destination_path) as zip_file:
+            assert "pkg/" in zip_file.namelist()
+
+    def test_source_touched(self, af: ArtifactFixture) -> None:
+        mtime = af.build()
+        os.utime(af.handler_path, ns=(1, 1))
+        assert af.build() == mtime
+
+    def test_artifact_modified(self, af: ArtifactFixture) -> None:
+        af.build()
+        expected = af.config.build.destination_path.read_bytes()
+        af.config.build.destination_path.write_bytes(b"garbage")
+        af.build()
+        assert af.config.build.destination_path.read_bytes() == expected
+
+    def test_artifact_deleted(self, af: ArtifactFixture) -> None:
+        af.build()
+        af.config.build.destination_path.unlink()
+        af.build()
+        assert af.config.build.destination_path.exists()
+
+    def test_fast_compression_rebuilds(self, af: ArtifactFixture) -> None:
+        mtime = af.build()
+        fast_config = replace(
+            af.config, build=replace(af.config.build, fast_compression=True)
+        )
+        run_packaging_stages(fast_config)
+        assert fast_config.build.destination_path.stat().st_mtime_ns != mtime
+        assert fast_config.build.data_hash == af.config.build.data_hash
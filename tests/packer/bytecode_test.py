@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import importlib.util
+import marshal
+import sys
+import tempfile
+import zipfile
+from pathlib import Path, PurePosixPath
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import BuildConfig, SingleLambdaConfig
+from lambda_lift.packer.bytecode import compile_bytecode, is_bytecode_for_optimization
+from lambda_lift.packer.packaging import run_packaging_stages
+
+_TAG = sys.implementation.cache_tag
+
+
+class TestBytecode:
+    def _make_config(self, temp_path: Path, optimization: int) -> SingleLambdaConfig:
+        return SingleLambdaConfig(
+            name="test",
+            build=BuildConfig(
+                source_paths=[temp_path / "src"],
+                requirements_path=None,
+                destination_path=temp_path / "dist" / "test.zip",
+                cache_path=temp_path / "cache",
+                platform=Platform.ARM64,
+                python_executable=None,
+                ignore_libraries=[],
+                precompile=True,
+                precompile_optimization=optimization,
+            ),
+            deployments={},
+            _toml_path=temp_path / "lambda-lift.toml",
+        )
+
+    def test_is_bytecode_for_optimization(self) -> None:
+        path = PurePosixPath("pkg/__pycache__/mod.cpython-312.pyc")
+        opt_path = PurePosixPath("pkg/__pycache__/mod.cpython-312.opt-2.pyc")
+        assert is_bytecode_for_optimization(path, 0)
+        assert not is_bytecode_for_optimization(path, 2)
+        assert is_bytecode_for_optimization(opt_path, 2)
+        assert not is_bytecode_for_optimization(opt_path, 0)
+        assert not is_bytecode_for_optimization(PurePosixPath("pkg/mod.pyc"), 0)
+
+    def test_compile_bytecode(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root_path = Path(temp_dir) / "root"
+            (root_path / "pkg").mkdir(parents=True)
+            (root_path / "pkg" / "mod.py").write_text("VALUES = {'a', 'b', 'c'}\n")
+            (root_path / "broken.py").write_text("def broken(:\n")
+            failed = compile_bytecode([root_path], python=None, optimization=1)
+            assert failed == [root_path / "broken.py"]
+            pyc_path = root_path / "pkg" / "__pycache__" / f"mod.{_TAG}.opt-1.pyc"
+            pyc_bytes = pyc_path.read_bytes()
+            # Hash-based bytecode that isn't checked against the source
+            assert int.from_bytes(pyc_bytes[4:8], "little") == 0b01
+            compile_bytecode([root_path], python=None, optimization=1)
+            assert pyc_path.read_bytes() == pyc_bytes
+
+    def test_precompiled_artifact(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "src" / "__pycache__").mkdir(parents=True)
+            (temp_path / "src" / "handler.py").write_text("def handler(e, c): ...\n")
+            (temp_path / "src" / "__pycache__" / "stale.pyc").write_bytes(b"stale")
+            run_packaging_stages(self._make_config(temp_path, optimization=2))
+            with zipfile.ZipFile(temp_path / "dist" / "test.zip") as zip_file:
+                assert sorted(zip_file.namelist()) == [
+                    "__pycache__/",
+                    f"__pycache__/handler.{_TAG}.opt-2.pyc",
+                    "handler.py",
+                ]
+            # Source folders are left untouched
+            assert sorted(p.name for p in (temp_path / "src").rglob("*")) == [
+                "__pycache__",
+                "handler.py",
+                "stale.pyc",
+            ]
+            # The shipped bytecode is importable
+            with zipfile.ZipFile(temp_path / "dist" / "test.zip") as zip_file:
+                pyc_bytes = zip_file.read(f"__pycache__/handler.{_TAG}.opt-2.pyc")
+            assert pyc_bytes[:4] == importlib.util.MAGIC_NUMBER
+            namespace: dict[str, object] = {}
+            exec(marshal.loads(pyc_bytes[16:]), namespace)
+            assert callable(namespace["handler"])
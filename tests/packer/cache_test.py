@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import tempfile
 from dataclasses import dataclass, replace
 from pathlib import Path
@@ -10,11 +11,14 @@ import pytest
 
 from lambda_lift.config.enums import Platform
 from lambda_lift.config.single_lambda import BuildConfig
-from lambda_lift.packer.cache import (
+from lambda_lift.packer.cache import state
+from lambda_lift.packer.cache.state import (
+    get_dependencies_hash,
     get_dependencies_zip_path,
     check_dependencies_up_to_date,
     bump_dependencies_cache,
 )
+from lambda_lift.utils.hashing import get_file_blake2b
 
 
 @dataclass(frozen=True)
@@ -122,3 +126,63 @@ class TestCache:
         # Ensure reordering ignore_libraries doesn't invalidate cache
         tf.config.build = replace(tf.config.build, ignore_libraries=["lib2", "lib1"])
         assert check_dependencies_up_to_date(tf.config)
+
+    def test_stat_fast_path(
+        self, tf: TestFixture, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        tf.config.build.requirements_path.write_text("requirements")
+        deps_zip = get_dependencies_zip_path(tf.config)
+        deps_zip.write_bytes(b"test")
+        bump_dependencies_cache(tf.config)
+        hashed_paths: list[Path] = []
+        original_hash = state.get_file_blake2b
+
+        def counting_hash(path: Path) -> str:
+            hashed_paths.append(path)
+            return original_hash(path)
+
+        monkeypatch.setattr(state, "get_file_blake2b", counting_hash)
+        assert check_dependencies_up_to_date(tf.config)
+        assert deps_zip not in hashed_paths
+        # Same content with a different mtime is hashed once, then trusted again
+        stat = deps_zip.stat()
+        os.utime(deps_zip, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert check_dependencies_up_to_date(tf.config)
+        assert hashed_paths.count(deps_zip) == 1
+        assert check_dependencies_up_to_date(tf.config)
+        assert hashed_paths.count(deps_zip) == 1
+
+    def test_paranoid(self, tf: TestFixture) -> None:
+        tf.config.build = replace(tf.config.build, requirements_path=None)
+        deps_zip = get_dependencies_zip_path(tf.config)
+        deps_zip.write_bytes(b"test")
+        bump_dependencies_cache(tf.config)
+        # Modify the content in place, keeping the size and mtime
+        stat = deps_zip.stat()
+        deps_zip.write_bytes(b"TEST")
+        os.utime(deps_zip, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert check_dependencies_up_to_date(tf.config)
+        assert not check_dependencies_up_to_date(tf.config, paranoid=True)
+
+    def test_changing_interpreter_version(
+        self, tf: TestFixture, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        tf.config.build = replace(tf.config.build, requirements_path=None)
+        get_dependencies_zip_path(tf.config).write_bytes(b"test")
+        monkeypatch.setattr(state, "get_python_version", lambda python: "3.12")
+        bump_dependencies_cache(tf.config)
+        assert check_dependencies_up_to_date(tf.config)
+        monkeypatch.setattr(state, "get_python_version", lambda python: "3.13")
+        assert not check_dependencies_up_to_date(tf.config)
+
+    def test_legacy_state(self, tf: TestFixture) -> None:
+        tf.config.build = replace(tf.config.build, requirements_path=None)
+        deps_zip = get_dependencies_zip_path(tf.config)
+        deps_zip.write_bytes(b"test")
+        legacy_path = tf.temp_path / "cache" / "hashes_test-name.txt"
+        legacy_path.write_text("\nhash\nconfig")
+        assert not check_dependencies_up_to_date(tf.config)
+        bump_dependencies_cache(tf.config)
+        assert not legacy_path.exists()
+        assert check_dependencies_up_to_date(tf.config)
+        assert get_dependencies_hash(tf.config) == get_file_blake2b(deps_zip)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import platform
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import BuildConfig, SingleLambdaConfig
+from lambda_lift.exceptions import UserError
+from lambda_lift.packer.coldstart import (
+    bench_coldstart,
+    check_host_platform,
+    parse_import_times,
+    percentile,
+)
+
+_IMPORT_TIMES = """\
+import time: self [us] | cumulative | imported package
+import time:       300 |        300 | site
+lambda-lift: importing handler
+import time:       100 |        100 |     _json
+import time:       200 |        300 |   json.decoder
+import time:       400 |        700 | json
+import time:        50 |        750 | main
+"""
+
+
+def _make_config(temp_path: Path, platform_: Platform) -> SingleLambdaConfig:
+    return SingleLambdaConfig(
+        name="test",
+        build=BuildConfig(
+            source_paths=[temp_path / "src"],
+            requirements_path=None,
+            destination_path=temp_path / "test.zip",
+            cache_path=temp_path / "cache",
+            platform=platform_,
+            python_executable=None,
+            ignore_libraries=[],
+        ),
+        deployments={},
+        _toml_path=temp_path / "lambda-lift.toml",
+    )
+
+
+class TestColdStart:
+    def test_percentile(self) -> None:
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([7], 95) == 7
+        assert percentile([3, 1, 2], 50) == 2
+
+    def test_parse_import_times(self) -> None:
+        total_us, modules = parse_import_times(_IMPORT_TIMES)
+        assert total_us == 1450
+        assert modules == {
+            "_json": (100, 100),
+            "json.decoder": (200, 300),
+            "json": (400, 700),
+            "main": (50, 750),
+        }
+
+    def test_host_platform(self) -> None:
+        machine = platform.machine().lower()
+        is_arm = machine in ("aarch64", "arm64")
+        host_platform = Platform.ARM64 if is_arm else Platform.X86
+        other_platform = Platform.X86 if is_arm else Platform.ARM64
+        with tempfile.TemporaryDirectory() as temp_dir:
+            check_host_platform(_make_config(Path(temp_dir), host_platform))
+            with pytest.raises(UserError):
+                check_host_platform(_make_config(Path(temp_dir), other_platform))
+
+    def test_bench(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            config = _make_config(temp_path, Platform.X86)
+            with zipfile.ZipFile(config.build.destination_path, "w") as zip_file:
+                zip_file.writestr("app/__init__.py", "")
+                zip_file.writestr("app/helpers.py", "import json\n")
+                zip_file.writestr(
+                    "app/main.py", "from app import helpers\n\ndef handler(e, c): ...\n"
+                )
+            zip_path = config.build.destination_path
+            result = bench_coldstart(
+                config, zip_path, handler="app.main.handler", runs=2
+            )
+            assert len(result.runs) == 2
+            assert all(run.import_us > 0 for run in result.runs)
+            assert {"app", "app.main", "app.helpers"} <= set(result.get_module_times())
+            with pytest.raises(UserError):
+                bench_coldstart(config, zip_path, handler="app.main.missing", runs=1)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Callable, Generator
+
+import pytest
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import BuildConfig, SingleLambdaConfig
+
+
+@pytest.fixture(name="temp_path")
+def temp_path_fixture() -> Generator[Path, None, None]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+
+@pytest.fixture(name="make_config")
+def make_config_fixture(temp_path: Path) -> Callable[[str], SingleLambdaConfig]:
+    """
+    Returns a function creating the config of a lambda with a few source files
+    and no requirements in temp_path.
+    """
+
+    def make_config(name: str) -> SingleLambdaConfig:
+        src_path = temp_path / f"src_{name}"
+        for file_name in ("handler.py", "lib/__init__.py", "lib/utils.py"):
+            file_path = src_path / file_name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(f"# {name}: {file_name}\n")
+        return SingleLambdaConfig(
+            name=name,
+            build=BuildConfig(
+                source_paths=[src_path],
+                requirements_path=None,
+                destination_path=temp_path / "dist" / f"{name}.zip",
+                cache_path=temp_path / "cache" / name,
+                platform=Platform.ARM64,
+                python_executable=None,
+                ignore_libraries=[],
+            ),
+            deployments={},
+            _toml_path=temp_path / f"lambda-lift-{name}.toml",
+        )
+
+    return make_config
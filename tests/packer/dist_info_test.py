@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from lambda_lift.packer.dist_info import (
+    find_installed_distributions,
+    remove_distribution,
+)
+
+
+class TestDistInfo:
+    def _install(
+        self,
+        target: Path,
+        name: str,
+        version: str,
+        files: list[str],
+        *,
+        with_record: bool = True,
+        top_level: list[str] | None = None,
+    ) -> None:
+        for file in files:
+            path = target / file.removeprefix("../../")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"{name}: {file}")
+        dist_info_path = target / f"{name.replace('-', '_')}-{version}.dist-info"
+        dist_info_path.mkdir()
+        (dist_info_path / "METADATA").write_text(
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\nDescription"
+        )
+        if with_record:
+            record = [
+                *files,
+                f"{dist_info_path.name}/METADATA",
+                f"{dist_info_path.name}/RECORD",
+            ]
+            (dist_info_path / "RECORD").write_text(
+                "".join(f"{file},sha256=x,1\n" for file in record)
+            )
+        if top_level is not None:
+            (dist_info_path / "top_level.txt").write_text("\n".join(top_level))
+
+    def _list_files(self, target: Path) -> list[str]:
+        return sorted(p.relative_to(target).as_posix() for p in target.rglob("*"))
+
+    def test_find_and_remove(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir)
+            self._install(
+                target,
+                "Keep-Me",
+                "1.0",
+                [
+                    "keep_me/__init__.py",
+                    "ns/__init__.py",
+                    "ns/keep/__init__.py",
+                    "../../bin/keep",
+                ],
+            )
+            self._install(
+                target,
+                "drop.me",
+                "2.0",
+                [
+                    "drop_me/__init__.py",
+                    "drop_me/sub/x.py",
+                    "ns/__init__.py",
+                    "ns/drop/__init__.py",
+                    "../../bin/drop",
+                ],
+            )
+            distributions = find_installed_distributions(target)
+            assert sorted(d.pin for d in distributions) == [
+                "Keep-Me==1.0",
+                "drop.me==2.0",
+            ]
+            remove_distribution(
+                target, next(d for d in distributions if d.name == "drop.me")
+            )
+            assert self._list_files(target) == [
+                "Keep_Me-1.0.dist-info",
+                "Keep_Me-1.0.dist-info/METADATA",
+                "Keep_Me-1.0.dist-info/RECORD",
+                "bin",
+                "bin/keep",
+                "keep_me",
+                "keep_me/__init__.py",
+                "ns",
+                "ns/__init__.py",  # Also listed by Keep-Me
+                "ns/keep",
+                "ns/keep/__init__.py",
+            ]
+
+    def test_remove_without_record(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir)
+            self._install(
+                target,
+                "legacy",
+                "0.1",
+                ["legacy/__init__.py", "legacy_helpers.py"],
+                with_record=False,
+                top_level=["legacy", "legacy_helpers"],
+            )
+            (distribution,) = find_installed_distributions(target)
+            remove_distribution(target, distribution)
+            assert self._list_files(target) == []
+
+    def test_remove_without_record_keeps_shared_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir)
+            self._install(target, "ns-core", "1.0", ["ns/__init__.py", "ns/core.py"])
+            self._install(
+                target,
+                "legacy",
+                "0.1",
+                ["ns/legacy.py"],
+                with_record=False,
+                top_level=["ns"],
+            )
+            legacy = next(
+                d for d in find_installed_distributions(target) if d.name == "legacy"
+            )
+            remove_distribution(target, legacy)
+            assert self._list_files(target) == [
+                "ns",
+                "ns/__init__.py",
+                "ns/core.py",
+                "ns_core-1.0.dist-info",
+                "ns_core-1.0.dist-info/METADATA",
+                "ns_core-1.0.dist-info/RECORD",
+            ]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import zipfile
+from typing import Any, Callable
+
+import pytest
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.packer import packaging
+from lambda_lift.packer.exceptions import LockTimeoutError
+from lambda_lift.packer.packaging import run_packaging_stages
+from lambda_lift.utils.locking import file_lock
+
+
+class TestConcurrentBuilds:
+    def test_build_lock_timeout(
+        self, make_config: Callable[[str], SingleLambdaConfig]
+    ) -> None:
+        config = make_config("a")
+        lock_path = config.build.cache_path / "build_a.lock"
+        with file_lock(lock_path, timeout=0):
+            with pytest.raises(LockTimeoutError):
+                run_packaging_stages(config, lock_timeout=0.2)
+        assert not config.build.destination_path.exists()
+
+    def test_concurrent_builders_reuse_result(
+        self,
+        make_config: Callable[[str], SingleLambdaConfig],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        original_build = packaging.build_dependencies_zip_file
+        build_count = 0
+
+        def counting_build(*args: Any, **kwargs: Any) -> None:
+            nonlocal build_count
+            build_count += 1
+            original_build(*args, **kwargs)
+
+        monkeypatch.setattr(packaging, "build_dependencies_zip_file", counting_build)
+        config = make_config("a")
+        errors: list[BaseException] = []
+
+        def build() -> None:
+            try:
+                run_packaging_stages(config)
+            except BaseException as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=build) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert build_count == 1
+        with zipfile.ZipFile(config.build.destination_path) as zip_file:
+            assert "handler.py" in zip_file.namelist()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from lambda_lift.config.single_lambda import SingleLambdaConfig
+from lambda_lift.packer import parallel
+from lambda_lift.packer.exceptions import PackagingError
+from lambda_lift.packer.packaging import package_lambda
+from lambda_lift.packer.parallel import package_lambdas_in_parallel
+
+
+class TestParallelPackaging:
+    def _with_destination(
+        self, config: SingleLambdaConfig, dest_path: Path
+    ) -> SingleLambdaConfig:
+        return replace(config, build=replace(config.build, destination_path=dest_path))
+
+    def test_identical_to_serial(
+        self, temp_path: Path, make_config: Callable[[str], SingleLambdaConfig]
+    ) -> None:
+        configs = [make_config(name) for name in "abc"]
+        for config in configs:
+            package_lambda(
+                self._with_destination(
+                    config, temp_path / "serial" / f"{config.name}.zip"
+                )
+            )
+        package_lambdas_in_parallel(configs, jobs=3)
+        for config in configs:
+            serial_bytes = (temp_path / "serial" / f"{config.name}.zip").read_bytes()
+            parallel_bytes = config.build.destination_path.read_bytes()
+            assert serial_bytes == parallel_bytes
+
+    def test_errors_are_collected(
+        self, temp_path: Path, make_config: Callable[[str], SingleLambdaConfig]
+    ) -> None:
+        good = make_config("good")
+        bad = make_config("bad")
+        bad = replace(
+            bad,
+            build=replace(bad.build, source_paths=[temp_path / "missing"]),
+        )
+        with pytest.raises(PackagingError) as ex_info:
+            package_lambdas_in_parallel([bad, good], jobs=2)
+        assert "bad" in str(ex_info.value)
+        assert "good" not in str(ex_info.value)
+        assert good.build.destination_path.exists()
+
+    def test_worker_messages_are_forwarded(
+        self,
+        temp_path: Path,
+        make_config: Callable[[str], SingleLambdaConfig],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        messages: list[str] = []
+        monkeypatch.setattr(parallel, "rich_print", messages.append)
+        config = make_config("a")
+        config = replace(config, build=replace(config.build, precompile=True))
+        (temp_path / "src_a" / "broken.py").write_text("def broken(:\n")
+        package_lambdas_in_parallel([config], jobs=1)
+        assert "a: 1 files failed to precompile" in "\n".join(messages)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import tempfile
+import zipfile
+from pathlib import Path
+
+from lambda_lift.packer.pip import PipSources, run_pip_install
+
+
+class TestPip:
+    def _make_wheel(self, wheelhouse: Path, name: str, version: str) -> None:
+        dist_info = f"{name}-{version}.dist-info"
+        files = {
+            f"{name}/__init__.py": f"VERSION = {version!r}\n",
+            f"{dist_info}/METADATA": (
+                f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+            ),
+            f"{dist_info}/WHEEL": (
+                "Wheel-Version: 1.0\nGenerator: test\n"
+                "Root-Is-Purelib: true\nTag: py3-none-any\n"
+            ),
+            f"{dist_info}/RECORD": "",
+        }
+        wheelhouse.mkdir(parents=True, exist_ok=True)
+        wheel_path = wheelhouse / f"{name}-{version}-py3-none-any.whl"
+        with zipfile.ZipFile(wheel_path, "w") as wheel:
+            for arcname, content in files.items():
+                wheel.writestr(arcname, content)
+
+    def test_sources_args(self) -> None:
+        assert PipSources().args == []
+        assert PipSources(
+            cache_dir=Path("/cache"), find_links=Path("/wheels"), no_index=True
+        ).args == ["--cache-dir", "/cache", "--find-links", "/wheels", "--no-index"]
+
+    def test_install_from_wheelhouse_only(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_wheel(temp_path / "wheelhouse", "fakepkg", "1.0")
+            requirements_path = temp_path / "requirements.txt"
+            requirements_path.write_text("fakepkg==1.0\n")
+            run_pip_install(
+                target=temp_path / "target",
+                requirement=requirements_path,
+                no_compile=True,
+                sources=PipSources(
+                    cache_dir=temp_path / "cache",
+                    find_links=temp_path / "wheelhouse",
+                    no_index=True,
+                ),
+            )
+            assert (temp_path / "target" / "fakepkg" / "__init__.py").read_text() == (
+                "VERSION = '1.0'\n"
+            )
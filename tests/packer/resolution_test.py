@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import BuildConfig, SingleLambdaConfig
+from lambda_lift.packer import packaging
+from lambda_lift.packer.packaging import build_dependencies_zip_file
+from lambda_lift.packer.resolution import (
+    get_requirements_files,
+    get_resolution_key,
+    get_resolution_path,
+    load_resolution,
+    save_resolution,
+)
+
+_PLATFORM = "manylinux2014_aarch64"
+
+
+@dataclass(frozen=True)
+class ResolutionFixture:
+    temp_path: Path
+    config: SingleLambdaConfig
+    pip_calls: list[dict[str, Any]]
+
+    def with_build(self, **changes: Any) -> SingleLambdaConfig:
+        return replace(self.config, build=replace(self.config.build, **changes))
+
+
+@pytest.fixture(name="rf")
+def resolution_fixture(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[ResolutionFixture, None, None]:
+    pip_calls: list[dict[str, Any]] = []
+
+    def fake_install(*packages: str, target: Path, **kwargs: Any) -> None:
+        pip_calls.append(kwargs)
+        for name, version in (("requests", "2.0"), ("idna", "3.0"), ("boto3", "1.0")):
+            (target / name).mkdir(parents=True)
+            (target / name / "__init__.py").write_text(f"VERSION = {version!r}")
+            dist_info = target / f"{name}-{version}.dist-info"
+            dist_info.mkdir()
+            (dist_info / "METADATA").write_text(f"Name: {name}\nVersion: {version}\n")
+            (dist_info / "RECORD").write_text(f"{name}/__init__.py,,\n")
+
+    monkeypatch.setattr(packaging, "run_pip_install", fake_install)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        (temp_path / "requirements.txt").write_text("requests\nboto3\n")
+        config = SingleLambdaConfig(
+            name="test",
+            build=BuildConfig(
+                source_paths=[temp_path / "src"],
+                requirements_path=temp_path / "requirements.txt",
+                destination_path=temp_path / "dist" / "test.zip",
+                cache_path=temp_path / "cache",
+                platform=Platform.ARM64,
+                python_executable=None,
+                ignore_libraries=["Boto3"],
+            ),
+            deployments={},
+            _toml_path=temp_path / "lambda-lift.toml",
+        )
+        yield ResolutionFixture(temp_path, config, pip_calls)
+
+
+class TestResolution:
+    def test_key_inputs(self, rf: ResolutionFixture) -> None:
+        key = get_resolution_key(rf.config, _PLATFORM)
+        assert key is not None
+        assert get_resolution_key(rf.config, _PLATFORM) == key
+        assert get_resolution_key(rf.config, "manylinux2014_x86_64") != key
+        assert get_resolution_key(rf.with_build(ignore_libraries=[]), _PLATFORM) != key
+        # Unrelated config changes don't affect the key
+        config = rf.with_build(destination_path=rf.temp_path / "other.zip")
+        assert get_resolution_key(config, _PLATFORM) == key
+        (rf.temp_path / "requirements.txt").write_text("requests==2.0\n")
+        assert get_resolution_key(rf.config, _PLATFORM) != key
+
+    def test_nested_files(self, rf: ResolutionFixture) -> None:
+        requirements_path = rf.temp_path / "requirements.txt"
+        requirements_path.write_text("-r base.txt\nrequests\n")
+        (rf.temp_path / "base.txt").write_text("--constraint=pins/constraints.txt\n")
+        (rf.temp_path / "pins").mkdir()
+        constraints_path = rf.temp_path / "pins" / "constraints.txt"
+        constraints_path.write_text("-c constraints.txt\nrequests==2.0\n")
+        assert get_requirements_files(requirements_path) == [
+            requirements_path,
+            rf.temp_path / "base.txt",
+            constraints_path,
+        ]
+        key = get_resolution_key(rf.config, _PLATFORM)
+        assert key is not None
+        constraints_path.write_text("requests==2.1\n")
+        assert get_resolution_key(rf.config, _PLATFORM) != key
+        constraints_path.write_text("requests @ https://example.com/requests.whl\n")
+        assert get_resolution_key(rf.config, _PLATFORM) is None
+
+    def test_direct_references_not_cached(self, rf: ResolutionFixture) -> None:
+        for requirements in (
+            "-e ./lib\n",
+            "mylib @ https://example.com/mylib.whl\n",
+            "./lib\n",
+            "git+https://github.com/org/repo.git\n",
+        ):
+            (rf.temp_path / "requirements.txt").write_text(requirements)
+            assert get_resolution_key(rf.config, _PLATFORM) is None
+
+    def test_load_and_save(self, rf: ResolutionFixture) -> None:
+        path = get_resolution_path(rf.config, "key")
+        assert load_resolution(path) is None
+        save_resolution(path, [("requests", "2.0"), ("idna", "3.0")])
+        assert path.read_text() == "idna==3.0\nrequests==2.0\n"
+        assert load_resolution(path) == [("idna", "3.0"), ("requests", "2.0")]
+        path.write_text("requests>=2\n")
+        assert load_resolution(path) is None
+
+    def test_pins_reused(self, rf: ResolutionFixture) -> None:
+        build_dependencies_zip_file(rf.config)
+        assert not rf.pip_calls[0].get("no_deps")
+        assert rf.pip_calls[0]["requirement"] == rf.temp_path / "requirements.txt"
+        key = get_resolution_key(rf.config, _PLATFORM)
+        assert key is not None
+        resolution_path = get_resolution_path(rf.config, key)
+        assert resolution_path.read_text() == "idna==3.0\nrequests==2.0\n"
+        build_dependencies_zip_file(rf.config)
+        assert rf.pip_calls[1].get("no_deps")
+        assert rf.pip_calls[1]["requirement"] == resolution_path
+        build_dependencies_zip_file(rf.config, refresh_resolution=True)
+        assert not rf.pip_calls[2].get("no_deps")
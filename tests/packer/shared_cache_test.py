@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import zipfile
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Generator
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+import pytest
+
+from lambda_lift.config.enums import Platform, TrimProfile
+from lambda_lift.config.single_lambda import (
+    BuildConfig,
+    SingleLambdaConfig,
+    TrimConfig,
+)
+from lambda_lift.packer import packaging
+from lambda_lift.packer.cache.archive import (
+    collect_cache_entries,
+    export_cache_archive,
+    import_cache_archive,
+)
+from lambda_lift.packer.cache.backends import (
+    CacheBackend,
+    LocalCacheBackend,
+    S3CacheBackend,
+    get_cache_backend,
+)
+from lambda_lift.packer.cache.shared import get_shared_cache_key
+from lambda_lift.packer.exceptions import SharedCacheError
+from lambda_lift.packer.packaging import run_packaging_stages
+from lambda_lift.packer.zip import zip_folder
+
+
+class _S3StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves the subset of the S3 API used by S3CacheBackend, with path-style
+    addressing and without authentication.
+    """
+
+    objects: dict[str, bytes]
+    # Answers "Expect: 100-continue" of uploads right away
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", head: bool = False) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _get_object_key(self) -> str:
+        return urlparse(self.path).path.lstrip("/")
+
+    def do_HEAD(self) -> None:
+        body = self.objects.get(self._get_object_key())
+        self._send(404 if body is None else 200, body or b"", head=True)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if "list-type" in query:
+            bucket = url.path.strip("/")
+            prefix = f"{bucket}/{query.get('prefix', [''])[0]}"
+            keys = sorted(key for key in self.objects if key.startswith(prefix))
+            contents = "".join(
+                f"<Contents><Key>{escape(key[len(bucket) + 1 :])}</Key>"
+                f"<Size>{len(self.objects[key])}</Size></Contents>"
+                for key in keys
+            )
+            self._send(
+                200,
+                (
+                    '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                    f"<Name>{bucket}</Name><KeyCount>{len(keys)}</KeyCount>"
+                    f"<IsTruncated>false</IsTruncated>{contents}</ListBucketResult>"
+                ).encode(),
+            )
+            return
+        body = self.objects.get(self._get_object_key())
+        if body is None:
+            self._send(404, b"<Error><Code>NoSuchKey</Code></Error>")
+        else:
+            self._send(200, body)
+
+    def do_PUT(self) -> None:
+        length = int(self.headers["Content-Length"])
+        self.objects[self._get_object_key()] = self.rfile.read(length)
+        self._send(200)
+
+
+@pytest.fixture(name="s3_objects")
+def s3_fixture(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[dict[str, bytes], None, None]:
+    objects: dict[str, bytes] = {}
+    handler = type("Handler", (_S3StandInHandler,), {"objects": objects})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("AWS_ENDPOINT_URL_S3", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    # The stand-in doesn't decode chunked uploads with trailing checksums
+    monkeypatch.setenv("AWS_REQUEST_CHECKSUM_CALCULATION", "when_required")
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    get_cache_backend.cache_clear()
+    try:
+        yield objects
+    finally:
+        server.shutdown()
+        server.server_close()
+        get_cache_backend.cache_clear()
+
+
+@pytest.fixture(name="temp_path")
+def temp_path_fixture() -> Generator[Path, None, None]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+
+def _make_zip(path: Path, content: str) -> Path:
+    with zipfile.ZipFile(path, "w") as zip_file:
+        zip_file.writestr("module.py", content)
+    return path
+
+
+def _check_backend(backend: CacheBackend, temp_path: Path) -> None:
+    assert backend.list_keys() == []
+    assert not backend.fetch("key-1", temp_path / "missing.zip")
+    assert not (temp_path / "missing.zip").exists()
+    backend.store("key-1", _make_zip(temp_path / "first.zip", "first"))
+    backend.store("key-2", _make_zip(temp_path / "second.zip", "second"))
+    # Existing entries are kept unless overwritten
+    backend.store("key-1", _make_zip(temp_path / "other.zip", "other"))
+    assert backend.list_keys() == ["key-1", "key-2"]
+    assert backend.fetch("key-1", temp_path / "fetched.zip")
+    assert (temp_path / "fetched.zip").read_bytes() == (
+        temp_path / "first.zip"
+    ).read_bytes()
+    backend.store("key-1", temp_path / "other.zip", overwrite=True)
+    assert backend.fetch("key-1", temp_path / "fetched.zip")
+    assert (temp_path / "fetched.zip").read_bytes() == (
+        temp_path / "other.zip"
+    ).read_bytes()
+
+
+class TestCacheBackends:
+    def test_local(self, temp_path: Path) -> None:
+        backend = get_cache_backend(str(temp_path / "shared"))
+        assert isinstance(backend, LocalCacheBackend)
+        _check_backend(backend, temp_path)
+
+    def test_s3(self, temp_path: Path, s3_objects: dict[str, bytes]) -> None:
+        backend = get_cache_backend("s3://cache-bucket/deps")
+        assert isinstance(backend, S3CacheBackend)
+        assert backend.prefix == "deps/"
+        _check_backend(backend, temp_path)
+        assert set(s3_objects) == {
+            "cache-bucket/deps/key-1.zip",
+            "cache-bucket/deps/key-2.zip",
+        }
+
+    def test_s3_unreachable(
+        self, temp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+        monkeypatch.setenv("AWS_MAX_ATTEMPTS", "1")
+        backend = S3CacheBackend("cache-bucket", "", endpoint_url="http://127.0.0.1:9")
+        with pytest.raises(SharedCacheError):
+            backend.store("key-1", _make_zip(temp_path / "first.zip", "first"))
+
+
+class TestSharedCache:
+    def _make_config(
+        self, temp_path: Path, name: str, shared_cache: Path | None
+    ) -> SingleLambdaConfig:
+        (temp_path / f"src_{name}").mkdir()
+        (temp_path / f"src_{name}" / "handler.py").write_text("import six\n")
+        (temp_path / "requirements.txt").write_text("six==1.16.0\n")
+        return SingleLambdaConfig(
+            name=name,
+            build=BuildConfig(
+                source_paths=[temp_path / f"src_{name}"],
+                requirements_path=temp_path / "requirements.txt",
+                destination_path=temp_path / "dist" / f"{name}.zip",
+                cache_path=temp_path / "cache" / name,
+                platform=Platform.ARM64,
+                python_executable=None,
+                ignore_libraries=[],
+                shared_cache=str(shared_cache) if shared_cache else None,
+            ),
+            deployments={},
+            _toml_path=temp_path / f"lambda-lift-{name}.toml",
+        )
+
+    @pytest.fixture(name="builds")
+    def builds_fixture(self, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        """
+        Replaces pip installs with a fake dependency. Returns the names of the
+        lambdas whose dependencies were built.
+        """
+        builds: list[str] = []
+
+        def fake_build(config: SingleLambdaConfig, **kwargs: Any) -> None:
+            builds.append(config.name)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                (Path(temp_dir) / "six.py").write_text(f"# six, build {len(builds)}\n")
+                zip_folder(Path(temp_dir), packaging.get_dependencies_zip_path(config))
+
+        monkeypatch.setattr(packaging, "build_dependencies_zip_file", fake_build)
+        return builds
+
+    def test_key(self, temp_path: Path) -> None:
+        config = self._make_config(temp_path, "a", None)
+        other = self._make_config(temp_path, "b", temp_path / "shared")
+        key = get_shared_cache_key(config)
+        assert key is not None
+        # Names and paths don't matter
+        assert get_shared_cache_key(other) == key
+        for changed_build in (
+            replace(config.build, platform=Platform.X86),
+            replace(config.build, ignore_libraries=["six"]),
+            replace(config.build, trim=TrimConfig(profile=TrimProfile.SAFE)),
+            replace(config.build, precompile=True),
+        ):
+            changed = replace(config, build=changed_build)
+            assert get_shared_cache_key(changed) != key
+        (temp_path / "requirements.txt").write_text("six==1.17.0\n")
+        assert get_shared_cache_key(config) != key
+        (temp_path / "requirements.txt").write_text("./local-package\n")
+        assert get_shared_cache_key(config) is None
+
+    def test_fetch_before_build(self, temp_path: Path, builds: list[str]) -> None:
+        first = self._make_config(temp_path, "a", temp_path / "shared")
+        second = self._make_config(temp_path, "b", temp_path / "shared")
+        run_packaging_stages(first)
+        assert builds == ["a"]
+        run_packaging_stages(second)
+        assert builds == ["a"]
+        with zipfile.ZipFile(second.build.destination_path) as zip_file:
+            assert set(zip_file.namelist()) == {"handler.py", "six.py"}
+        # Refreshing the resolution always builds and replaces the entry
+        run_packaging_stages(second, refresh_resolution=True)
+        assert builds == ["a", "b"]
+        third = self._make_config(temp_path, "c", temp_path / "shared")
+        run_packaging_stages(third)
+        assert builds == ["a", "b"]
+        with zipfile.ZipFile(third.build.destination_path) as zip_file:
+            assert zip_file.read("six.py") == b"# six, build 2\n"
+
+    def test_nested_constraints(self, temp_path: Path, builds: list[str]) -> None:
+        first = self._make_config(temp_path, "a", temp_path / "shared")
+        (temp_path / "requirements.txt").write_text("six\n-c constraints.txt\n")
+        (temp_path / "constraints.txt").write_text("six==1.16.0\n")
+        run_packaging_stages(first)
+        key = get_shared_cache_key(first)
+        (temp_path / "constraints.txt").write_text("six==1.17.0\n")
+        assert get_shared_cache_key(first) != key
+        # Neither the local nor the shared entry is reused
+        run_packaging_stages(first)
+        assert builds == ["a", "a"]
+
+    def test_corrupted_entry(self, temp_path: Path, builds: list[str]) -> None:
+        shared_path = temp_path / "shared"
+        config = self._make_config(temp_path, "a", shared_path)
+        key = get_shared_cache_key(config)
+        shared_path.mkdir()
+        (shared_path / f"{key}.zip").write_text("not a zip")
+        run_packaging_stages(config)
+        assert builds == ["a"]
+
+    def test_export_import(self, temp_path: Path, builds: list[str]) -> None:
+        built = self._make_config(temp_path, "a", None)
+        not_built = replace(
+            self._make_config(temp_path, "b", None),
+            build=replace(built.build, cache_path=temp_path / "cache" / "b"),
+        )
+        run_packaging_stages(built)
+        entries = collect_cache_entries([built, not_built])
+        assert list(entries) == [get_shared_cache_key(built)]
+        export_cache_archive(temp_path / "cache.tar", entries)
+        backend = LocalCacheBackend(temp_path / "image-cache")
+        assert import_cache_archive(temp_path / "cache.tar", backend) == list(entries)
+        assert backend.list_keys() == list(entries)
+        # A fresh machine with the imported cache doesn't build
+        fresh = replace(
+            not_built,
+            build=replace(not_built.build, shared_cache=str(temp_path / "image-cache")),
+        )
+        run_packaging_stages(fresh)
+        assert builds == ["a"]
+
+    def test_import_invalid_archive(self, temp_path: Path) -> None:
+        (temp_path / "cache.tar").write_text("not an archive")
+        with pytest.raises(SharedCacheError):
+            import_cache_archive(
+                temp_path / "cache.tar", LocalCacheBackend(temp_path / "shared")
+            )
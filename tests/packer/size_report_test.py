@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from lambda_lift.config.enums import Platform
+from lambda_lift.config.single_lambda import (
+    BuildConfig,
+    SingleLambdaConfig,
+    SizeBudget,
+)
+from lambda_lift.packer.exceptions import SizeBudgetError
+from lambda_lift.packer.size_report import (
+    SizeEntry,
+    check_size_budget,
+    get_previous_size_report,
+    get_size_report,
+    record_size_report,
+)
+
+
+def _make_config(temp_path: Path, size_budget: SizeBudget) -> SingleLambdaConfig:
+    return SingleLambdaConfig(
+        name="test",
+        build=BuildConfig(
+            source_paths=[temp_path / "src"],
+            requirements_path=None,
+            destination_path=temp_path / "test.zip",
+            cache_path=temp_path / "cache",
+            platform=Platform.ARM64,
+            python_executable=None,
+            ignore_libraries=[],
+            size_budget=size_budget,
+        ),
+        deployments={},
+        _toml_path=temp_path / "lambda-lift.toml",
+    )
+
+
+def _write_zip(path: Path, entries: dict[str, bytes]) -> None:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zip_file:
+        zip_file.writestr("requests/", b"")
+        for name, content in entries.items():
+            zip_file.writestr(name, content)
+
+
+class TestSizeReport:
+    def test_report(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            zip_path = Path(temp_dir) / "test.zip"
+            _write_zip(
+                zip_path,
+                {
+                    "requests/__init__.py": b"x" * 30,
+                    "requests/api.py": b"x" * 50,
+                    "six.py": b"x" * 100,
+                    "main.py": b"x" * 10,
+                },
+            )
+            report = get_size_report(zip_path, largest_files_count=2)
+            assert report.zip_size == zip_path.stat().st_size
+            assert report.packages == (
+                SizeEntry("six.py", 100, 100),
+                SizeEntry("requests", 80, 80),
+                SizeEntry("main.py", 10, 10),
+            )
+            assert report.largest_files == (
+                SizeEntry("six.py", 100, 100),
+                SizeEntry("requests/api.py", 50, 50),
+            )
+            assert report.compressed_size == report.uncompressed_size == 190
+
+    def test_previous_report(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = _make_config(Path(temp_dir), SizeBudget())
+            zip_path = config.build.destination_path
+            _write_zip(zip_path, {"main.py": b"x" * 10})
+            first = get_size_report(zip_path)
+            assert get_previous_size_report(config, first) is None
+            record_size_report(config, first)
+            assert get_previous_size_report(config, first) is None
+            _write_zip(zip_path, {"main.py": b"x" * 20})
+            second = get_size_report(zip_path)
+            # Not recorded yet, e.g. the artifact was rebuilt elsewhere
+            assert get_previous_size_report(config, second) == first
+            record_size_report(config, second)
+            record_size_report(config, second)
+            assert get_previous_size_report(config, second) == first
+
+    def test_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            zip_path = temp_path / "test.zip"
+            _write_zip(zip_path, {"main.py": b"x" * 1000})
+            report = get_size_report(zip_path)
+            check_size_budget(_make_config(temp_path, SizeBudget()), report)
+            budget = SizeBudget(max_zipped_size=report.zip_size, max_unzipped_size=1000)
+            check_size_budget(_make_config(temp_path, budget), report)
+            for budget in (
+                SizeBudget(max_zipped_size=report.zip_size - 1),
+                SizeBudget(max_unzipped_size=999),
+            ):
+                with pytest.raises(SizeBudgetError):
+                    check_size_budget(_make_config(temp_path, budget), report)
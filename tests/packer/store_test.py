@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from lambda_lift.packer import store
+from lambda_lift.packer.store import install_from_store
+from lambda_lift.packer.zip import zip_folder
+
+
+class TestStore:
+    @pytest.fixture(autouse=True)
+    def fake_pip(self, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        installed: list[str] = []
+
+        def fake_install(package: str, *, target: Path, **kwargs: object) -> None:
+            name, _, version = package.partition("==")
+            installed.append(package)
+            module_path = target / name.replace("-", "_") / "__init__.py"
+            module_path.parent.mkdir(parents=True)
+            module_path.write_text(f"VERSION = {version!r}")
+
+        monkeypatch.setattr(store, "run_pip_install", fake_install)
+        monkeypatch.setattr(store, "get_python_version", lambda python: "3.12")
+        return installed
+
+    def _build(self, temp_path: Path, pins: str, dest_name: str) -> tuple[int, int]:
+        target_path = temp_path / dest_name
+        result = install_from_store(
+            store_path=temp_path / "store",
+            pins=[tuple(pin.split("==")) for pin in pins.split()],  # type: ignore
+            platform="manylinux2014_aarch64",
+            python=None,
+            target=target_path,
+        )
+        zip_folder(target_path, temp_path / f"{dest_name}.zip")
+        return result
+
+    def test_reuse_between_lambdas(self, fake_pip: list[str]) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            assert self._build(temp_path, "a==1.0 b==2.0", "x") == (0, 2)
+            assert self._build(temp_path, "a==1.0 b==2.1", "y") == (1, 1)
+            assert self._build(temp_path, "b==2.0 a==1.0", "z") == (2, 0)
+            assert sorted(fake_pip) == ["a==1.0", "b==2.0", "b==2.1"]
+            with zipfile.ZipFile(temp_path / "y.zip") as zip_file:
+                assert zip_file.read("b/__init__.py") == b"VERSION = '2.1'"
+            # Files are linked from the store
+            store_file = next((temp_path / "store").rglob("a/__init__.py"))
+            assert (temp_path / "x" / "a" / "__init__.py").samefile(store_file)
+            # Order of requirements doesn't affect the result
+            assert (temp_path / "x.zip").read_bytes() == (
+                temp_path / "z.zip"
+            ).read_bytes()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import ctypes
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from lambda_lift.packer.elf import strip_debug_sections
+from lambda_lift.packer.stripping import strip_shared_objects
+
+_SOURCE = """
+static const char *messages[] = {"zero", "one", "two"};
+int add(int a, int b) { return a + b; }
+const char *message(int idx) { return messages[idx]; }
+"""
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="Requires gcc")
+class TestStripping:
+    def _compile(self, temp_path: Path, name: str) -> Path:
+        source_path = temp_path / "lib.c"
+        source_path.write_text(_SOURCE)
+        output_path = temp_path / "site" / "pkg" / name
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            ["gcc", "-g", "-shared", "-fPIC", "-o", str(output_path), str(source_path)],
+            check=True,
+        )
+        return output_path
+
+    def _check_loads(self, path: Path) -> None:
+        library = ctypes.CDLL(str(path))
+        library.message.restype = ctypes.c_char_p
+        assert library.add(2, 3) == 5
+        assert library.message(2) == b"two"
+
+    def test_builtin(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            so_path = self._compile(temp_path, "_native.cpython-312-linux-gnu.so")
+            versioned_path = so_path.with_name("libnative.so.1")
+            shutil.copy(so_path, versioned_path)
+            # Files linked from the package store must not change
+            store_path = temp_path / "store.so"
+            os.link(so_path, store_path)
+            store_bytes = store_path.read_bytes()
+            (so_path.parent / "fake.so").write_bytes(b"not an elf file")
+            count, saved = strip_shared_objects(temp_path / "site", strip_tool=None)
+            assert count == 2
+            assert saved == 2 * (len(store_bytes) - so_path.stat().st_size) > 0
+            assert store_path.read_bytes() == store_bytes
+            assert (so_path.parent / "fake.so").read_bytes() == b"not an elf file"
+            assert os.access(so_path, os.X_OK)
+            self._check_loads(so_path)
+            self._check_loads(versioned_path)
+            # Already stripped files are left alone
+            assert strip_debug_sections(so_path.read_bytes()) is None
+            assert strip_shared_objects(temp_path / "site", strip_tool=None) == (0, 0)
+
+    @pytest.mark.skipif(shutil.which("strip") is None, reason="Requires strip")
+    def test_strip_tool(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            so_path = self._compile(temp_path, "_native.so")
+            size_before = so_path.stat().st_size
+            count, saved = strip_shared_objects(temp_path / "site", strip_tool="strip")
+            assert count == 1
+            assert saved == size_before - so_path.stat().st_size > 0
+            self._check_loads(so_path)
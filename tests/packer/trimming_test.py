@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from lambda_lift.config.enums import TrimProfile
+from lambda_lift.config.single_lambda import TrimConfig
+from lambda_lift.packer.trimming import UNKNOWN_DISTRIBUTION, trim_dependencies
+
+
+class TestTrimming:
+    def _install(self, target: Path, name: str, files: dict[str, int]) -> None:
+        for file, size in files.items():
+            path = target / file.removeprefix("../../")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * size)
+        dist_info_path = target / f"{name}-1.0.dist-info"
+        dist_info_path.mkdir()
+        (dist_info_path / "METADATA").write_text(f"Name: {name}\nVersion: 1.0\n")
+        record = [
+            *files,
+            f"{dist_info_path.name}/METADATA",
+            f"{dist_info_path.name}/RECORD",
+        ]
+        (dist_info_path / "RECORD").write_text(
+            "".join(f"{file},sha256=x,1\n" for file in record)
+        )
+
+    def _make_tree(self, target: Path) -> None:
+        self._install(
+            target,
+            "numpy",
+            {
+                "numpy/__init__.py": 10,
+                "numpy/__init__.pyi": 100,
+                "numpy/core/include/numpy/ndarrayobject.h": 1000,
+                "numpy/core/tests/test_core.py": 200,
+                "numpy/doc/guide.md": 50,
+                "numpy/doc/constants.py": 40,
+                "numpy/doc/index.html": 60,
+                "../../bin/f2py": 30,
+            },
+        )
+        self._install(
+            target,
+            "requests",
+            {
+                "requests/__init__.py": 10,
+                "requests/api.py": 20,
+                "requests/README.rst": 5,
+            },
+        )
+        (target / "stray.pyi").write_bytes(b"x" * 7)
+
+    def _record_size(self, target: Path, name: str) -> int:
+        return (target / f"{name}-1.0.dist-info" / "RECORD").stat().st_size
+
+    def _list_files(self, target: Path) -> list[str]:
+        return sorted(p.relative_to(target).as_posix() for p in target.rglob("*"))
+
+    def test_safe(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir)
+            self._make_tree(target)
+            numpy_record = self._record_size(target, "numpy")
+            requests_record = self._record_size(target, "requests")
+            saved = trim_dependencies(target, TrimConfig(profile=TrimProfile.SAFE))
+            assert saved == {
+                "numpy": 1100 + numpy_record,
+                "requests": requests_record,
+                UNKNOWN_DISTRIBUTION: 7,
+            }
+            files = self._list_files(target)
+            assert "numpy/core/include" not in files  # Empty directories are removed
+            assert "numpy/core/tests/test_core.py" in files
+            assert "numpy-1.0.dist-info/METADATA" in files
+            assert "numpy-1.0.dist-info/RECORD" not in files
+
+    def test_aggressive_with_excludes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir)
+            self._make_tree(target)
+            numpy_record = self._record_size(target, "numpy")
+            requests_record = self._record_size(target, "requests")
+            saved = trim_dependencies(
+                target,
+                TrimConfig(
+                    profile=TrimProfile.AGGRESSIVE,
+                    excludes={"Requests": ["requests/api.py"]},
+                ),
+            )
+            assert saved == {
+                "numpy": 1440 + numpy_record,
+                "requests": 25 + requests_record,
+                UNKNOWN_DISTRIBUTION: 7,
+            }
+            assert self._list_files(target) == [
+                "numpy",
+                "numpy-1.0.dist-info",
+                "numpy-1.0.dist-info/METADATA",
+                "numpy/__init__.py",
+                # Modules in doc directories can be imported
+                "numpy/doc",
+                "numpy/doc/constants.py",
+                "requests",
+                "requests-1.0.dist-info",
+                "requests-1.0.dist-info/METADATA",
+                "requests/__init__.py",
+            ]
+
+    def test_excludes_only_apply_to_their_distribution(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir)
+            self._make_tree(target)
+            saved = trim_dependencies(
+                target, TrimConfig(excludes={"requests": ["*/__init__.py"]})
+            )
+            assert saved == {"requests": 10}
+            assert (target / "numpy" / "__init__.py").exists()
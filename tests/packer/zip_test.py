@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import json
+import os
 import shutil
 import tempfile
 import zipfile
 from pathlib import Path
 
-from lambda_lift.packer.zip import make_empty_zip, add_folders_to_zip, zip_folder
+import pytest
+
+from lambda_lift.config.single_lambda import CompressionConfig
+from lambda_lift.packer import zip as zip_module
+from lambda_lift.packer.zip import (
+    make_empty_zip,
+    add_folders_to_zip,
+    zip_folder,
+    merge_folders_into_zip,
+)
 
 
 class TestZip:
@@ -102,3 +112,193 @@ class TestZip:
             assert len(ab_names) == len(set(ab_names))
             assert a_actual_desc == a_expected_desc
             assert ab_actual_desc == ab_expected_desc
+
+    def test_merge_folders_into_zip(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            deps_path = temp_path / "deps"
+            src_path = temp_path / "src"
+            self._add_file(deps_path / "lib" / "__init__.py", "lib" * 1000)
+            self._add_file(deps_path / "lib" / "core.py", "core" * 1000)
+            self._add_file(deps_path / "handler.py", "dependency version")
+            self._add_file(src_path / "handler.py", "source version")
+            self._add_file(src_path / "app" / "__init__.py")
+            zip_folder(deps_path, temp_path / "deps.zip")
+            merge_folders_into_zip(
+                base_zip_path=temp_path / "deps.zip",
+                dest_path=temp_path / "merged.zip",
+                folders_to_add=[src_path],
+            )
+            # Extracting and rezipping everything must produce the same bytes
+            work_path = temp_path / "work"
+            zipfile.ZipFile(temp_path / "deps.zip").extractall(work_path)
+            shutil.copytree(src_path, work_path, dirs_exist_ok=True)
+            zip_folder(work_path, temp_path / "expected.zip")
+            merged_bytes = (temp_path / "merged.zip").read_bytes()
+            assert merged_bytes == (temp_path / "expected.zip").read_bytes()
+            with zipfile.ZipFile(temp_path / "merged.zip") as zip_file:
+                assert zip_file.testzip() is None
+                assert zip_file.read("handler.py") == b"source version"
+                assert zip_file.read("lib/core.py") == b"core" * 1000
+
+    def _make_compression_source(self, path: Path) -> None:
+        self._add_file(path / "lib" / "core.py", "core" * 1000)
+        self._add_file(path / "lib" / "native.so", "native" * 1000)
+        (path / "data.bin").write_bytes(os.urandom(10000))
+
+    def _compress_types(self, zip_path: Path) -> dict[str, int]:
+        with zipfile.ZipFile(zip_path) as zip_file:
+            assert zip_file.testzip() is None
+            return {info.filename: info.compress_type for info in zip_file.infolist()}
+
+    def test_compression_store_patterns(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_compression_source(temp_path / "src")
+            compression = CompressionConfig(level=9, store_patterns=("*.so",))
+            zip_folder(temp_path / "src", temp_path / "a.zip", compression=compression)
+            assert self._compress_types(temp_path / "a.zip") == {
+                "data.bin": zipfile.ZIP_DEFLATED,
+                "lib/": zipfile.ZIP_STORED,
+                "lib/core.py": zipfile.ZIP_DEFLATED,
+                "lib/native.so": zipfile.ZIP_STORED,
+            }
+
+    def test_compression_store_threshold(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_compression_source(temp_path / "src")
+            compression = CompressionConfig(store_threshold=0.9)
+            for name in ("a.zip", "b.zip"):
+                zip_folder(temp_path / "src", temp_path / name, compression=compression)
+            assert self._compress_types(temp_path / "a.zip") == {
+                "data.bin": zipfile.ZIP_STORED,  # Random data doesn't shrink
+                "lib/": zipfile.ZIP_STORED,
+                "lib/core.py": zipfile.ZIP_DEFLATED,
+                "lib/native.so": zipfile.ZIP_DEFLATED,
+            }
+            # Deterministic for a given policy
+            a_bytes = (temp_path / "a.zip").read_bytes()
+            assert a_bytes == (temp_path / "b.zip").read_bytes()
+            # Deflated entries are identical to the ones zipfile produces
+            zip_folder(temp_path / "src", temp_path / "c.zip")
+            with (
+                zipfile.ZipFile(temp_path / "a.zip") as a_zip,
+                zipfile.ZipFile(temp_path / "c.zip") as c_zip,
+            ):
+                a_info = a_zip.getinfo("lib/core.py")
+                c_info = c_zip.getinfo("lib/core.py")
+                assert (a_info.CRC, a_info.compress_size) == (
+                    c_info.CRC,
+                    c_info.compress_size,
+                )
+
+    @pytest.mark.parametrize(
+        "compression",
+        [
+            CompressionConfig(),
+            # Stored deflate blocks depend on how the input is fed to zlib
+            CompressionConfig(level=0),
+            CompressionConfig(level=9, store_patterns=("*.so",)),
+            CompressionConfig(store_threshold=0.9),
+        ],
+    )
+    def test_parallel_identical_to_sequential(
+        self, compression: CompressionConfig, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # A small cap makes the writer wait for compressions and write the
+        # largest file without buffering
+        monkeypatch.setattr(zip_module, "_MAX_IN_FLIGHT_BYTES", 200000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            src_path = temp_path / "src"
+            self._make_compression_source(src_path)
+            for idx in range(50):
+                module_path = src_path / f"pkg{idx % 5}" / f"m{idx}.py"
+                self._add_file(module_path, "x" * idx * 300)
+            # Larger than a stored deflate block (64 KiB), below and above the cap
+            self._add_file(src_path / "medium.txt", "medium" * 20000)
+            self._add_file(src_path / "big.txt", "big" * 100000)
+            (src_path / "pkg0" / "__init__.py").write_text("")
+            zip_folder(src_path, temp_path / "seq.zip", compression=compression, jobs=1)
+            zip_folder(src_path, temp_path / "par.zip", compression=compression, jobs=4)
+            seq_bytes = (temp_path / "seq.zip").read_bytes()
+            assert seq_bytes == (temp_path / "par.zip").read_bytes()
+            # Merging with a base zip interleaves raw copies with compressed files
+            self._add_file(temp_path / "extra" / "pkg2" / "extra.py", "extra" * 500)
+            for name, jobs in (("merged_seq.zip", 1), ("merged_par.zip", 4)):
+                merge_folders_into_zip(
+                    base_zip_path=temp_path / "seq.zip",
+                    dest_path=temp_path / name,
+                    folders_to_add=[temp_path / "extra"],
+                    compression=compression,
+                    jobs=jobs,
+                )
+            merged_bytes = (temp_path / "merged_seq.zip").read_bytes()
+            assert merged_bytes == (temp_path / "merged_par.zip").read_bytes()
+
+    @pytest.mark.parametrize(
+        "compression",
+        [
+            CompressionConfig(),
+            CompressionConfig(level=0),
+            CompressionConfig(store_patterns=("*.bin",)),
+            CompressionConfig(store_threshold=0.9),
+        ],
+    )
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_large_files_are_streamed(
+        self,
+        compression: CompressionConfig,
+        jobs: int,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            src_path = temp_path / "src"
+            # Larger than the copy chunk, so it's fed to zlib in several pieces
+            large_text = "large" * 500000
+            large_random = os.urandom(1500000)
+            self._add_file(src_path / "large.txt", large_text)
+            (src_path / "large.bin").write_bytes(large_random)
+            self._add_file(src_path / "small.py", "small" * 100)
+            zip_folder(
+                src_path, temp_path / "buffered.zip", compression=compression, jobs=jobs
+            )
+            buffered_sizes: list[int] = []
+            compress_file = zip_module._compress_file
+
+            def tracking_compress_file(
+                path: Path, arcname: str, compression: CompressionConfig
+            ) -> tuple[zipfile.ZipInfo, bytes]:
+                buffered_sizes.append(path.stat().st_size)
+                return compress_file(path, arcname, compression)
+
+            monkeypatch.setattr(zip_module, "_compress_file", tracking_compress_file)
+            monkeypatch.setattr(zip_module, "_MAX_IN_FLIGHT_BYTES", 100000)
+            zip_folder(
+                src_path, temp_path / "streamed.zip", compression=compression, jobs=jobs
+            )
+            assert buffered_sizes == [500]
+            streamed_bytes = (temp_path / "streamed.zip").read_bytes()
+            assert streamed_bytes == (temp_path / "buffered.zip").read_bytes()
+            with zipfile.ZipFile(temp_path / "streamed.zip") as zip_file:
+                assert zip_file.testzip() is None
+                assert zip_file.read("large.txt") == large_text.encode()
+                assert zip_file.read("large.bin") == large_random
+
+    def test_zip_folder_is_atomic(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._add_file(temp_path / "src" / "a.py")
+            zip_path = temp_path / "out" / "result.zip"
+            zip_folder(temp_path / "src", zip_path)
+            original_bytes = zip_path.read_bytes()
+
+            def failing_predicate(path: Path) -> bool:
+                raise RuntimeError("Interrupted")
+
+            with pytest.raises(RuntimeError):
+                zip_folder(temp_path / "src", zip_path, predicate=failing_predicate)
+            assert zip_path.read_bytes() == original_bytes
+            assert os.listdir(zip_path.parent) == ["result.zip"]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from lambda_lift.utils.locking import file_lock
+
+
+class TestFileLock:
+    def test_file_lock_timeout(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lock_path = Path(temp_dir) / "locks" / "test.lock"
+            waits: list[None] = []
+            with file_lock(lock_path, timeout=0):
+                with pytest.raises(TimeoutError):
+                    with file_lock(
+                        lock_path, timeout=0.3, on_wait=lambda: waits.append(None)
+                    ):
+                        pass
+            assert len(waits) == 1
+            # Released locks can be acquired right away
+            with file_lock(lock_path, timeout=0, on_wait=lambda: waits.append(None)):
+                pass
+            assert len(waits) == 1